@@ -0,0 +1,684 @@
+#!/usr/bin/env python3
+"""Load Simulation - Run guild pingers against local fake Minecraft servers.
+
+Starts fake Server List Ping servers on loopback in a separate process,
+drives guild pingers for many simulated guilds at them with stubbed
+Discord channels, and reports pings per second, CPU time per ping,
+event loop lag, memory per guild, and message volume.
+
+Example:
+    python benchmarks/load_simulation.py --guilds 5000 --servers 500
+
+"""
+
+# Programmed by CoolCat467
+
+# Copyright 2025 CoolCat467
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+from __future__ import annotations
+
+__title__ = "Load Simulation"
+__author__ = "CoolCat467"
+__license__ = "Apache License 2.0"
+__version__ = "0.0.0"
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import multiprocessing
+import os
+import random
+import time
+from typing import TYPE_CHECKING, Any
+
+from mcstatus._protocol.connection import Connection
+
+from statusbot import gears, metrics
+from statusbot.bot import GuildServerPinger, StatusBot
+from statusbot.loopmonitor import LagMonitor
+from statusbot.ping_registry import PingRegistry
+from statusbot.ratelimit import PingBudget
+from statusbot.resolver import ServerResolver
+from statusbot.statemachine import StateTimings
+from statusbot.workers import PingWorkerPool
+
+if TYPE_CHECKING:
+    from multiprocessing.connection import Connection as Pipe
+
+__all__ = [
+    "FakeChannel",
+    "FakeServer",
+    "SimulatedBot",
+    "SimulatedPinger",
+    "encode_optimized",
+    "forge_payload",
+    "run_simulation",
+]
+
+
+def encode_optimized(data: bytes) -> str:
+    """Return data packed 15 bits per character like Forge's forgeData."""
+    chars = [chr(len(data) & 0x7FFF), chr((len(data) >> 15) & 0x7FFF)]
+    buffer = 0
+    bits = 0
+    for byte in data:
+        while bits >= 15:
+            chars.append(chr(buffer & 0x7FFF))
+            buffer >>= 15
+            bits -= 15
+        buffer |= byte << bits
+        bits += 8
+    while bits > 0:
+        chars.append(chr(buffer & 0x7FFF))
+        buffer >>= 15
+        bits -= 15
+    return "".join(chars)
+
+
+def forge_payload(mod_count: int) -> str:
+    """Return encoded forgeData "d" value listing mod_count fake mods."""
+    buffer = Connection()
+    # Not truncated
+    buffer.write_bool(False)
+    buffer.write_ushort(mod_count)
+    for index in range(mod_count):
+        # Two channels, not server only
+        buffer.write_varint(2 << 1)
+        buffer.write_utf(f"fakemod{index}")
+        buffer.write_utf("1.0.0")
+        for channel in ("main", "sync"):
+            buffer.write_utf(channel)
+            buffer.write_utf("1")
+            buffer.write_bool(True)
+    # No non-mod channels
+    buffer.write_varint(0)
+    return encode_optimized(bytes(buffer.flush()))
+
+
+async def read_varint(reader: asyncio.StreamReader) -> int:
+    """Return varint read from stream."""
+    value = 0
+    for shift in range(0, 35, 7):
+        byte = (await reader.readexactly(1))[0]
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value
+    raise ValueError("VarInt is too big")
+
+
+async def read_packet(reader: asyncio.StreamReader) -> tuple[int, bytes]:
+    """Return packet id and data of packet read from stream."""
+    length = await read_varint(reader)
+    body = Connection()
+    body.receive(await reader.readexactly(length))
+    packet_id = body.read_varint()
+    return packet_id, bytes(body.read(body.remaining()))
+
+
+def encode_packet(packet_id: int, data: bytes) -> bytes:
+    """Return packet with length prefix."""
+    body = Connection()
+    body.write_varint(packet_id)
+    body.write(data)
+    packet = Connection()
+    packet.write_varint(len(body.sent))
+    packet.write(body)
+    return bytes(packet.flush())
+
+
+class FakeServer:
+    """Fake Minecraft server answering Server List Ping requests.
+
+    Responses are delayed by around latency seconds, fail_rate of
+    requests have their connection closed instead of an answer, and
+    every status request has churn chance of one player leaving and
+    another joining.
+    """
+
+    __slots__ = (
+        "churn",
+        "fail_rate",
+        "failures",
+        "forge",
+        "index",
+        "joins",
+        "latency",
+        "pings",
+        "players",
+        "random",
+        "response",
+        "statuses",
+    )
+
+    def __init__(
+        self,
+        index: int,
+        rng: random.Random,
+        latency: float,
+        fail_rate: float,
+        churn: float,
+        players: int,
+        forge: str | None,
+    ) -> None:
+        """Initialize fake server."""
+        self.index = index
+        self.random = rng
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.churn = churn
+        self.forge = forge
+        self.joins = players
+        self.players = [f"player{index}_{number}" for number in range(players)]
+        self.response: bytes | None = None
+        self.statuses = 0
+        self.pings = 0
+        self.failures = 0
+
+    def __repr__(self) -> str:
+        """Return representation of self."""
+        return f"<{self.__class__.__name__} {self.index}>"
+
+    def status_packet(self) -> bytes:
+        """Return status response packet, changing players by churn."""
+        if self.players and self.random.random() < self.churn:
+            self.players.pop(self.random.randrange(len(self.players)))
+            self.players.append(f"player{self.index}_{self.joins}")
+            self.joins += 1
+            self.response = None
+        if self.response is None:
+            status: dict[str, Any] = {
+                "version": {"name": "1.20.1", "protocol": 763},
+                "players": {
+                    "max": 100,
+                    "online": len(self.players),
+                    "sample": [
+                        {
+                            "name": name,
+                            "id": "00000000-0000-0000-0000-000000000000",
+                        }
+                        for name in self.players[:12]
+                    ],
+                },
+                "description": {"text": f"Fake server {self.index}"},
+            }
+            if self.forge is not None:
+                status["forgeData"] = {
+                    "channels": [],
+                    "mods": [],
+                    "fmlNetworkVersion": 3,
+                    "d": self.forge,
+                }
+            encoded = json.dumps(status).encode("utf-8")
+            length = Connection()
+            length.write_varint(len(encoded))
+            self.response = encode_packet(0, bytes(length.flush()) + encoded)
+        return self.response
+
+    async def delay(self) -> None:
+        """Wait around latency seconds."""
+        if self.latency > 0:
+            await asyncio.sleep(self.latency * self.random.uniform(0.5, 1.5))
+
+    async def handle(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        """Answer requests on one connection until it is closed."""
+        try:
+            while True:
+                packet_id, data = await read_packet(reader)
+                if packet_id == 0 and data:
+                    # Handshake
+                    continue
+                await self.delay()
+                if self.random.random() < self.fail_rate:
+                    self.failures += 1
+                    break
+                if packet_id == 0:
+                    self.statuses += 1
+                    writer.write(self.status_packet())
+                else:
+                    # Ping, answer with same payload
+                    self.pings += 1
+                    writer.write(encode_packet(1, data))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+def _server_stats(servers: list[FakeServer]) -> dict[str, int]:
+    """Return total requests answered by fake servers."""
+    return {
+        "statuses": sum(server.statuses for server in servers),
+        "pings": sum(server.pings for server in servers),
+        "failures": sum(server.failures for server in servers),
+    }
+
+
+async def _serve(conn: Pipe, options: dict[str, Any]) -> None:
+    """Run fake servers, answering stats and stop requests from pipe."""
+    loop = asyncio.get_running_loop()
+    rng = random.Random(options["seed"])  # noqa: S311
+    forge = None
+    if options["forge_mods"]:
+        forge = forge_payload(options["forge_mods"])
+    servers = [
+        FakeServer(
+            index,
+            random.Random(rng.random()),  # noqa: S311
+            options["latency"],
+            options["fail_rate"],
+            options["churn"],
+            options["players"],
+            forge,
+        )
+        for index in range(options["servers"])
+    ]
+    listeners = [
+        await asyncio.start_server(server.handle, "127.0.0.1", 0)
+        for server in servers
+    ]
+    conn.send([listener.sockets[0].getsockname()[1] for listener in listeners])
+
+    stopped: asyncio.Future[None] = loop.create_future()
+
+    def receive() -> None:
+        try:
+            while conn.poll():
+                if conn.recv() == "stop":
+                    raise EOFError
+                conn.send(_server_stats(servers))
+        except (EOFError, OSError):
+            loop.remove_reader(conn.fileno())
+            if not stopped.done():
+                stopped.set_result(None)
+
+    loop.add_reader(conn.fileno(), receive)
+    await stopped
+    for listener in listeners:
+        listener.close()
+
+
+def _fake_servers_main(conn: Pipe, options: dict[str, Any]) -> None:
+    """Entry point of fake server process."""
+    try:
+        asyncio.run(_serve(conn, options))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        conn.close()
+
+
+class FakeChannel:
+    """Discord channel stand in counting sent messages."""
+
+    __slots__ = ("characters", "messages")
+
+    def __init__(self) -> None:
+        """Initialize with nothing sent."""
+        self.messages = 0
+        self.characters = 0
+
+    async def send(self, content: str = "", *args: Any, **kwargs: Any) -> None:
+        """Count message."""
+        self.messages += 1
+        self.characters += len(content)
+
+
+class SimulatedBot(gears.BaseBot):
+    """Just enough of StatusBot for guild pingers to run."""
+
+    __slots__ = (
+        "channels",
+        "configurations",
+        "lag_monitor",
+        "ping_registry",
+        "resolver",
+        "warmup_limit",
+    )
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        ping_registry: PingRegistry,
+    ) -> None:
+        """Initialize with event loop and ping registry."""
+        super().__init__(loop)
+        self.ping_registry = ping_registry
+        self.resolver = ServerResolver(loop)
+        self.lag_monitor = LagMonitor(loop)
+        self.warmup_limit = asyncio.Semaphore(StatusBot.warmup_concurrency)
+        self.configurations: dict[int, dict[str, Any]] = {}
+        self.channels: dict[int, FakeChannel] = {}
+
+    def get_guild_configuration(self, guild_id: int) -> dict[str, Any]:
+        """Return copy of guild configuration."""
+        return dict(self.configurations[guild_id])
+
+    def guess_guild_channel(self, guild_id: int) -> FakeChannel:
+        """Return guild's fake channel."""
+        return self.channels[guild_id]
+
+    def sent(self) -> tuple[int, int]:
+        """Return total messages and characters sent to all channels."""
+        return (
+            sum(channel.messages for channel in self.channels.values()),
+            sum(channel.characters for channel in self.channels.values()),
+        )
+
+
+class SimulatedPinger(GuildServerPinger):
+    """Guild pinger with tick speed set by simulation."""
+
+    __slots__ = ()
+
+
+class LagSampler:
+    """Record how late scheduled callbacks run."""
+
+    __slots__ = ("expected", "handle", "lags", "loop")
+
+    interval: float = 0.1
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Initialize with event loop."""
+        self.loop = loop
+        self.lags: list[float] = []
+        self.expected = 0.0
+        self.handle: asyncio.TimerHandle | None = None
+
+    def start(self) -> None:
+        """Start sampling."""
+        self.expected = self.loop.time() + self.interval
+        self.handle = self.loop.call_at(self.expected, self._sample)
+
+    def stop(self) -> None:
+        """Stop sampling."""
+        if self.handle is not None:
+            self.handle.cancel()
+            self.handle = None
+
+    def _sample(self) -> None:
+        """Record lateness and schedule next sample."""
+        self.lags.append(max(0.0, self.loop.time() - self.expected))
+        self.start()
+
+    def quantile(self, fraction: float) -> float:
+        """Return lag below which fraction of samples are."""
+        if not self.lags:
+            return 0.0
+        ordered = sorted(self.lags)
+        index = min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1)
+        return ordered[max(0, index)]
+
+
+def current_rss() -> int:
+    """Return resident set size of this process in bytes, or 0 if unknown."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as file:
+            pages = int(file.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def _pinger_results() -> tuple[int, int]:
+    """Return pinger status results and failures recorded in metrics."""
+    return (
+        metrics.ping_latency.count(),
+        int(sum(metrics.ping_failures.values.values())),
+    )
+
+
+async def run_simulation(args: argparse.Namespace) -> dict[str, Any]:
+    """Run simulation and return results."""
+    loop = asyncio.get_running_loop()
+    rng = random.Random(args.seed)  # noqa: S311
+
+    context = multiprocessing.get_context("spawn")
+    conn, child_conn = context.Pipe()
+    process = context.Process(
+        target=_fake_servers_main,
+        args=(
+            child_conn,
+            {
+                "seed": args.seed,
+                "servers": args.servers,
+                "latency": args.latency,
+                "fail_rate": args.fail_rate,
+                "churn": args.churn,
+                "players": args.players,
+                "forge_mods": args.forge_mods,
+            },
+        ),
+        name="statusbot-fake-servers",
+        daemon=True,
+    )
+    process.start()
+    child_conn.close()
+    ports: list[int] = await loop.run_in_executor(None, conn.recv)
+
+    def server_stats() -> dict[str, int]:
+        conn.send("stats")
+        stats: dict[str, int] = conn.recv()
+        return stats
+
+    budget = None
+    if args.ping_rate > 0:
+        budget = PingBudget(
+            loop,
+            args.ping_rate,
+            args.ping_burst,
+            args.max_in_flight,
+        )
+    workers = None
+    if args.ping_workers > 0:
+        workers = PingWorkerPool(loop, args.ping_workers)
+    bot = SimulatedBot(loop, PingRegistry(loop, budget, workers))
+    timings = None
+    if args.state_timings:
+        timings = StateTimings()
+        bot.set_machine_listener(timings)
+    bot.lag_monitor.start()
+
+    SimulatedPinger.tick_speed = args.tick
+    SimulatedPinger.min_tick_speed = args.tick
+    SimulatedPinger.max_tick_speed = args.tick
+    SimulatedPinger.tick_speed_limits = (args.tick, args.tick)
+
+    rss_start = current_rss()
+    for guild_id in range(1, args.guilds + 1):
+        port = ports[(guild_id - 1) % len(ports)]
+        bot.configurations[guild_id] = {"address": f"127.0.0.1:{port}"}
+        bot.channels[guild_id] = FakeChannel()
+        bot.add_gear(
+            SimulatedPinger(
+                bot,  # type: ignore[arg-type]
+                guild_id,
+                rng.uniform(0, args.tick),
+            ),
+        )
+
+    await asyncio.sleep(args.warmup)
+    rss = current_rss()
+    sampler = LagSampler(loop)
+    sampler.start()
+    start_stats = await loop.run_in_executor(None, server_stats)
+    start_results, start_failures = _pinger_results()
+    start_messages, start_characters = bot.sent()
+    start_cpu = time.process_time()
+    start_time = time.perf_counter()
+
+    await asyncio.sleep(args.duration)
+
+    elapsed = time.perf_counter() - start_time
+    cpu = time.process_time() - start_cpu
+    end_stats = await loop.run_in_executor(None, server_stats)
+    end_results, end_failures = _pinger_results()
+    end_messages, end_characters = bot.sent()
+    sampler.stop()
+
+    bot.lag_monitor.stop()
+    await bot.close()
+    if workers is not None:
+        workers.close()
+    conn.send("stop")
+    conn.close()
+    await loop.run_in_executor(None, process.join, 5)
+
+    requests = sum(end_stats[key] - start_stats[key] for key in end_stats)
+    results = end_results - start_results
+    return {
+        "guilds": args.guilds,
+        "servers": args.servers,
+        "seconds": round(elapsed, 3),
+        "server_requests_per_second": round(requests / elapsed, 2),
+        "pinger_updates_per_second": round(results / elapsed, 2),
+        "pinger_failures_per_second": round(
+            (end_failures - start_failures) / elapsed,
+            2,
+        ),
+        "cpu_ms_per_request": round(cpu * 1000 / max(1, requests), 4),
+        "cpu_ms_per_update": round(cpu * 1000 / max(1, results), 4),
+        "cpu_percent": round(cpu * 100 / elapsed, 1),
+        "loop_lag_mean_ms": round(
+            sum(sampler.lags) * 1000 / max(1, len(sampler.lags)),
+            3,
+        ),
+        "loop_lag_p99_ms": round(sampler.quantile(0.99) * 1000, 3),
+        "loop_lag_max_ms": round(max(sampler.lags, default=0) * 1000, 3),
+        "memory_per_guild_kib": round(
+            (rss - rss_start) / 1024 / args.guilds,
+            2,
+        ),
+        "messages_per_second": round(
+            (end_messages - start_messages) / elapsed,
+            2,
+        ),
+        "message_characters_per_second": round(
+            (end_characters - start_characters) / elapsed,
+            2,
+        ),
+        "state_timings": timings.report() if timings is not None else [],
+    }
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Return parsed command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--guilds", type=int, default=1000)
+    parser.add_argument(
+        "--servers",
+        type=int,
+        default=100,
+        help="fake servers, guilds are spread evenly between them",
+    )
+    parser.add_argument(
+        "--tick",
+        type=float,
+        default=5,
+        help="seconds between pings of each guild",
+    )
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument(
+        "--warmup",
+        type=float,
+        default=None,
+        help="seconds to run before measuring, default two ticks",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.02,
+        help="average seconds fake servers take to answer",
+    )
+    parser.add_argument(
+        "--fail-rate",
+        type=float,
+        default=0.01,
+        help="fraction of requests fake servers hang up on",
+    )
+    parser.add_argument(
+        "--churn",
+        type=float,
+        default=0.1,
+        help="chance of a player swapping per status request",
+    )
+    parser.add_argument("--players", type=int, default=20)
+    parser.add_argument(
+        "--forge-mods",
+        type=int,
+        default=0,
+        help="mods listed in forgeData payload, 0 for vanilla servers",
+    )
+    parser.add_argument(
+        "--ping-rate",
+        type=float,
+        default=StatusBot.ping_rate,
+        help="ping budget requests per second, 0 for no budget",
+    )
+    parser.add_argument(
+        "--ping-burst",
+        type=float,
+        default=StatusBot.ping_burst,
+    )
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=StatusBot.max_pings_in_flight,
+    )
+    parser.add_argument("--ping-workers", type=int, default=0)
+    parser.add_argument(
+        "--state-timings",
+        action="store_true",
+        help="also report time spent in each pinger state",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="print results as json, for comparing runs",
+    )
+    args = parser.parse_args(argv)
+    if args.warmup is None:
+        args.warmup = args.tick * 2
+    return args
+
+
+def run(argv: list[str] | None = None) -> None:
+    """Run simulation from command line arguments and print results."""
+    args = parse_args(argv)
+    # Writes to connections fake servers hung up on are expected
+    logging.getLogger("asyncio").setLevel(logging.ERROR)
+    results = asyncio.run(run_simulation(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    timings = results.pop("state_timings")
+    width = max(map(len, results))
+    for name, value in results.items():
+        print(f"{name.replace('_', ' '):<{width}} {value}")
+    if timings:
+        print("\nState timings:")
+        print("\n".join(timings))
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""Make Fixtures - Write status response payloads used by microbenchmarks.
+
+Payloads are in the same format servers send, with made up but
+deterministic contents, so regenerating them gives the same files.
+"""
+
+# Programmed by CoolCat467
+
+# Copyright 2025 CoolCat467
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+from __future__ import annotations
+
+__title__ = "Make Fixtures"
+__author__ = "CoolCat467"
+__license__ = "Apache License 2.0"
+__version__ = "0.0.0"
+
+import base64
+import json
+import os
+import random
+import struct
+import uuid
+import zlib
+from typing import Any
+
+from load_simulation import encode_optimized
+from mcstatus._protocol.connection import Connection
+
+__all__ = ["FIXTURES", "make_fixtures"]
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+SYLLABLES = (
+    "ad",
+    "aether",
+    "bio",
+    "block",
+    "bot",
+    "craft",
+    "create",
+    "deco",
+    "dragon",
+    "ender",
+    "farm",
+    "forge",
+    "gear",
+    "iron",
+    "jei",
+    "lib",
+    "magic",
+    "mech",
+    "nature",
+    "ore",
+    "pipe",
+    "quark",
+    "rail",
+    "storage",
+    "tech",
+    "thermal",
+    "tinker",
+    "util",
+    "vault",
+    "world",
+)
+
+
+def favicon(rng: random.Random) -> str:
+    """Return 64x64 png data URI with a noisy gradient."""
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        body = kind + data
+        return (
+            struct.pack(">I", len(data))
+            + body
+            + struct.pack(">I", zlib.crc32(body))
+        )
+
+    rows = bytearray()
+    for y in range(64):
+        # Filter type none
+        rows.append(0)
+        for x in range(64):
+            rows.extend(
+                (
+                    (x * 4 + rng.randrange(16)) % 256,
+                    (y * 4 + rng.randrange(16)) % 256,
+                    (x * y + rng.randrange(16)) % 256,
+                    255,
+                ),
+            )
+    png = (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", 64, 64, 8, 6, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(bytes(rows), 9))
+        + chunk(b"IEND", b"")
+    )
+    return "data:image/png;base64," + base64.b64encode(png).decode("ascii")
+
+
+def players(rng: random.Random, count: int) -> list[dict[str, str]]:
+    """Return player sample entries."""
+    return [
+        {
+            "name": f"{rng.choice(SYLLABLES).title()}{rng.randrange(10000)}",
+            "id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        }
+        for _ in range(count)
+    ]
+
+
+def vanilla_status(rng: random.Random) -> dict[str, Any]:
+    """Return vanilla server status response."""
+    return {
+        "version": {"name": "1.20.4", "protocol": 765},
+        "enforcesSecureChat": True,
+        "description": {
+            "text": "",
+            "extra": [
+                {"text": "Survival ", "color": "green", "bold": True},
+                {"text": "| ", "color": "gray"},
+                {"text": "Season 4 is live!", "color": "gold"},
+            ],
+        },
+        "players": {"max": 100, "online": 37, "sample": players(rng, 12)},
+        "favicon": favicon(rng),
+    }
+
+
+def forge_data(rng: random.Random, mod_count: int) -> dict[str, Any]:
+    """Return forgeData with encoded "d" listing mod_count mods."""
+    buffer = Connection()
+    # Not truncated
+    buffer.write_bool(False)
+    buffer.write_ushort(mod_count)
+    mod_ids = ["minecraft", "forge", "mixinextras"]
+    seen = set(mod_ids)
+    while len(mod_ids) < mod_count:
+        mod_id = "".join(rng.sample(SYLLABLES, rng.randint(1, 3)))
+        if mod_id not in seen:
+            seen.add(mod_id)
+            mod_ids.append(mod_id)
+    for mod_id in mod_ids:
+        channels = rng.choice((0, 1, 1, 2, 3))
+        server_only = rng.random() < 0.1
+        buffer.write_varint((channels << 1) | server_only)
+        buffer.write_utf(mod_id)
+        if not server_only:
+            buffer.write_utf(
+                f"1.20.1-{rng.randint(0, 9)}.{rng.randint(0, 30)}."
+                f"{rng.randint(0, 99)}",
+            )
+        for index in range(channels):
+            buffer.write_utf(("main", "network", "sync", "config")[index])
+            buffer.write_utf(str(rng.randint(1, 20)))
+            buffer.write_bool(rng.random() < 0.8)
+    non_mod_channels = ("minecraft:register", "minecraft:unregister")
+    buffer.write_varint(len(non_mod_channels))
+    for name in non_mod_channels:
+        buffer.write_utf(name)
+        buffer.write_utf("FML3")
+        buffer.write_bool(False)
+    return {
+        "channels": [],
+        "mods": [],
+        "fmlNetworkVersion": 3,
+        "truncated": False,
+        "d": encode_optimized(bytes(buffer.flush())),
+    }
+
+
+def make_fixtures() -> list[str]:
+    """Write fixture files and return their paths."""
+    os.makedirs(FIXTURES, exist_ok=True)
+    rng = random.Random(467)  # noqa: S311
+    vanilla = vanilla_status(rng)
+    forge = vanilla_status(rng)
+    forge["version"] = {"name": "1.20.1", "protocol": 763}
+    forge["forgeData"] = forge_data(rng, 300)
+    written = []
+    for name, payload in (
+        ("vanilla_status", vanilla),
+        ("forge_300_mods", forge),
+    ):
+        path = os.path.join(FIXTURES, f"{name}.json")
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(payload, file, indent=2, ensure_ascii=False)
+            file.write("\n")
+        written.append(path)
+    return written
+
+
+if __name__ == "__main__":
+    for path in make_fixtures():
+        print(f"Wrote {path}")
@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""Microbench - Time pure Python hot paths and compare against a baseline.
+
+Every benchmark is calibrated to run for at least --min-time seconds
+per repeat, timed --repeat times with garbage collection disabled, and
+the fastest repeat is used as the result since slower repeats only
+measure interference from the rest of the machine.
+
+Example:
+    python benchmarks/microbench.py --save baseline.json
+    python benchmarks/microbench.py --compare baseline.json
+
+"""
+
+# Programmed by CoolCat467
+
+# Copyright 2025 CoolCat467
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+from __future__ import annotations
+
+__title__ = "Microbench"
+__author__ = "CoolCat467"
+__license__ = "Apache License 2.0"
+__version__ = "0.0.0"
+
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+from typing import TYPE_CHECKING, Any
+
+import discord
+from mcstatus._protocol.connection import Connection
+
+from statusbot import bot, decode_mods, utils
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Coroutine
+
+__all__ = ["BENCHMARKS", "compare", "load_fixture", "measure"]
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load_fixture(name: str) -> dict[str, Any]:
+    """Return fixture status response."""
+    with open(
+        os.path.join(FIXTURES, f"{name}.json"),
+        encoding="utf-8",
+    ) as file:
+        data: dict[str, Any] = json.load(file)
+        return data
+
+
+def run_sync(coro: Coroutine[Any, Any, Any]) -> Any:
+    """Return result of coroutine that never suspends."""
+    try:
+        coro.send(None)
+    except StopIteration as exc:
+        return exc.value
+    coro.close()
+    raise RuntimeError("Benchmarked coroutine suspended")
+
+
+class _Sink:
+    """Messageable stand in discarding sent messages."""
+
+    __slots__ = ("guild", "id")
+
+    def __init__(self) -> None:
+        """Initialize as channel in no guild."""
+        self.id = 5
+        self.guild = None
+
+    async def send(self, *args: Any, **kwargs: Any) -> None:
+        """Discard message."""
+
+
+class _ConnectionState:
+    """Just enough of discord's connection state to build messages."""
+
+    __slots__ = ("__weakref__",)
+
+    def create_user(self, data: Any) -> discord.User:
+        """Return user from user data."""
+        return discord.User(state=self, data=data)  # type: ignore[arg-type]
+
+
+class _Namespace:
+    """Object with given attributes."""
+
+    def __init__(self, **kwargs: Any) -> None:
+        """Set attributes from keyword arguments."""
+        self.__dict__.update(kwargs)
+
+
+class _Pinger:
+    """Guild pinger stand in for PingState."""
+
+    __slots__ = ("channel", "last_online")
+
+    def __init__(self) -> None:
+        """Initialize with no one online."""
+        self.channel = _Sink()
+        self.last_online: list[str] = []
+
+
+def reference_decode(string: str) -> Connection:
+    """Decode buffer from string one character at a time.
+
+    Copy of decode_optimized from before it decoded in bulk, kept so
+    both can be timed on the same fixtures. Do not optimize.
+    """
+    text = io.StringIO(string)
+
+    def read() -> int:
+        result = text.read(1)
+        if not result:
+            return 0
+        return ord(result)
+
+    size = read() | (read() << 15)
+
+    buffer = Connection()
+    value = 0
+    bits = 0
+    for _ in range(len(string) - 2):
+        while bits >= 8:
+            buffer.receive(
+                (value & 0xFF).to_bytes(
+                    length=1,
+                    byteorder="big",
+                    signed=False,
+                ),
+            )
+            value >>= 8
+            bits -= 8
+        value |= (read() & 0x7FFF) << bits
+        bits += 15
+
+    while buffer.remaining() < size:
+        buffer.receive(
+            (value & 0xFF).to_bytes(length=1, byteorder="big", signed=False),
+        )
+        value >>= 8
+        bits -= 8
+    return buffer
+
+
+def bench_decode_reference() -> Callable[[], object]:
+    """Decode 300 mod forge payload with the reference decoder."""
+    encoded = load_fixture("forge_300_mods")["forgeData"]["d"]
+    expected = decode_mods.decode_optimized_bytes(encoded)
+    reference = reference_decode(encoded)
+    if reference.read(reference.remaining()) != expected:
+        raise RuntimeError("Reference decoder disagrees with optimized")
+    return lambda: reference_decode(encoded)
+
+
+def bench_decode_optimized() -> Callable[[], object]:
+    """Decode 300 mod forge payload."""
+    encoded = load_fixture("forge_300_mods")["forgeData"]["d"]
+    return lambda: decode_mods.decode_optimized(encoded)
+
+
+def bench_process_response_lazy() -> Callable[[], object]:
+    """Wrap 300 mod forge status response without decoding it."""
+    response = load_fixture("forge_300_mods")
+    # Only forgeData is replaced, so a shallow copy is a fresh response
+    return lambda: decode_mods.process_response(dict(response))  # type: ignore[arg-type]
+
+
+def bench_process_response_decode() -> Callable[[], object]:
+    """Process 300 mod forge status response and read its mods."""
+    response = load_fixture("forge_300_mods")
+
+    def process_and_decode() -> object:
+        # Cache hits would only time a dictionary lookup
+        decode_mods.forge_cache.clear()
+        data = decode_mods.process_response(dict(response))  # type: ignore[arg-type]
+        return data["forgeData"]["mods"]
+
+    return process_and_decode
+
+
+def bench_process_response_vanilla() -> Callable[[], object]:
+    """Process vanilla status response."""
+    response = load_fixture("vanilla_status")
+    return lambda: decode_mods.process_response(dict(response))  # type: ignore[arg-type]
+
+
+def bench_handle_sample() -> Callable[[], object]:
+    """Announce two players leaving and two joining a 12 player sample."""
+    sample = [
+        player["name"]
+        for player in load_fixture("vanilla_status")["players"]["sample"]
+    ]
+    before = [*sample[:10], "Anonymous Player", "Anonymous Player"]
+    after = [*sample[2:], "Anonymous Player", "NewPlayer1", "NewPlayer2"]
+    state = bot.PingState()
+    pinger = _Pinger()
+    state.machine_ref = lambda: pinger  # type: ignore[assignment,return-value]
+
+    def handle_sample() -> None:
+        pinger.last_online = before
+        run_sync(state.handle_sample(after))
+
+    return handle_sample
+
+
+def bench_send_over_2000() -> Callable[[], object]:
+    """Split 6000 characters of player names into messages."""
+    text = "\n".join(f"`Player{index}`" for index in range(500))
+    sink = _Sink()
+    return lambda: run_sync(
+        bot.send_over_2000(sink.send, text, "\n", "```", "Players:\n"),
+    )
+
+
+def bench_process_arguments() -> Callable[[], object]:
+    """Convert command arguments to an option setting command's types."""
+    parameters = {"option": str, "value": int, "comment": str | None}
+    message = _Namespace(guild=None)
+    arguments = ["min-interval", "30", "check", "more", "often"]
+    return lambda: bot.process_arguments(
+        parameters,  # type: ignore[arg-type]
+        arguments,
+        message,  # type: ignore[arg-type]
+    )
+
+
+def bench_format_time() -> Callable[[], object]:
+    """Format a handful of durations."""
+    durations = (1, 59, 3600, 90061, 2_629_800, 31_557_600 * 5 + 123)
+
+    def format_times() -> None:
+        for seconds in durations:
+            utils.format_time(seconds)
+
+    return format_times
+
+
+def bench_interaction_to_message() -> Callable[[], object]:
+    """Convert slash command interaction to message."""
+    user = _Namespace(
+        name="user",
+        id=1,
+        discriminator="0",
+        _avatar=None,
+        avatar=None,
+        bot=False,
+        system=False,
+        roles=[],
+    )
+    interaction = _Namespace(
+        id=10,
+        channel_id=5,
+        guild_id=3,
+        user=user,
+        application_id=7,
+        _state=_ConnectionState(),
+        channel=_Sink(),
+        followup=None,
+        response=None,
+    )
+    return lambda: bot.interaction_to_message(interaction, False)  # type: ignore[arg-type]
+
+
+BENCHMARKS: dict[str, Callable[[], Callable[[], object]]] = {
+    "decode_reference[forge_300_mods]": bench_decode_reference,
+    "decode_optimized[forge_300_mods]": bench_decode_optimized,
+    "process_response_lazy[forge_300_mods]": bench_process_response_lazy,
+    "process_response_decode[forge_300_mods]": bench_process_response_decode,
+    "process_response[vanilla]": bench_process_response_vanilla,
+    "handle_sample": bench_handle_sample,
+    "send_over_2000": bench_send_over_2000,
+    "process_arguments": bench_process_arguments,
+    "format_time": bench_format_time,
+    "interaction_to_message": bench_interaction_to_message,
+}
+
+
+def measure(
+    function: Callable[[], object],
+    repeat: int,
+    min_time: float,
+) -> dict[str, float]:
+    """Return loops per repeat and fastest and median seconds per call."""
+    timer = timeit.Timer(function)
+    loops = 1
+    while True:
+        elapsed = timer.timeit(loops)
+        if elapsed >= min_time:
+            break
+        # Aim a bit past min_time so the next try is usually enough
+        loops = max(
+            loops * 2,
+            int(loops * min_time * 1.2 / max(elapsed, 1e-9)),
+        )
+    times = [total / loops for total in timer.repeat(repeat, loops)]
+    return {
+        "loops": loops,
+        "best": min(times),
+        "median": statistics.median(times),
+    }
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    threshold: float,
+) -> list[str]:
+    """Return names of benchmarks more than threshold slower than baseline."""
+    regressed = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result["best"] / baseline[name]["best"]
+        if ratio > 1 + threshold:
+            regressed.append(name)
+    return regressed
+
+
+def format_seconds(seconds: float) -> str:
+    """Return seconds in the most readable unit."""
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3f} {unit}"
+    return f"{seconds / 1e-9:.1f} ns"
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Return parsed command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--filter",
+        default="",
+        help="only run benchmarks with this in their name",
+    )
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.2,
+        help="minimum seconds each repeat runs for",
+    )
+    parser.add_argument("--save", metavar="FILE", help="save results as json")
+    parser.add_argument(
+        "--compare",
+        metavar="FILE",
+        help="compare against results saved with --save",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="fraction slower than baseline that counts as a regression",
+    )
+    return parser.parse_args(argv)
+
+
+def run(argv: list[str] | None = None) -> int:
+    """Run benchmarks from command line arguments, return exit status."""
+    args = parse_args(argv)
+    baseline: dict[str, dict[str, float]] = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+
+    results: dict[str, dict[str, float]] = {}
+    width = max(map(len, BENCHMARKS))
+    for name, setup in BENCHMARKS.items():
+        if args.filter not in name:
+            continue
+        results[name] = measure(setup(), args.repeat, args.min_time)
+        line = (
+            f"{name:<{width}} {format_seconds(results[name]['best']):>12} "
+            f"(median {format_seconds(results[name]['median'])})"
+        )
+        if name in baseline:
+            ratio = results[name]["best"] / baseline[name]["best"]
+            line += f" {ratio:6.2f}x baseline"
+        print(line)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "python": sys.version,
+                    "platform": platform.platform(),
+                    "results": results,
+                },
+                file,
+                indent=2,
+            )
+            file.write("\n")
+
+    regressed = compare(results, baseline, args.threshold)
+    if regressed:
+        print(
+            f"\n{len(regressed)} benchmarks more than "
+            f"{args.threshold:.0%} slower than baseline:",
+        )
+        print("\n".join(regressed))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
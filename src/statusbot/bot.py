@@ -24,8 +24,6 @@ __license__ = "Apache License 2.0"
 __version__ = "0.9.1"
 
 import asyncio
-import base64
-import binascii
 import concurrent.futures
 import contextlib
 import difflib
@@ -35,15 +33,18 @@ import json
 import math
 import os
 import random
+import re
 import sys
+import time
 import traceback
+from collections.abc import Mapping
 from datetime import datetime
 from threading import Event, Lock
 from typing import TYPE_CHECKING, Any, Final, cast, get_args, get_type_hints
 
+import aiohttp
 import discord
 import discord.client
-import mcstatus
 
 # from discord.ext import tasks, commands
 from aiohttp.client_exceptions import ClientConnectorError
@@ -52,11 +53,35 @@ from dotenv import load_dotenv
 # Update talks to GitHub
 # decode_mods Decodes forgeData tag
 # Gears is basically like discord's Cogs, but by me.
-from statusbot import decode_mods, gears, statemachine, update
+from statusbot import gears, logs, metrics, statemachine, update
+from statusbot.config_store import (
+    ConfigBackend,
+    ConfigStore,
+    JsonBackend,
+    SQLiteBackend,
+    migrate_json_to_sqlite,
+)
+from statusbot.favicons import decode_favicon, get_favicon
+from statusbot.loopmonitor import LagMonitor
+from statusbot.ping_registry import PingRegistry
+from statusbot.polling import AdaptiveInterval, ExponentialBackoff
+from statusbot.ratelimit import PingBudget
+from statusbot.resolver import ServerResolver
 from statusbot.utils import combine_end, format_time, pretty_exception_name
+from statusbot.workers import PingWorkerPool
 
 if TYPE_CHECKING:
-    from collections.abc import Awaitable, Callable, Coroutine, Iterable
+    from collections.abc import (
+        Awaitable,
+        Callable,
+        Coroutine,
+        Iterable,
+        Sequence,
+    )
+
+    import mcstatus
+
+    from statusbot.status import StatusSnapshot
 
 # https://discordpy.readthedocs.io/en/latest/index.html
 # https://discord.com/developers
@@ -71,6 +96,27 @@ if TYPE_CHECKING:
 # file line 2 is "DISCORD_TOKEN=XXXXX"
 load_dotenv()
 TOKEN: Final = os.getenv("DISCORD_TOKEN")
+# Number of worker processes to send server requests from,
+# 0 sends them from the bot's own event loop.
+PING_WORKERS: Final = int(os.getenv("PING_WORKERS", "0"))
+# Total number of shards across all bot processes and comma separated
+# shard ids this process runs. Unset lets Discord pick the shard count
+# and runs every shard in this process.
+SHARD_COUNT: Final = os.getenv("SHARD_COUNT")
+SHARD_IDS: Final = os.getenv("SHARD_IDS")
+# Where to keep configuration, "json" files or "sqlite" database
+CONFIG_BACKEND: Final = os.getenv("CONFIG_BACKEND", "json")
+# Log file location, size in bytes or interval to rotate it at,
+# and how many old log files to keep
+LOG_PATH: Final = os.getenv(
+    "LOG_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "log.txt"),
+)
+LOG_MAX_BYTES: Final = int(os.getenv("LOG_MAX_BYTES", str(5 * 1024 * 1024)))
+LOG_ROTATE_WHEN: Final = os.getenv("LOG_ROTATE_WHEN")
+LOG_BACKUPS: Final = int(os.getenv("LOG_BACKUPS", "5"))
+# Port to serve metrics on at 127.0.0.1, metrics are not served if unset
+METRICS_PORT: Final = os.getenv("METRICS_PORT")
 
 BOT_PREFIX: Final = "!status"
 OWNER_ID: Final = 344282497103691777
@@ -89,17 +135,6 @@ def write_file(filename: str, data: str) -> None:
         wfile.close()
 
 
-def append_file(filename: str, data: str) -> None:
-    """Add data to file <filename>."""
-    filename = os.path.abspath(filename)
-    if os.path.exists(filename):
-        with open(filename, "a", encoding="utf-8") as wfile:
-            wfile.write(data)
-            wfile.close()
-    else:
-        write_file(filename, data)
-
-
 def read_file(filename: str) -> str | None:
     """Read data from file <filename>. Return None if file does not exist."""
     filename = os.path.abspath(filename)
@@ -156,26 +191,29 @@ def closest(given: str, options: Iterable[str]) -> str:
     return difflib.get_close_matches(given, options, n=1, cutoff=0)[0]
 
 
-def log_active_exception(
-    logpath: str | None = None,
-    extra: str | None = None,
-) -> None:
-    """Log active exception."""
+def log_active_exception(extra: str | None = None) -> None:
+    """Log active exception.
+
+    Only the first exception with a given fingerprint is logged in full,
+    repeats are counted and summarized periodically.
+    """
     # Get values from exc_info
     ex_type, ex_value, _ex_traceback = sys.exc_info()
     # Get error message.
-    msg = "#" * 16 + "\n"
+    msg = ""
+    if ex_value is not None:
+        digest, first = logs.errors.record(ex_value)
+        if not first:
+            return
+        msg += f"Error fingerprint: {digest}\n"
     if extra is not None:
         msg += f"{extra}\n"
     msg += "Exception class:\n" + str(ex_type) + "\n"
     msg += "Exception text:\n" + str(ex_value) + "\n\n"
 
     msg += "".join(traceback.format_exception(ex_value))
-    msg += "\n" + "#" * 16 + "\n"
 
-    print(msg)
-    if logpath is not None:
-        append_file(logpath, msg)
+    logs.logger.error(msg)
 
 
 def get_valid_options(valid: Iterable[str], wrap: str = "`") -> str:
@@ -561,9 +599,7 @@ def slash_handle(
                         f"[{timestamp}] Slash Command: {interaction.command.name!r} Args: {kwargs} from {name!r}",
                     )
             except Exception as exc:
-                root = os.path.split(os.path.abspath(__file__))[0]  # noqa: ASYNC240
-                logpath = os.path.join(root, "log.txt")
-                log_active_exception(logpath)
+                log_active_exception()
                 await msg.channel.send(
                     f"An error occurred processing the slash command:\n```\n{exc}\n```",
                 )
@@ -639,48 +675,228 @@ async def get_github_file(path: str, timeout: int = 10) -> str:
     return value
 
 
+# Discord API routes that send messages, channel messages and
+# interaction followups
+_SEND_ROUTE = re.compile(r"/channels/\d+/messages$|/webhooks/\d+/[^/]+$")
+
+
+def _send_failure_name(status: int) -> str:
+    """Return name of discord exception raised for HTTP error status."""
+    if status == 403:
+        return "Forbidden"
+    if status == 404:
+        return "NotFound"
+    if status == 429:
+        return "RateLimited"
+    if status >= 500:
+        return "DiscordServerError"
+    return "HTTPException"
+
+
+def discord_send_trace() -> aiohttp.TraceConfig:
+    """Return HTTP trace config recording Discord message send metrics.
+
+    Every message send ends up as a POST request to Discord, so tracing
+    requests measures all of them no matter what code sent them. Each
+    attempt is measured on its own, including ones discord.py retries.
+    """
+    trace = aiohttp.TraceConfig()
+
+    async def on_request_start(
+        session: aiohttp.ClientSession,
+        context: Any,
+        params: aiohttp.TraceRequestStartParams,
+    ) -> None:
+        context.send_start = None
+        if params.method == "POST" and _SEND_ROUTE.search(params.url.path):
+            context.send_start = time.perf_counter()
+
+    async def on_request_end(
+        session: aiohttp.ClientSession,
+        context: Any,
+        params: aiohttp.TraceRequestEndParams,
+    ) -> None:
+        if context.send_start is None:
+            return
+        metrics.discord_send_latency.observe(
+            time.perf_counter() - context.send_start,
+        )
+        if params.response.status >= 400:
+            metrics.discord_send_failures.inc(
+                _send_failure_name(params.response.status),
+            )
+
+    async def on_request_exception(
+        session: aiohttp.ClientSession,
+        context: Any,
+        params: aiohttp.TraceRequestExceptionParams,
+    ) -> None:
+        if context.send_start is None:
+            return
+        metrics.discord_send_failures.inc(type(params.exception).__name__)
+
+    trace.on_request_start.append(on_request_start)
+    trace.on_request_end.append(on_request_end)
+    trace.on_request_exception.append(on_request_exception)
+    return trace
+
+
 class GuildServerPinger(gears.StateTimer):
     """Server ping machine for guild."""
 
     __slots__ = (
+        "address",
         "channel",
         "guild_id",
+        "interval",
         "last_delay",
-        "last_json",
         "last_online",
         "last_online",
         "last_online_count",
+        "last_status",
         "server",
+        "server_key",
+        "start_delay",
+        "warming_up",
     )
     tick_speed: int = 60
+    # Default bounds of adaptive tick speed, guilds can change them
+    # with the min-interval and max-interval options
+    min_tick_speed: int = 15
+    max_tick_speed: int = 300
+    # Limits guilds can set min-interval and max-interval to
+    tick_speed_limits: tuple[int, int] = (10, 3600)
     wait_ticks: int = 5
+    # Longest wait between contact attempts while server is down
+    max_wait_time: int = 3600
+    # Seconds server must be down before pinger hibernates
+    hibernate_after: int = 86400
+    # Fraction of tick delay that a status response from another
+    # guild watching the same server is still considered fresh for
+    share_ratio: float = 0.9
 
-    def __init__(self, bot: StatusBot, guild_id: int) -> None:
-        """Needs bot we work for, and id of guild we are pinging the server for."""
+    def __init__(
+        self,
+        bot: StatusBot,
+        guild_id: int,
+        start_delay: float = 0,
+    ) -> None:
+        """Needs bot we work for, and id of guild we are pinging the server for.
+
+        start_delay is seconds to wait before looking up server address.
+        """
         self.guild_id = guild_id
         super().__init__(bot, str(self.guild_id), self.tick_speed)
+        self.start_delay = start_delay
+        self.warming_up = True
+        self.interval = AdaptiveInterval(
+            self.tick_speed,
+            self.min_tick_speed,
+            self.max_tick_speed,
+        )
+        self.address: str | None = None
         self.server: mcstatus.JavaServer
+        self.server_key: str | None = None
         self.bot: StatusBot
-        self.last_json: dict[str, Any] = {}
+        self.last_status: StatusSnapshot | None = None
         self.last_delay: int | float = 0
         self.last_online: list[str] = []
         self.last_online_count: int = 0
         self.channel: discord.abc.Messageable
 
         self.add_state(PingState())
-        self.add_state(WaitRestartState(self.wait_ticks))
+        self.add_state(
+            WaitRestartState(
+                self.tick_speed * self.wait_ticks,
+                self.max_wait_time,
+                self.hibernate_after,
+            ),
+        )
 
     @property
-    def wait_time(self) -> int:
-        """Total wait time when in await_restart state."""
-        return self.tick_speed * self.wait_ticks
+    def wait_time(self) -> float:
+        """Seconds until next tick."""
+        return max(0.0, self.deadline - self.bot.loop.time())
+
+    @property
+    def share_age(self) -> float:
+        """Maximum age of shared ping registry results we will accept."""
+        return min(self.delay, self.tick_speed) * self.share_ratio
 
     async def initialize_state(self) -> None:
         """Set state to ping."""
         await self.set_state("ping")
 
+    def configure_interval(self, configuration: dict[str, Any]) -> None:
+        """Set adaptive interval bounds from guild configuration."""
+        low, high = self.tick_speed_limits
+        floor = configuration.get("min-interval", self.min_tick_speed)
+        ceiling = configuration.get("max-interval", self.max_tick_speed)
+        floor = min(max(floor, low), high)
+        ceiling = min(max(ceiling, floor), high)
+        self.interval = AdaptiveInterval(self.tick_speed, floor, ceiling)
+
+    def adapt_delay(self, changed: bool, online: int) -> None:
+        """Update tick delay from if players changed and online count."""
+        self.delay = self.interval.update(changed, online)
+
+    def retarget(self, server: mcstatus.JavaServer) -> None:
+        """Swap to newly resolved server without restarting."""
+        self.server = server
+        if self.server_key is None:
+            return
+        old_key = self.server_key
+        self.server_key = self.bot.ping_registry.subscribe(server)
+        self.bot.ping_registry.unsubscribe(old_key)
+
+    async def follow_server(self) -> None:
+        """Resolve address, then subscribe to registry and watch address."""
+        assert self.address is not None
+        self.server = await self.bot.resolver.resolve(self.address)
+        self.server_key = self.bot.ping_registry.subscribe(self.server)
+        self.bot.resolver.watch(self.address, self.retarget)
+
+    def unfollow_server(self) -> None:
+        """Stop watching address and unsubscribe from registry."""
+        if self.server_key is None:
+            return
+        assert self.address is not None
+        self.bot.resolver.unwatch(self.address, self.retarget)
+        self.bot.ping_registry.unsubscribe(self.server_key)
+        self.server_key = None
+
+    def hibernate(self) -> None:
+        """Stop ticking and following server until woken up by wake."""
+        super().hibernate()
+        self.unfollow_server()
+
+    async def tick(self) -> bool:
+        """Perform actions for pinger, first ping limited by bot warmup limit."""
+        if self.server_key is None and self.address is not None:
+            # Woken up from hibernation, address might point somewhere new
+            try:
+                await self.follow_server()
+            except Exception:  # pylint: disable=broad-except
+                self.hibernate()
+                with contextlib.suppress(discord.errors.Forbidden):
+                    await self.channel.send(
+                        "Server is still unreachable, hibernating again.",
+                    )
+                return False
+        if self.warming_up:
+            self.warming_up = False
+            async with self.bot.warmup_limit:
+                return await super().tick()
+        return await super().tick()
+
     async def start(self) -> None:
         """If configuration is good, run."""
+        if self.start_delay > 0:
+            await self.sleep_until(self.bot.loop.time() + self.start_delay)
+            # Hault sets state and wakes us up early
+            if self.active_state is not None or self.bot.gear_close:
+                self.running = False
+                return
         configuration = self.bot.get_guild_configuration(self.guild_id)
         channel = self.bot.guess_guild_channel(self.guild_id)
         if channel is None:
@@ -696,10 +912,11 @@ class GuildServerPinger(gears.StateTimer):
             )
             await self.set_state("Hault")
             return
+        self.address = configuration["address"]
+        self.configure_interval(configuration)
         try:
-            self.server = await mcstatus.JavaServer.async_lookup(
-                configuration["address"],
-            )
+            async with self.bot.warmup_limit:
+                self.server = await self.bot.resolver.resolve(self.address)
         except Exception as exc:  # pylint: disable=broad-except
             error = pretty_exception_name(exc)
             with contextlib.suppress(ClientConnectorError):
@@ -715,11 +932,14 @@ class GuildServerPinger(gears.StateTimer):
                 await self.channel.send("Server pinger stopped.")
             await self.set_state("Hault")
             return
+        self.server_key = self.bot.ping_registry.subscribe(self.server)
+        self.bot.resolver.watch(self.address, self.retarget)
         try:
             await super().start()
         except Exception:  # pylint: disable=broad-except
-            log_active_exception(self.bot.logpath)
+            log_active_exception()
         finally:
+            self.unfollow_server()
             with contextlib.suppress(ClientConnectorError):
                 await self.channel.send("Server pinger stopped.")
             await self.set_state("Hault")
@@ -747,6 +967,9 @@ class PingState(statemachine.AsyncState[GuildServerPinger]):
         self.failures_in_row = 0
         self.machine.last_delay = math.inf
         self.machine.last_online.clear()
+        # Last status no longer matches last_online, process next one
+        self.machine.last_status = None
+        self.machine.delay = self.machine.interval.reset()
 
     async def handle_sample(self, players: list[str]) -> None:
         """Handle change in players by players sample."""
@@ -818,8 +1041,19 @@ class PingState(statemachine.AsyncState[GuildServerPinger]):
 
     async def do_actions(self) -> None:
         """Ping server. If failure, self.failed = True and if exceptions, save."""
+        assert self.machine.server_key is not None
+        if (
+            self.machine.last_status is not None
+            and not self.machine.last_online_count
+            and self.machine.bot.lag_monitor.shed()
+        ):
+            # Bot is overloaded and server was empty, try again next tick
+            return
         try:
-            response = await self.machine.server.async_status()
+            status = await self.machine.bot.ping_registry.status(
+                self.machine.server_key,
+                self.machine.share_age,
+            )
         except Exception as exc:  # pylint: disable=broad-except
             error = pretty_exception_name(exc)
             self.exit_ex = f"`A {error} Error Has Occored"
@@ -839,35 +1073,38 @@ class PingState(statemachine.AsyncState[GuildServerPinger]):
             self.failures_in_row += 1
             if not isinstance(exc, ignore):
                 self.failed = True
-                log_active_exception(self.machine.bot.logpath)
+                log_active_exception()
             else:
                 self.failed = self.failures_in_row >= self.fail_threshold
             return
         else:
             self.failures_in_row = 0
-        # TODO: Change this now that
-        # https://github.com/py-mine/mcstatus/pull/578
-        # was included in a release finally
-        json_data = decode_mods.process_response(response.raw)
-        ping = round(response.latency, 3)
+        self.machine.last_delay = status.latency
+        last_status = self.machine.last_status
+        if (
+            last_status is not None
+            and status.fingerprint == last_status.fingerprint
+        ):
+            # Nothing changed since last status, keep what we have
+            self.machine.adapt_delay(False, self.machine.last_online_count)
+            return
         # If success, get players.
-        self.machine.last_json = json_data
-        self.machine.last_delay = ping
+        self.machine.last_status = status
 
-        players: list[str] = []
-        online = 0
-
-        if "players" not in json_data:
+        if status.online is None:
             # Update last ping.
-            self.machine.last_online = players
+            self.machine.last_online = []
+            self.machine.adapt_delay(False, 0)
             return
 
-        if "online" in json_data["players"]:
-            online = json_data["players"]["online"]
-        if "sample" in json_data["players"]:
-            for player in json_data["players"]["sample"]:
-                if "name" in player:
-                    players.append(player["name"])
+        online = status.online
+        players = list(status.sample)
+
+        self.machine.adapt_delay(
+            online != self.machine.last_online_count
+            or players != self.machine.last_online,
+            online,
+        )
 
         if not players and online:
             await self.handle_count(online)
@@ -892,16 +1129,39 @@ class PingState(statemachine.AsyncState[GuildServerPinger]):
 
 
 class WaitRestartState(statemachine.AsyncState[GuildServerPinger]):
-    """State where we wait for server to restart."""
+    """State where we wait for server to restart.
+
+    Contact attempts back off exponentially, and once the server has
+    been down for long enough the pinger hibernates until woken up.
+    """
+
+    __slots__ = (
+        "backoff",
+        "hibernate_after",
+        "hibernated",
+        "outage_start",
+        "ping",
+        "success",
+    )
 
-    __slots__ = ("ignore_ticks", "ping", "success", "ticks")
+    def __init__(
+        self,
+        first_wait: float,
+        max_wait: float,
+        hibernate_after: float,
+    ) -> None:
+        """Initialize await_restart state.
 
-    def __init__(self, ignore_ticks: int) -> None:
-        """Initialize await_restart state."""
+        first_wait and max_wait are the first and longest seconds between
+        contact attempts, hibernate_after is seconds of outage before
+        hibernating.
+        """
         super().__init__("await_restart")
-        self.ignore_ticks = ignore_ticks
+        self.backoff = ExponentialBackoff(first_wait, max_wait)
+        self.hibernate_after = hibernate_after
+        self.hibernated = False
+        self.outage_start = 0.0
         self.success = False
-        self.ticks = 0
         self.ping: int | float = 0
 
     async def entry_actions(self) -> None:
@@ -915,14 +1175,21 @@ class WaitRestartState(statemachine.AsyncState[GuildServerPinger]):
         await self.machine.channel.send(
             "Connection to server has been lost." + extra,
         )
+        self.backoff.reset()
+        self.machine.delay = self.backoff.next_delay()
+        self.outage_start = self.machine.bot.loop.time()
+        self.hibernated = False
         self.success = False
-        self.ticks = 0
         self.ping = 0
 
     async def attempt_contact(self) -> bool:
         """Attempt to talk to server."""
+        assert self.machine.server_key is not None
         try:
-            self.ping = await self.machine.server.async_ping()
+            self.ping = await self.machine.bot.ping_registry.ping(
+                self.machine.server_key,
+                self.machine.share_age,
+            )
         except Exception:  # pylint: disable=broad-except  # noqa: S110
             pass
         else:
@@ -931,10 +1198,29 @@ class WaitRestartState(statemachine.AsyncState[GuildServerPinger]):
 
     async def do_actions(self) -> None:
         """Every once and a while try to talk to server again."""
-        self.ticks = (self.ticks + 1) % self.ignore_ticks
-
-        if self.ticks == 0:
-            self.success = await self.attempt_contact()
+        if self.machine.bot.lag_monitor.shed():
+            # Bot is overloaded, try again next tick
+            return
+        self.success = await self.attempt_contact()
+        if self.success:
+            return
+        outage = self.machine.bot.loop.time() - self.outage_start
+        if outage < self.hibernate_after:
+            self.machine.delay = self.backoff.next_delay()
+            return
+        # Down for a long time, stop pinging until someone asks
+        if self.hibernated:
+            message = "Server is still unreachable, hibernating again."
+        else:
+            message = (
+                f"Server has been unreachable for {format_time(int(outage))}, "
+                "hibernating. Use command `ping`, `online`, or `refresh` "
+                "to check again."
+            )
+        self.hibernated = True
+        self.machine.hibernate()
+        with contextlib.suppress(discord.errors.Forbidden):
+            await self.machine.channel.send(message)
 
     async def check_conditions(self) -> str | None:
         """If contact attempt was successfully, switch back to ping."""
@@ -959,10 +1245,24 @@ class WaitRestartState(statemachine.AsyncState[GuildServerPinger]):
 
 
 class StatusBot(
-    discord.Client,
+    discord.AutoShardedClient,
     gears.BaseBot,
 ):  # pylint: disable=too-many-public-methods,too-many-instance-attributes
-    """StatusBot needs prefix, event loop, and any arguments to pass to discord.Client."""
+    """StatusBot needs prefix, event loop, and any arguments to pass to discord.AutoShardedClient."""
+
+    # Maximum number of pingers doing DNS lookups or first pings at once
+    warmup_concurrency: int = 16
+    # Maximum number of guild evaluations sending messages at once
+    send_concurrency: int = 8
+    # Maximum random seconds added to staggered pinger start times
+    startup_jitter: float = 5
+    # Global budget of server requests per second, burst size, and
+    # maximum number of server requests in flight at once
+    ping_rate: float = 20
+    ping_burst: float = 40
+    max_pings_in_flight: int = 64
+    # Seconds between checks for repeated error summaries to log
+    error_summary_check: float = 60
 
     def __init__(
         self,
@@ -974,7 +1274,8 @@ class StatusBot(
     ) -> None:
         """Initialize StatusBot."""
         discord.client._loop = loop
-        discord.Client.__init__(
+        kwargs.setdefault("http_trace", discord_send_trace())
+        discord.AutoShardedClient.__init__(
             self,
             *args,
             intents=intents,
@@ -986,7 +1287,38 @@ class StatusBot(
         self.updating = Lock()
         self.prefix = prefix
         self.rootdir = os.path.dirname(os.path.abspath(__file__))
-        self.logpath = os.path.join(self.rootdir, "log.txt")
+        self.logpath = LOG_PATH
+        self.ping_budget = PingBudget(
+            self.loop,
+            self.ping_rate,
+            self.ping_burst,
+            self.max_pings_in_flight,
+        )
+        self.ping_workers: PingWorkerPool | None = None
+        if PING_WORKERS > 0:
+            self.ping_workers = PingWorkerPool(self.loop, PING_WORKERS)
+        self.lag_monitor = LagMonitor(self.loop)
+        self.ping_registry = PingRegistry(
+            self.loop,
+            self.ping_budget,
+            self.ping_workers,
+            self.lag_monitor,
+        )
+        self.resolver = ServerResolver(self.loop)
+        self.error_summary_handle: asyncio.TimerHandle | None = None
+        self.metrics_server: metrics.MetricsServer | None = None
+        if METRICS_PORT is not None:
+            self.metrics_server = metrics.MetricsServer(
+                metrics.registry,
+                int(METRICS_PORT),
+            )
+        metrics.gear_states.set_function(self.count_gear_states)
+        self.config_store = ConfigStore(
+            self.loop,
+            self.make_config_backend(),
+        )
+        self.warmup_limit = asyncio.Semaphore(self.warmup_concurrency)
+        self.send_limit = asyncio.Semaphore(self.send_concurrency)
         self.gcommands: dict[
             str,
             Callable[[discord.message.Message], Coroutine[Any, Any, Any]],
@@ -1019,8 +1351,12 @@ class StatusBot(
             "get-global-option": self.get_option__dm,
             "global-help": self.help_dm,
             "system-alert": self.system_alert,
+            "ping-budget": self.ping_budget_stats,
+            "top-errors": self.top_errors,
+            "state-timings": self.state_timings,
         }
         gears.BaseBot.__init__(self, self.loop)
+        self.add_transition_listener(self.count_transition)
 
         self.tree = discord.app_commands.CommandTree(self)
         for command_group, dm_only in (
@@ -1085,52 +1421,52 @@ class StatusBot(
         """Define wait for gears BaseBot."""
         await self.wait_until_ready()
 
-    def get_guild_configuration_file(self, guild_id: int) -> str:
-        """Return the path to the configuration json file for a certain guild."""
-        return os.path.join(
-            self.rootdir,
-            "config",
-            "guilds",
-            str(guild_id) + ".json",
-        )
+    def make_config_backend(self) -> ConfigBackend:
+        """Return configuration backend picked by CONFIG_BACKEND.
 
-    def get_dm_configuration_file(self) -> str:
-        """Return the path to the configuration file."""
-        return os.path.join(self.rootdir, "config", "dms.json")
+        The first time the sqlite backend is used, existing json
+        configuration files are copied into the new database.
+        """
+        configurationdir = os.path.join(self.rootdir, "config")
+        if CONFIG_BACKEND == "json":
+            return JsonBackend(configurationdir)
+        if CONFIG_BACKEND != "sqlite":
+            raise ValueError(
+                f"Unknown CONFIG_BACKEND {CONFIG_BACKEND!r}, "
+                'expected "json" or "sqlite"',
+            )
+        database = os.path.join(configurationdir, "configuration.db")
+        if not os.path.exists(database) and os.path.exists(configurationdir):
+            count = migrate_json_to_sqlite(configurationdir, database)
+            print(f"Migrated {count} json configuration files to {database}")
+        return SQLiteBackend(database)
+
+    @staticmethod
+    def get_guild_configuration_name(guild_id: int) -> str:
+        """Return name of configuration for a certain guild."""
+        return f"guilds/{guild_id}"
 
     def get_guild_configuration(self, guild_id: int) -> dict[str, Any]:
-        """Return a dictionary from the json read from guild configuration file."""
-        guildfile = self.get_guild_configuration_file(guild_id)
-        guildconfiguration = read_json(guildfile)
-        if guildconfiguration is None:
-            # Guild does not have configuration
-            # Therefore, create file for them
-            write_file(guildfile, "{}")
-            guildconfiguration = {}
-        return guildconfiguration
+        """Return a copy of guild configuration dictionary."""
+        name = self.get_guild_configuration_name(guild_id)
+        return self.config_store.get(name)
 
     def get_dm_configuration(self) -> dict[str, Any]:
-        """Return a dictionary from configuration file."""
-        dmfile = self.get_dm_configuration_file()
-        dmconfiguration = read_json(dmfile)
-        if dmconfiguration is None:
-            write_file(dmfile, "{}")
-            dmconfiguration = {}
-        return dmconfiguration
+        """Return a copy of dm configuration dictionary."""
+        return self.config_store.get("dms")
 
     def write_guild_configuration(
         self,
         guild_id: int,
         configuration: dict[str, Any],
     ) -> None:
-        """Write guild configuration file from configuration dictionary."""
-        guildfile = self.get_guild_configuration_file(guild_id)
-        write_file(guildfile, json.dumps(configuration, indent=2))
+        """Write guild configuration from configuration dictionary."""
+        name = self.get_guild_configuration_name(guild_id)
+        self.config_store.set(name, configuration)
 
     def write_dm_configuration(self, configuration: dict[str, Any]) -> None:
-        """Write configuration file from configuration dictionary."""
-        dmfile = self.get_dm_configuration_file()
-        write_file(dmfile, json.dumps(configuration, indent=2))
+        """Write dm configuration from configuration dictionary."""
+        self.config_store.set("dms", configuration)
 
     def guess_guild_channel(self, gid: int) -> discord.abc.Messageable | None:
         """Guess guild channel and return channel. Return None on failure."""
@@ -1175,20 +1511,29 @@ class StatusBot(
         self,
         gid: int,
         force_reset: bool = False,
+        start_delay: float = 0,
     ) -> str:
         """Create ping machine for guild if not exists.
 
-        Return 'started', 'restarted', or 'none'.
+        Return 'started', 'restarted', 'woken', or 'none'.
         """
         gear = self.get_gear(str(gid))
         if gear is None:
-            self.add_gear(GuildServerPinger(self, gid))
+            self.add_gear(GuildServerPinger(self, gid, start_delay))
             return "started"
+        if (
+            not force_reset
+            and gear.running
+            and isinstance(gear, gears.Timer)
+            and gear.hibernating
+        ):
+            gear.wake()
+            return "woken"
         if force_reset or not gear.running:
             if not gear.stopped:
                 await gear.hault()
             self.remove_gear(str(gid))
-            self.add_gear(GuildServerPinger(self, gid))
+            self.add_gear(GuildServerPinger(self, gid, start_delay))
             return "restarted"
         return "none"
 
@@ -1202,6 +1547,7 @@ class StatusBot(
         self,
         guild_id: int,
         force_reset: bool = False,
+        start_delay: float = 0,
     ) -> int:
         """(Re)Start guild machine if able or alert need of settings change."""
         guildconfiguration = self.get_guild_configuration(guild_id)
@@ -1211,47 +1557,90 @@ class StatusBot(
                 f"[eval_guild] Channel is None for guild {guild_id!r}, strange case.",
             )
             return guild_id
-        with contextlib.suppress(discord.errors.Forbidden):
-            if "channel" not in guildconfiguration:
-                await channel.send(
-                    "This is where I will post join-leave messages "
-                    "until an admin sets my `channel` option. "
-                    f"Set it with `{self.prefix} set-option channel <channel>`.",
-                )
-            if "address" in guildconfiguration:
-                action = await self.add_guild_pinger(guild_id, force_reset)
-                if action != "none":
-                    await channel.send(f"Server pinger {action}.")
-                else:
-                    await channel.send(
-                        "Server pinger is still running, non-critical configuration change.",
-                    )
+        messages = []
+        if "channel" not in guildconfiguration:
+            messages.append(
+                "This is where I will post join-leave messages "
+                "until an admin sets my `channel` option. "
+                f"Set it with `{self.prefix} set-option channel <channel>`.",
+            )
+        if "address" in guildconfiguration:
+            action = await self.add_guild_pinger(
+                guild_id,
+                force_reset,
+                start_delay,
+            )
+            if action != "none":
+                messages.append(f"Server pinger {action}.")
             else:
-                await channel.send(
-                    "Server address not set, pinger not started. "
-                    f"Please set it with `{self.prefix} set-option "
-                    "address <address>`.",
+                messages.append(
+                    "Server pinger is still running, non-critical configuration change.",
                 )
+        else:
+            messages.append(
+                "Server address not set, pinger not started. "
+                f"Please set it with `{self.prefix} set-option "
+                "address <address>`.",
+            )
+        async with self.send_limit:
+            with contextlib.suppress(discord.errors.Forbidden):
+                for text in messages:
+                    await channel.send(text)
         return guild_id
 
-    async def eval_guilds(self, force_reset: bool = False) -> list[int]:
-        """Evaluate all guilds. Return list of guild ids evaluated."""
-        ids = []
-        # register = []
-        for guild in self.guilds:
-            # register.append(self.register_commands(guild))
-            ids.append(self.eval_guild(guild.id, force_reset))
-        # await asyncio.gather(*register)
-        return await asyncio.gather(*ids)
+    async def eval_guilds(
+        self,
+        force_reset: bool = False,
+        shard_id: int | None = None,
+    ) -> list[int]:
+        """Evaluate all guilds. Return list of guild ids evaluated.
 
-    # Default, not affected by intents.
-    async def on_ready(self) -> None:
-        """Print information about bot and evaluate all guilds."""
-        print(f"{self.user} has connected to Discord!")
-        print(f"Prefix  : {self.prefix}")
-        print(f"Intents : {self.intents}")
-        print(f"Root Dir: {self.rootdir}")
+        If shard_id is given, only evaluate guilds on that shard.
 
+        Pinger start times are spread across one tick interval with
+        some jitter so restarting does not make every pinger look up
+        it's server and ping it in the same second.
+        """
+        guild_ids = [
+            guild.id
+            for guild in self.guilds
+            if shard_id is None or guild.shard_id == shard_id
+        ]
+        total = len(guild_ids)
+        if not total:
+            return []
+        spread = GuildServerPinger.tick_speed / total
+        report_every = max(1, total // 10)
+        finished = 0
+
+        async def evaluate(index: int, guild_id: int) -> int:
+            """Evaluate guild with staggered pinger start time."""
+            nonlocal finished
+            jitter = random.uniform(0, self.startup_jitter)  # noqa: S311
+            await self.eval_guild(
+                guild_id,
+                force_reset,
+                index * spread + jitter,
+            )
+            finished += 1
+            if finished % report_every == 0 or finished == total:
+                print(
+                    f"[eval_guilds] {finished}/{total} guilds evaluated"
+                    + ("" if shard_id is None else f" on shard {shard_id}"),
+                )
+            return guild_id
+
+        return await asyncio.gather(
+            *(evaluate(index, gid) for index, gid in enumerate(guild_ids)),
+        )
+
+    async def setup_hook(self) -> None:
+        """Make configuration folders and start lag monitor before connecting."""
+        self.lag_monitor.start()
+        self.summarize_errors()
+        if self.metrics_server is not None:
+            await self.metrics_server.start()
+            print(f"Serving metrics at {self.metrics_server!r}")
         configurationdir = os.path.join(self.rootdir, "config")
         if not os.path.exists(configurationdir):  # noqa: ASYNC240
             os.mkdir(configurationdir)
@@ -1259,21 +1648,91 @@ class StatusBot(
         if not os.path.exists(guilddir):  # noqa: ASYNC240
             os.mkdir(guilddir)
 
-        print(f"\n{self.user} is connected to the following guilds:\n")
-        guildnames = []
-        for guild in self.guilds:
-            guildnames.append(f"{guild.name} (id: {guild.id})")
-        spaces = max(len(name) for name in guildnames)
+    def record_tick_lateness(self, timer: gears.Timer, seconds: float) -> None:
+        """Record how late timer tick started for metrics."""
+        metrics.tick_lateness.observe(seconds)
+
+    def count_gear_states(self) -> dict[tuple[str, ...], float]:
+        """Return number of gears by state name for metrics."""
+        counts: dict[tuple[str, ...], float] = {}
+        for gear in self.gears.values():
+            state = "none"
+            if isinstance(gear, gears.StateTimer) and gear.active_state:
+                state = gear.active_state.name
+            counts[(state,)] = counts.get((state,), 0) + 1
+        return counts
+
+    @staticmethod
+    def count_transition(
+        machine: statemachine.BaseStateMachine,
+        old_name: str | None,
+        new_name: str | None,
+        timestamp: float,
+    ) -> None:
+        """Count gear state change for metrics."""
+        metrics.gear_transitions.inc(str(old_name), str(new_name))
+
+    def summarize_errors(self) -> None:
+        """Log summaries of repeated errors that are due, check again later."""
+        logs.errors.log_summaries()
+        self.error_summary_handle = self.loop.call_later(
+            self.error_summary_check,
+            self.summarize_errors,
+        )
+
+    # Default, not affected by intents.
+    async def on_shard_ready(self, shard_id: int) -> None:
+        """Evaluate all guilds on shard that just became ready."""
+        guilds = [guild for guild in self.guilds if guild.shard_id == shard_id]
+        print(f"Shard {shard_id} is ready with {len(guilds)} guilds")
+
+        # Indexed lookup instead of loading every guild configuration
+        all_addresses = self.config_store.find("address")
+        addresses = []
+        for guild in guilds:
+            name = self.get_guild_configuration_name(guild.id)
+            if name in all_addresses:
+                addresses.append(all_addresses[name])
+        failed = await self.resolver.prewarm(
+            addresses,
+            self.warmup_concurrency,
+        )
         print(
-            "\n".join(name.rjust(spaces) for name in guildnames) + "\n",
+            f"Resolved {len(addresses)} server addresses for shard "
+            f"{shard_id}, {failed} failed\n",
         )
 
-        ids = await self.eval_guilds(True)
+        ids = await self.eval_guilds(True, shard_id)
 
-        print("Guilds evaluated:\n" + "\n".join([str(x) for x in ids]) + "\n")
+        print(
+            f"Guilds evaluated on shard {shard_id}:\n"
+            + "\n".join([str(x) for x in ids])
+            + "\n",
+        )
 
-        synced = await self.tree.sync()
-        print(f"{len(synced)} slash commands synced\n")
+    # Default, not affected by intents.
+    async def on_ready(self) -> None:
+        """Print information about bot once all local shards are ready."""
+        print(f"{self.user} has connected to Discord!")
+        print(f"Prefix  : {self.prefix}")
+        print(f"Intents : {self.intents}")
+        print(f"Root Dir: {self.rootdir}")
+        print(f"Shards  : {self.shard_ids} of {self.shard_count}")
+
+        print(f"\n{self.user} is connected to the following guilds:\n")
+        guildnames = []
+        for guild in self.guilds:
+            guildnames.append(f"{guild.name} (id: {guild.id})")
+        if guildnames:
+            spaces = max(len(name) for name in guildnames)
+            print(
+                "\n".join(name.rjust(spaces) for name in guildnames) + "\n",
+            )
+
+        # Commands are global, only one bot process needs to sync them
+        if self.shard_ids is None or 0 in self.shard_ids:
+            synced = await self.tree.sync()
+            print(f"{len(synced)} slash commands synced\n")
 
         act = discord.Activity(
             type=discord.ActivityType.watching,
@@ -1308,8 +1767,12 @@ class StatusBot(
     async def ensure_pinger_good(
         self,
         message: discord.message.Message,
+        wake: bool = False,
     ) -> GuildServerPinger | None:
-        """Return GuildServerPinger if pinger is working properly, else None."""
+        """Return GuildServerPinger if pinger is working properly, else None.
+
+        If wake is True and pinger is hibernating, wake it up.
+        """
         if message.guild is None:
             await message.channel.send(
                 "Message guild is `None`, this is an error."
@@ -1332,59 +1795,82 @@ class StatusBot(
             )
             return None
         if pinger.active_state.name != "ping":
-            delay = format_time(pinger.wait_time)
+            if wake and pinger.hibernating:
+                pinger.wake()
+                await message.channel.send(
+                    "Server has been unreachable for a long time, "
+                    "checking if it is back now. Try again in a moment.",
+                )
+                return None
+            if pinger.hibernating:
+                await message.channel.send(
+                    "Server has been unreachable for a long time, "
+                    "pinger is hibernating. Use command `ping`, `online`, "
+                    "or `refresh` to check again.",
+                )
+                return None
+            delay = format_time(math.ceil(pinger.wait_time))
             await message.channel.send(
                 f"Cannot connect to server at this time, try again in {delay}.",
             )
             return None
         return pinger
 
-    async def favicon(self, message: discord.message.Message) -> None:
-        """Post the favicon from this guild's server."""
+    async def ensure_status(
+        self,
+        message: discord.message.Message,
+    ) -> StatusSnapshot | None:
+        """Return last status of guild's server if pinger is good, else None."""
         pinger = await self.ensure_pinger_good(message)
         if pinger is None:
+            return None
+        if pinger.last_status is None:
+            await message.channel.send(
+                "No status has been received from this guild's server yet, "
+                "try again in a moment.",
+            )
+        return pinger.last_status
+
+    async def favicon(self, message: discord.message.Message) -> None:
+        """Post the favicon from this guild's server."""
+        status = await self.ensure_status(message)
+        if status is None:
             return
         assert message.guild is not None
 
-        if "favicon" not in pinger.last_json:
+        if status.favicon_hash is not None:
+            png = get_favicon(status.favicon_hash)
+            if png is None:
+                await message.channel.send(
+                    "Server favicon is no longer cached, "
+                    "try again after the next ping.",
+                )
+                return
+        elif status.favicon is not None:
+            # Favicon that could not be decoded when it was received
+            try:
+                png = decode_favicon(status.favicon)
+            except ValueError as exc:
+                await message.channel.send(str(exc))
+                return
+        else:
             await message.channel.send(
                 "Server does not have a favicon. "
                 + "Ask the server owner to add one!",
             )
             return
-        favicon_data: str = pinger.last_json["favicon"]
-        if not favicon_data.startswith("data:image/png;base64,"):
-            await message.channel.send(
-                "Server favicon is not encoded properly.",
-            )
-            return
-        favicon_data = favicon_data.split(",")[1]
-        try:
-            file_handle = io.BytesIO(base64.b64decode(favicon_data))
-        except binascii.Error:
-            await message.channel.send(
-                "Encountered error decoding base64 string for favicon.",
-            )
-            return
+        file_handle = io.BytesIO(png)
         file = discord.File(file_handle, filename=f"{message.guild.id}.png")
         await message.channel.send(file=file)
         file_handle.close()
 
     async def json(self, message: discord.message.Message) -> None:
         """Post the last json message from this guild's server."""
-        pinger = await self.ensure_pinger_good(message)
-        if pinger is None:
+        status = await self.ensure_status(message)
+        if status is None:
             return
 
-        lastdict = pinger.last_json
-        if "favicon" in lastdict:
-            lastdict["favicon"] = "<base64 image data>"
-        if "channels" in lastdict.get("forgeData", {}):
-            lastdict["forgeData"]["channels"] = {
-                ":".join(k): v
-                for k, v in lastdict["forgeData"]["channels"].items()
-            }
-        msg = json.dumps(lastdict, sort_keys=True, indent=2)
+        msg = status.to_json()
         await send_over_2000(
             message.channel.send,  # type: ignore
             msg,
@@ -1395,7 +1881,7 @@ class StatusBot(
 
     async def ping(self, message: discord.message.Message) -> None:
         """Post the connection latency to this guild's server."""
-        pinger = await self.ensure_pinger_good(message)
+        pinger = await self.ensure_pinger_good(message, wake=True)
         if pinger is None:
             return
 
@@ -1407,17 +1893,17 @@ class StatusBot(
 
     async def forge_mods(self, message: discord.message.Message) -> None:
         """Get a list of forge mods from this guild's server if it's modded."""
-        pinger = await self.ensure_pinger_good(message)
-        if pinger is None:
+        status = await self.ensure_status(message)
+        if status is None:
             return
 
-        if "forgeData" not in pinger.last_json:
+        forge_data = status.forge
+        if forge_data is None:
             await message.channel.send(
                 f"There was no forge data in {__title__}'s "
                 "last received json message from this guild's server.",
             )
             return
-        forge_data = pinger.last_json["forgeData"]
         if "mods" not in forge_data:  # or not 'channels' in forge_data
             await message.channel.send(
                 "Error: Forge data response is missing "
@@ -1426,10 +1912,12 @@ class StatusBot(
             return
 
         #     channels = forge_data['channels']
-        mods: dict[str, str] | list[dict[str, str]] = forge_data["mods"]
+        mods: Mapping[str, str] | Sequence[Mapping[str, str]] = forge_data[
+            "mods"
+        ]
 
         mod_data: list[dict[str, str]] = []
-        if isinstance(mods, dict):
+        if isinstance(mods, Mapping):
             for name, version in mods.items():
                 #         required = True
                 #         if version == '<not required for client>':
@@ -1441,8 +1929,9 @@ class StatusBot(
                     #             'required': required
                 }
                 mod_data.append(mod_item)
-        elif isinstance(mods, list):
-            mod_data = mods
+        else:
+            # Older forge response format, read only list of mappings
+            mod_data = [dict(mod) for mod in mods]
 
         msg = json.dumps(mod_data, sort_keys=True, indent=2)
         await send_over_2000(
@@ -1455,7 +1944,7 @@ class StatusBot(
 
     async def online(self, message: discord.message.Message) -> None:
         """Get the players currently connected to this guild's server."""
-        pinger = await self.ensure_pinger_good(message)
+        pinger = await self.ensure_pinger_good(message, wake=True)
         if pinger is None:
             return
 
@@ -1500,6 +1989,94 @@ class StatusBot(
             "You do not have permission to run this command.",
         )
 
+    async def ping_budget_stats(
+        self,
+        message: discord.message.Message,
+    ) -> None:
+        """Tell bot owner how often server requests are delayed by budget."""
+        if message.author.id != OWNER_ID:
+            await message.channel.send(
+                "You do not have permission to run this command.",
+            )
+            return
+        stats = self.ping_budget.stats()
+        lines = "\n".join(f"{name}: {value}" for name, value in stats.items())
+        await message.channel.send(
+            f"Ping budget of {self.ping_rate} requests per second, "
+            f"{self.max_pings_in_flight} in flight:\n```\n{lines}\n```",
+        )
+
+    async def top_errors(self, message: discord.message.Message) -> None:
+        """Tell bot owner which errors have happened most often."""
+        if message.author.id != OWNER_ID:
+            await message.channel.send(
+                "You do not have permission to run this command.",
+            )
+            return
+        top = logs.errors.top()
+        if not top:
+            await message.channel.send("No errors have been logged.")
+            return
+        now = time.monotonic()
+        lines = [
+            f"{digest} {entry.total}x {entry.name} at {entry.location}, "
+            f"last {format_time(max(1, int(now - entry.last_seen)))} ago: "
+            f"{entry.message[:100]}"
+            for digest, entry in top
+        ]
+        await send_over_2000(
+            message.channel.send,  # type: ignore
+            "\n".join(lines),
+            "\n",
+            "```",
+            start="Most frequent errors:\n",
+        )
+
+    async def state_timings(
+        self,
+        message: discord.message.Message,
+        action: str | None = None,
+    ) -> None:
+        """Turn on or off or show gear state timings (on/off/nothing)."""
+        if message.author.id != OWNER_ID:
+            await message.channel.send(
+                "You do not have permission to run this command.",
+            )
+            return
+        if action is not None:
+            action = action.lower()
+        if action == "on":
+            if self.machine_listener is None:
+                self.set_machine_listener(statemachine.StateTimings())
+            await message.channel.send("State timings are on.")
+            return
+        if action == "off":
+            self.set_machine_listener(None)
+            await message.channel.send("State timings are off.")
+            return
+        if action is not None:
+            await message.channel.send(
+                f"Unknown action {action!r}, expected `on` or `off`.",
+            )
+            return
+        timings = self.machine_listener
+        if not isinstance(timings, statemachine.StateTimings):
+            await message.channel.send(
+                "State timings are off. Use `state-timings on` to record them.",
+            )
+            return
+        lines = timings.report()
+        if not lines:
+            await message.channel.send("No state timings recorded yet.")
+            return
+        await send_over_2000(
+            message.channel.send,  # type: ignore
+            "\n".join(lines),
+            "\n",
+            "```",
+            start="Gear state timings:\n",
+        )
+
     async def send_guild_system_alert(
         self,
         guild_id: int,
@@ -1640,7 +2217,7 @@ class StatusBot(
                         await message.channel.send(
                             "Could not read file list. Aborting update.",
                         )
-                        log_active_exception(self.logpath)
+                        log_active_exception()
                         return
                     # Get max amount of time this could take.
                     maxtime = format_time(timeout * len(paths))
@@ -1857,6 +2434,8 @@ class StatusBot(
                 "address",
                 "channel",
                 "force-refresh-users",
+                "min-interval",
+                "max-interval",
             ]
         # If not, if set option users is defined in configuration,
         # and if message author is allowed to set options,
@@ -1865,7 +2444,13 @@ class StatusBot(
             and user_id in configuration["set-option-users"]
         ):
             # give them access to almost everything.
-            valid += ["address", "channel", "force-refresh-users"]
+            valid += [
+                "address",
+                "channel",
+                "force-refresh-users",
+                "min-interval",
+                "max-interval",
+            ]
         return valid
 
     async def set_option__guild_option_autocomplete(
@@ -1952,7 +2537,7 @@ class StatusBot(
         new_value: str | None = None,
     ) -> None:
         """Set a guild configuration option."""
-        value: list[int] | list[str] | str | None = new_value
+        value: list[int] | list[str] | str | int | None = new_value
         if message.guild is None:
             await message.channel.send(
                 "Message guild is `None`, this is an error. "
@@ -2005,6 +2590,14 @@ class StatusBot(
                 ),
                 "set-option-users": base + "set option permission list.",
                 "force-refresh-users": base + "force reset permission list.",
+                "min-interval": (
+                    "Shortest number of seconds between pings "
+                    "while players are joining and leaving."
+                ),
+                "max-interval": (
+                    "Longest number of seconds between pings "
+                    "while the server is empty."
+                ),
             }
             msg += "\nArgument required: " + arghelp[option]
             await message.channel.send(msg)
@@ -2019,6 +2612,15 @@ class StatusBot(
             if value not in channelnames:
                 await message.channel.send("Channel not found in this guild.")
                 return
+        elif option in {"min-interval", "max-interval"}:
+            low, high = GuildServerPinger.tick_speed_limits
+            if not str(value).isdigit() or not low <= int(str(value)) <= high:
+                await message.channel.send(
+                    "Interval must be a whole number of seconds "
+                    f"from {low} to {high}.",
+                )
+                return
+            value = int(str(value))
         elif option in {"set-option-users", "force-refresh-users"}:
             if str(value).lower() == "clear":
                 value = []
@@ -2062,7 +2664,7 @@ class StatusBot(
                         )
                         return
                     value = configuration[option] + value
-                assert value is not None
+                assert isinstance(value, list)
                 await message.channel.send(
                     f"Adding user `{name}` (id `{value[-1]}`)",
                 )
@@ -2071,7 +2673,12 @@ class StatusBot(
         await message.channel.send(
             f"Updated value of option `{option}` to `{value}`.",
         )
-        force_reset = option in ("address", "channel")
+        force_reset = option in (
+            "address",
+            "channel",
+            "min-interval",
+            "max-interval",
+        )
         await self.refresh(message, force_reset)
 
     @staticmethod
@@ -2298,7 +2905,7 @@ class StatusBot(
         try:
             command_args = process_arguments(params, args[2:], message)
         except ValueError:
-            log_active_exception(self.logpath)
+            log_active_exception()
             names = combine_end(
                 [
                     (
@@ -2315,25 +2922,32 @@ class StatusBot(
             return
 
         # If command is valid, run it.
-        await command_func(message, **command_args)
+        metrics.commands.inc(command)
+        start = time.perf_counter()
+        try:
+            await command_func(message, **command_args)
+        finally:
+            metrics.command_latency.observe(
+                time.perf_counter() - start,
+                command,
+            )
 
     # Intents.guilds
     async def on_guild_join(self, guild: discord.guild.Guild) -> None:
         """Evaluate guild."""
-        msg = f"Guild gained: {guild.name} (id: {guild.id})"
-        print(msg)
-        append_file(self.logpath, "#" * 8 + msg + "#" * 8 + "\n")
+        logs.logger.info("Guild gained: %s (id: %s)", guild.name, guild.id)
         # await self.register_commands(guild)
         await self.eval_guild(guild.id, True)
 
     # Intents.guilds
     async def on_guild_remove(self, guild: discord.guild.Guild) -> None:
         """Remove configuration file for guild we are no longer in."""
-        msg = f"""Guild lost: {guild.name} (id: {guild.id})
-Deleting guild settings"""
-        print(msg)
-        append_file(self.logpath, "#" * 8 + msg + "#" * 8 + "\n")
-        os.remove(self.get_guild_configuration_file(guild.id))
+        logs.logger.info(
+            "Guild lost: %s (id: %s), deleting guild settings",
+            guild.name,
+            guild.id,
+        )
+        self.config_store.delete(self.get_guild_configuration_name(guild.id))
         gear = self.get_gear(str(guild.id))
         if gear is not None:
             if not gear.stopped:
@@ -2397,14 +3011,23 @@ Deleting guild settings"""
             "Error args:\n" + "\n".join(map(str, args)) + "\nError kwargs:\n"
         )
         extra += "\n".join(f"{key}:{val}" for key, val in kwargs.items())
-        log_active_exception(self.logpath, extra=extra)
+        log_active_exception(extra=extra)
 
     # Default, not affected by intents
     async def close(self) -> None:
         """Tell guilds bot shutting down."""
         self.stopped.set()
+        self.lag_monitor.stop()
+        if self.error_summary_handle is not None:
+            self.error_summary_handle.cancel()
+            self.error_summary_handle = None
+        logs.errors.log_summaries(force=True)
+        if self.metrics_server is not None:
+            await self.metrics_server.stop()
         print("\nShutting down gears.")
         await gears.BaseBot.close(self)
+        if self.ping_workers is not None:
+            self.ping_workers.close()
         print("\nGears shut down...\n")
 
         # Telling guilds bot is shutting down.\n')
@@ -2425,8 +3048,10 @@ Deleting guild settings"""
         while self.updating.locked():
             print("Mid update, waiting for complete...")
             await asyncio.sleep(1)
+        print("Saving configuration...")
+        await self.config_store.close()
         print("Closing...")
-        await discord.Client.close(self)
+        await discord.AutoShardedClient.close(self)
 
 
 def setup_bot(
@@ -2456,10 +3081,19 @@ or set DISCORD_TOKEN environment variable.""",
 
     bot_run_task: asyncio.Task[None] | None = None
 
+    shard_kwargs: dict[str, Any] = {}
+    if SHARD_COUNT is not None:
+        shard_kwargs["shard_count"] = int(SHARD_COUNT)
+    if SHARD_IDS is not None:
+        shard_kwargs["shard_ids"] = [
+            int(shard_id) for shard_id in SHARD_IDS.split(",")
+        ]
+
     bot = StatusBot(
         BOT_PREFIX,
         loop=loop,
         intents=intents,
+        **shard_kwargs,
     )
 
     bot_run_task = loop.create_task(bot.start(TOKEN))
@@ -2472,6 +3106,13 @@ def run() -> None:
     """Run bot."""
     print("\nStarting bot...")
 
+    listener = logs.setup_logging(
+        LOG_PATH,
+        LOG_MAX_BYTES,
+        LOG_BACKUPS,
+        LOG_ROTATE_WHEN,
+    )
+
     loop = asyncio.new_event_loop()
 
     bot, bot_run_task = setup_bot(loop)
@@ -2484,6 +3125,7 @@ def run() -> None:
     finally:
         # cancel all lingering tasks
         loop.close()
+        logs.stop_logging(listener)
         print("\nBot has been deactivated.")
 
 
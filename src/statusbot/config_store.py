@@ -0,0 +1,483 @@
+"""Config Store - In memory configuration with write-behind saving."""
+
+# Programmed by CoolCat467
+
+# Copyright 2025 CoolCat467
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+from __future__ import annotations
+
+__title__ = "Config Store"
+__author__ = "CoolCat467"
+__license__ = "Apache License 2.0"
+__version__ = "0.0.0"
+
+import contextlib
+import copy
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from typing import TYPE_CHECKING, Any, Protocol
+
+from statusbot import metrics
+from statusbot.utils import pretty_exception_name
+
+if TYPE_CHECKING:
+    import asyncio
+
+__all__ = [
+    "ConfigBackend",
+    "ConfigStore",
+    "JsonBackend",
+    "SQLiteBackend",
+    "load_json",
+    "migrate_json_to_sqlite",
+    "write_atomic",
+]
+
+
+def load_json(filename: str) -> dict[str, Any] | None:
+    """Return json loaded from file, or None if missing or invalid."""
+    try:
+        with open(filename, encoding="utf-8") as rfile:
+            data = json.load(rfile)
+    except (FileNotFoundError, json.decoder.JSONDecodeError):
+        return None
+    if not isinstance(data, dict):
+        return None
+    return data
+
+
+def write_atomic(filename: str, data: str) -> None:
+    """Write data to file by writing temporary file and renaming it over.
+
+    Readers see either the old or the new contents, never a partial write.
+    """
+    directory = os.path.dirname(os.path.abspath(filename))
+    os.makedirs(directory, exist_ok=True)
+    handle, temp_name = tempfile.mkstemp(
+        prefix=os.path.basename(filename) + ".",
+        suffix=".tmp",
+        dir=directory,
+    )
+    try:
+        with os.fdopen(handle, "w", encoding="utf-8") as wfile:
+            wfile.write(data)
+            wfile.flush()
+            os.fsync(wfile.fileno())
+        os.replace(temp_name, filename)
+    except BaseException:
+        os.unlink(temp_name)
+        raise
+
+
+def _remove(filename: str) -> None:
+    """Remove file if it exists."""
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(filename)
+
+
+class ConfigBackend(Protocol):
+    """Storage for configuration dictionaries by name, like "guilds/1234"."""
+
+    def load(self, name: str) -> dict[str, Any] | None:
+        """Return configuration with name, or None if there is none."""
+
+    def save(self, changes: list[tuple[str, str | None]]) -> list[str]:
+        """Save json text of names, removing names with None.
+
+        Return names that failed to save.
+        """
+
+    def find(self, key: str) -> dict[str, Any]:
+        """Return dictionary of name to value for configurations with key."""
+
+    def close(self) -> None:
+        """Release any resources."""
+
+
+class JsonBackend:
+    """Configuration stored as one json file per name under root folder."""
+
+    __slots__ = ("root",)
+
+    def __init__(self, root: str) -> None:
+        """Initialize with root folder."""
+        self.root = root
+
+    def __repr__(self) -> str:
+        """Return representation of self."""
+        return f"{self.__class__.__name__}({self.root!r})"
+
+    def path(self, name: str) -> str:
+        """Return path of json file for name."""
+        return os.path.join(self.root, *name.split("/")) + ".json"
+
+    def names(self) -> list[str]:
+        """Return names of all json files under root folder."""
+        names = []
+        for dirpath, _dirnames, filenames in os.walk(self.root):
+            relative = os.path.relpath(dirpath, self.root)
+            for filename in filenames:
+                if not filename.endswith(".json"):
+                    continue
+                name = os.path.join(relative, filename[:-5])
+                names.append(os.path.normpath(name).replace(os.sep, "/"))
+        return sorted(names)
+
+    def load(self, name: str) -> dict[str, Any] | None:
+        """Return configuration with name, or None if there is none."""
+        return load_json(self.path(name))
+
+    def save(self, changes: list[tuple[str, str | None]]) -> list[str]:
+        """Save json text of names, removing names with None.
+
+        Return names that failed to save.
+        """
+        failed = []
+        for name, text in changes:
+            try:
+                if text is None:
+                    _remove(self.path(name))
+                else:
+                    write_atomic(self.path(name), text)
+            except OSError as exc:
+                print(
+                    f"[{self.__class__.__name__}] Saving {name!r} "
+                    f"failed: {pretty_exception_name(exc)}",
+                )
+                failed.append(name)
+        return failed
+
+    def find(self, key: str) -> dict[str, Any]:
+        """Return dictionary of name to value for configurations with key.
+
+        Has to read every file.
+        """
+        found = {}
+        for name in self.names():
+            data = self.load(name)
+            if data is not None and key in data:
+                found[name] = data[key]
+        return found
+
+    def close(self) -> None:
+        """Nothing to release."""
+
+
+class SQLiteBackend:
+    """Configuration stored as rows of a single SQLite database.
+
+    Values of indexed keys are copied into their own indexed columns,
+    so finding configurations with them does not read every row.
+    """
+
+    __slots__ = ("connection", "filename", "lock")
+
+    indexed_keys: tuple[str, ...] = ("address", "channel")
+
+    def __init__(self, filename: str) -> None:
+        """Initialize with database filename, creating tables if needed."""
+        self.filename = filename
+        directory = os.path.dirname(os.path.abspath(filename))
+        os.makedirs(directory, exist_ok=True)
+        # Used from the event loop thread and from executor threads
+        self.connection = sqlite3.connect(filename, check_same_thread=False)
+        self.lock = threading.Lock()
+        columns = "".join(f", {key} TEXT" for key in self.indexed_keys)
+        with self.lock, self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS configuration "
+                f"(name TEXT PRIMARY KEY, data TEXT NOT NULL{columns})",
+            )
+            for key in self.indexed_keys:
+                self.connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS configuration_{key} "
+                    f"ON configuration ({key}) WHERE {key} IS NOT NULL",
+                )
+
+    def __repr__(self) -> str:
+        """Return representation of self."""
+        return f"{self.__class__.__name__}({self.filename!r})"
+
+    def load(self, name: str) -> dict[str, Any] | None:
+        """Return configuration with name, or None if there is none."""
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT data FROM configuration WHERE name = ?",
+                (name,),
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            data = json.loads(row[0])
+        except json.decoder.JSONDecodeError:
+            return None
+        if not isinstance(data, dict):
+            return None
+        return data
+
+    def _row(self, name: str, text: str) -> tuple[str | None, ...]:
+        """Return row values for json text of name."""
+        data = json.loads(text)
+        indexed = (
+            json.dumps(data[key]) if key in data else None
+            for key in self.indexed_keys
+        )
+        return (name, text, *indexed)
+
+    def save(self, changes: list[tuple[str, str | None]]) -> list[str]:
+        """Save json text of names, removing names with None.
+
+        All changes are saved in one transaction.
+        Return names that failed to save.
+        """
+        placeholders = ", ".join(
+            "?" for _ in range(len(self.indexed_keys) + 2)
+        )
+        try:
+            with self.lock, self.connection:
+                for name, text in changes:
+                    if text is None:
+                        self.connection.execute(
+                            "DELETE FROM configuration WHERE name = ?",
+                            (name,),
+                        )
+                    else:
+                        self.connection.execute(
+                            "INSERT OR REPLACE INTO configuration "  # noqa: S608
+                            f"VALUES ({placeholders})",
+                            self._row(name, text),
+                        )
+        except sqlite3.Error as exc:
+            print(
+                f"[{self.__class__.__name__}] Saving {len(changes)} "
+                f"configurations failed: {pretty_exception_name(exc)}",
+            )
+            return [name for name, _text in changes]
+        return []
+
+    def find(self, key: str) -> dict[str, Any]:
+        """Return dictionary of name to value for configurations with key."""
+        if key not in self.indexed_keys:
+            # Not indexed, have to read every row
+            with self.lock:
+                rows = self.connection.execute(
+                    "SELECT name, data FROM configuration",
+                ).fetchall()
+            found = {}
+            for name, text in rows:
+                data = json.loads(text)
+                if key in data:
+                    found[name] = data[key]
+            return found
+        with self.lock:
+            rows = self.connection.execute(
+                f"SELECT name, {key} FROM configuration "  # noqa: S608
+                f"WHERE {key} IS NOT NULL",
+            ).fetchall()
+        return {name: json.loads(value) for name, value in rows}
+
+    def close(self) -> None:
+        """Close database connection."""
+        with self.lock:
+            self.connection.close()
+
+
+def migrate_json_to_sqlite(root: str, database: str) -> int:
+    """Copy every json configuration under root folder into new database.
+
+    The database is built in a temporary file and only moved into
+    place once everything was copied, so a failed migration never
+    leaves a half filled database behind.
+    Return number of configurations copied.
+    """
+    if os.path.exists(database):
+        raise FileExistsError(f"Database {database!r} already exists")
+    directory = os.path.dirname(os.path.abspath(database))
+    os.makedirs(directory, exist_ok=True)
+    handle, temporary = tempfile.mkstemp(
+        suffix=".db",
+        prefix=".migrating-",
+        dir=directory,
+    )
+    os.close(handle)
+    try:
+        source = JsonBackend(root)
+        target = SQLiteBackend(temporary)
+        try:
+            changes: list[tuple[str, str | None]] = []
+            for name in source.names():
+                data = source.load(name)
+                if data is not None:
+                    changes.append((name, json.dumps(data, indent=2)))
+            failed = target.save(changes)
+        finally:
+            target.close()
+        if failed:
+            raise RuntimeError(
+                f"Migrating {len(failed)} configurations failed",
+            )
+        os.replace(temporary, database)
+    except BaseException:
+        for filename in (temporary, f"{temporary}-wal", f"{temporary}-shm"):
+            with contextlib.suppress(OSError):
+                os.remove(filename)
+        raise
+    return len(changes)
+
+
+class ConfigStore:
+    """Cache of configuration from a backend, saving changes in the background.
+
+    Each configuration is loaded from the backend the first time it is
+    asked for and served from memory after that. Changes are saved
+    flush_delay seconds after they are made, so several changes in a
+    row are written once, and saving happens in a worker thread so the
+    event loop never waits on the disk.
+    """
+
+    __slots__ = ("backend", "cache", "dirty", "flusher", "handle", "loop")
+
+    # Seconds to wait after a change before saving it
+    flush_delay: float = 2
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        backend: ConfigBackend,
+    ) -> None:
+        """Initialize with event loop, backend, and empty cache."""
+        self.loop = loop
+        self.backend = backend
+        self.cache: dict[str, dict[str, Any]] = {}
+        # Names that need saving, or removing if not in cache
+        self.dirty: set[str] = set()
+        self.handle: asyncio.TimerHandle | None = None
+        self.flusher: asyncio.Task[None] | None = None
+
+    def __repr__(self) -> str:
+        """Return representation of self."""
+        return (
+            f"<{self.__class__.__name__} {len(self.cache)} cached, "
+            f"{len(self.dirty)} unsaved>"
+        )
+
+    def get(self, name: str) -> dict[str, Any]:
+        """Return copy of configuration with name.
+
+        Missing configurations are created empty.
+        """
+        data = self.cache.get(name)
+        metrics.config_lookups.inc("miss" if data is None else "hit")
+        if data is None:
+            # If removal is pending, don't read old contents
+            loaded = None if name in self.dirty else self.backend.load(name)
+            if loaded is None:
+                loaded = {}
+                self._mark_dirty(name)
+            self.cache[name] = loaded
+            data = loaded
+        return copy.deepcopy(data)
+
+    def set(self, name: str, configuration: dict[str, Any]) -> None:
+        """Replace configuration with name, saving it soon."""
+        self.cache[name] = copy.deepcopy(configuration)
+        self._mark_dirty(name)
+
+    def delete(self, name: str) -> None:
+        """Forget configuration with name, removing it from backend soon."""
+        self.cache.pop(name, None)
+        self._mark_dirty(name)
+
+    def _mark_dirty(self, name: str) -> None:
+        """Remember name needs saving and schedule flush."""
+        self.dirty.add(name)
+        if self.handle is None and self.flusher is None:
+            self.handle = self.loop.call_later(
+                self.flush_delay,
+                self._start_flush,
+            )
+
+    def _start_flush(self) -> None:
+        """Start flushing in the background."""
+        self.handle = None
+        self.flusher = self.loop.create_task(self._flush_task())
+
+    async def _flush_task(self) -> None:
+        """Flush, then schedule again if there were changes meanwhile."""
+        try:
+            await self.flush()
+        finally:
+            self.flusher = None
+            if self.dirty and self.handle is None:
+                self.handle = self.loop.call_later(
+                    self.flush_delay,
+                    self._start_flush,
+                )
+
+    def _take_dirty(self) -> list[tuple[str, str | None]]:
+        """Return serialized changes to save and mark them clean."""
+        changes: list[tuple[str, str | None]] = []
+        for name in self.dirty:
+            data = self.cache.get(name)
+            text = None if data is None else json.dumps(data, indent=2)
+            changes.append((name, text))
+        self.dirty.clear()
+        return changes
+
+    async def flush(self) -> None:
+        """Save all changes in a worker thread."""
+        changes = self._take_dirty()
+        if not changes:
+            return
+        failed = await self.loop.run_in_executor(
+            None,
+            self.backend.save,
+            changes,
+        )
+        # Try saving failed names again next flush
+        self.dirty.update(failed)
+
+    def find(self, key: str) -> dict[str, Any]:
+        """Return dictionary of name to value for configurations with key.
+
+        Includes changes that have not been saved yet.
+        """
+        found = self.backend.find(key)
+        for name in self.dirty:
+            found.pop(name, None)
+        for name, data in self.cache.items():
+            if key in data:
+                found[name] = copy.deepcopy(data[key])
+            else:
+                found.pop(name, None)
+        return found
+
+    async def close(self) -> None:
+        """Save all changes right now and close backend."""
+        if self.flusher is not None:
+            await self.flusher
+        if self.handle is not None:
+            self.handle.cancel()
+            self.handle = None
+        await self.flush()
+        self.backend.close()
+
+
+if __name__ == "__main__":
+    print(f"{__title__}\nProgrammed by {__author__}.\n")
@@ -21,54 +21,162 @@ from __future__ import annotations
 __title__ = "Decode Mod Data"
 __author__ = "CoolCat467"
 __license__ = "Apache License 2.0"
-__version__ = "0.0.2"
+__version__ = "0.3.0"
 
 
-import io
+import hashlib
+import struct
+from collections.abc import Mapping
+from types import MappingProxyType
 from typing import TYPE_CHECKING, Any, cast
 
 from mcstatus._protocol.connection import Connection
 
+from statusbot import metrics
+from statusbot.utils import LRUCache
+
 if TYPE_CHECKING:
+    from collections.abc import Iterator
+
     from mcstatus.responses._raw import RawJavaResponse
 
+__all__ = [
+    "FORGE_CACHE_SIZE",
+    "ForgeReader",
+    "ForgeTables",
+    "ForgeView",
+    "cached_forge_tables",
+    "decode_forge_tables",
+    "decode_optimized",
+    "decode_optimized_bytes",
+    "forge_cache",
+    "process_response",
+]
+
+# Clear top bit of every byte, used to mask characters to 15 bits
+_LOW_7_BITS = bytes(value & 0x7F for value in range(256))
+
+
+def _lane_mask(lane_bytes: int, low_bytes: int, total: int) -> int:
+    """Return mask selecting low bytes of every lane in total bytes."""
+    lane = b"\xff" * low_bytes + b"\x00" * (lane_bytes - low_bytes)
+    return int.from_bytes(lane * (total // lane_bytes), "little")
+
+
+def decode_optimized_bytes(string: str) -> bytearray:
+    """Decode Forge's 15 bits per character encoding into bytes.
+
+    First two characters are the decoded size, the rest hold 15 bits of
+    data each, least significant bits first. Instead of shifting
+    characters in one at a time, the whole string is turned into one
+    integer with a character every 16 bits, then pairs of lanes are
+    squeezed together in three steps until every 128 bit lane holds
+    120 bits (15 bytes) of data, and the unused last byte of every lane
+    is deleted.
+    """
+    size = 0
+    if string:
+        size = ord(string[0])
+        if len(string) > 1:
+            size |= ord(string[1]) << 15
+    payload = string[2:]
+    count = len(payload)
+    # Decoding character by character emits every full byte seen before
+    # the last character, then continues until there are size bytes.
+    length = max(size, (15 * (count - 1)) // 8 if count else 0)
+    if not count:
+        return bytearray(length)
+
+    # Round up to groups of 8 characters (120 bits, 15 bytes)
+    payload += "\0" * (-count % 8)
+    # Low 16 bits of every character, little endian
+    wide = payload.encode("utf-32-le", "surrogatepass")
+    lanes = bytearray(len(wide) // 2)
+    lanes[0::2] = wide[0::4]
+    lanes[1::2] = wide[1::4].translate(_LOW_7_BITS)
+
+    total = len(lanes)
+    value = int.from_bytes(lanes, "little")
+    # Each step halves the number of lanes, moving the data of the high
+    # half of every lane down next to the data in the low half.
+    for lane_bytes, gap in ((4, 1), (8, 2), (16, 4)):
+        low = _lane_mask(lane_bytes, lane_bytes // 2, total)
+        value = (value & low) | ((value & ~low) >> gap)
+    result = bytearray(value.to_bytes(total, "little"))
+    del result[15::16]
+
+    if len(result) < length:
+        result.extend(bytes(length - len(result)))
+    else:
+        del result[length:]
+    return result
+
 
 def decode_optimized(string: str) -> Connection:
     """Decode buffer from string."""
-    text = io.StringIO(string)
+    buffer = Connection()
+    buffer.receive(decode_optimized_bytes(string))
+    return buffer
 
-    def read() -> int:
-        result = text.read(1)
-        if not result:
-            return 0
-        return ord(result)
 
-    size = read() | (read() << 15)
+class ForgeReader:
+    """Read Minecraft protocol values from a buffer without copying it."""
 
-    buffer = Connection()
-    value = 0
-    bits = 0
-    for _ in range(len(string) - 2):
-        while bits >= 8:
-            buffer.receive(
-                (value & 0xFF).to_bytes(
-                    length=1,
-                    byteorder="big",
-                    signed=False,
-                ),
-            )
-            value >>= 8
-            bits -= 8
-        value |= (read() & 0x7FFF) << bits
-        bits += 15
-
-    while buffer.remaining() < size:
-        buffer.receive(
-            (value & 0xFF).to_bytes(length=1, byteorder="big", signed=False),
+    __slots__ = ("position", "view")
+
+    def __init__(self, data: bytes | bytearray | memoryview) -> None:
+        """Initialize with buffer to read from."""
+        self.view = memoryview(data)
+        self.position = 0
+
+    def __repr__(self) -> str:
+        """Return representation of self."""
+        return (
+            f"<{self.__class__.__name__} "
+            f"{self.position}/{len(self.view)} bytes read>"
         )
-        value >>= 8
-        bits -= 8
-    return buffer
+
+    def remaining(self) -> int:
+        """Return number of bytes left to read."""
+        return len(self.view) - self.position
+
+    def read(self, length: int) -> memoryview:
+        """Return view of next length bytes."""
+        start = self.position
+        end = start + length
+        if length < 0 or end > len(self.view):
+            raise OSError(
+                f"Not enough data to read! {self.remaining()} < {length}",
+            )
+        self.position = end
+        return self.view[start:end]
+
+    def read_bool(self) -> bool:
+        """Return next byte as boolean."""
+        return self.read(1)[0] != 0
+
+    def read_ushort(self) -> int:
+        """Return next 2 bytes as big endian unsigned short."""
+        value: int = struct.unpack(">H", self.read(2))[0]
+        return value
+
+    def read_varint(self) -> int:
+        """Return next varint as signed 32 bit integer."""
+        result = 0
+        for index in range(5):
+            part = self.read(1)[0]
+            result |= (part & 0x7F) << (7 * index)
+            if not part & 0x80:
+                result &= 0xFFFFFFFF
+                if result & 0x80000000:
+                    result -= 1 << 32
+                return result
+        raise OSError("Received varint is too big!")
+
+    def read_utf(self) -> str:
+        """Return next varint length prefixed utf-8 string."""
+        length = self.read_varint()
+        return str(self.read(length), "utf-8")
 
 
 VERSION_FLAG_IGNORESERVERONLY = 0b1
@@ -76,22 +184,29 @@ VERSION_FLAG_IGNORESERVERONLY = 0b1
 IGNORESERVERONLY = "<not required for client>"
 
 
-def process_response(response: RawJavaResponse) -> dict[str, Any]:
-    """Decode encoded forgeData if present."""
-    data: dict[str, Any] = cast("dict[str, Any]", response)
+ForgeTables = tuple[
+    bool,
+    Mapping[str, str],
+    Mapping[tuple[str, str], tuple[str, bool]],
+]
 
-    if "forgeData" not in response:
-        return data
-    forge = data["forgeData"]
-    if "d" not in data:
-        return data
+# Decoded tables are shared by every server sending the same payload
+FORGE_CACHE_SIZE = 128
+forge_cache: LRUCache[bytes, ForgeTables] = LRUCache(FORGE_CACHE_SIZE)
 
-    buffer = decode_optimized(forge["d"])
+
+def decode_forge_tables(encoded: str) -> ForgeTables:
+    """Return truncated flag, mods, and channels from encoded forge data.
+
+    Mods and channels are read only, they are shared through the cache.
+    """
+    buffer = ForgeReader(decode_optimized_bytes(encoded))
 
     channels: dict[tuple[str, str], tuple[str, bool]] = {}
     # channels: dict[str, tuple[str, bool]] = {}
     mods: dict[str, str] = {}
 
+    truncated = False
     try:
         truncated = buffer.read_bool()
         mod_size = buffer.read_ushort()
@@ -134,16 +249,112 @@ def process_response(response: RawJavaResponse) -> dict[str, Any]:
                 "silently ignoring",
             )
         # Semi-expect errors if truncated
+    return truncated, MappingProxyType(mods), MappingProxyType(channels)
+
+
+def cached_forge_tables(encoded: str) -> ForgeTables:
+    """Return decoded forge tables, reusing them if payload was seen before.
+
+    Returned mappings are read only and shared.
+    """
+    key = hashlib.blake2b(
+        encoded.encode("utf-8", "surrogatepass"),
+        digest_size=16,
+    ).digest()
+    tables = forge_cache.get(key)
+    if tables is not None:
+        metrics.forge_cache_lookups.inc("hit")
+        return tables
+    metrics.forge_cache_lookups.inc("miss")
+    tables = decode_forge_tables(encoded)
+    forge_cache.put(key, tables)
+    return tables
+
+
+_DECODED_KEYS = ("truncated", "mods", "channels")
+
+
+class ForgeView(Mapping[str, Any]):
+    """Read only forgeData that is only decoded when first read.
+
+    Holds the encoded "d" payload and the other forgeData fields.
+    Reading "truncated", "mods", or "channels" decodes the payload
+    once through the shared forge cache and remembers the result.
+    Fields and decoded mappings are read only, decoded ones are shared.
+    """
+
+    __slots__ = ("_tables", "encoded", "fields")
+
+    def __init__(self, forge: dict[str, Any]) -> None:
+        """Initialize from raw forgeData with encoded "d" payload."""
+        self.encoded: str = forge["d"]
+        self.fields = MappingProxyType(
+            {
+                key: value
+                for key, value in forge.items()
+                if key != "d" and key not in _DECODED_KEYS
+            },
+        )
+        self._tables: ForgeTables | None = None
+
+    def __reduce__(self) -> tuple[type[ForgeView], tuple[dict[str, Any]]]:
+        """Pickle encoded payload only, it is decoded again if read."""
+        return (self.__class__, ({**self.fields, "d": self.encoded},))
+
+    def __repr__(self) -> str:
+        """Return representation of self."""
+        state = "decoded" if self.decoded else "encoded"
+        return (
+            f"<{self.__class__.__name__} {state} "
+            f"{len(self.encoded)} characters>"
+        )
+
+    @property
+    def decoded(self) -> bool:
+        """Whether payload has been decoded yet."""
+        return self._tables is not None
+
+    def tables(self) -> ForgeTables:
+        """Return truncated flag, mods, and channels, decoding if needed."""
+        if self._tables is None:
+            self._tables = cached_forge_tables(self.encoded)
+        return self._tables
+
+    def __getitem__(self, key: str) -> Any:
+        """Return field, decoding payload for decoded fields."""
+        if key in _DECODED_KEYS:
+            return self.tables()[_DECODED_KEYS.index(key)]
+        return self.fields[key]
+
+    def __contains__(self, key: object) -> bool:
+        """Return if field exists without decoding payload."""
+        return key in _DECODED_KEYS or key in self.fields
+
+    def __iter__(self) -> Iterator[str]:
+        """Return iterator over field names."""
+        yield from self.fields
+        yield from _DECODED_KEYS
+
+    def __len__(self) -> int:
+        """Return number of fields."""
+        return len(self.fields) + len(_DECODED_KEYS)
+
+
+def process_response(response: RawJavaResponse) -> dict[str, Any]:
+    """Replace encoded forgeData with a lazily decoded ForgeView.
+
+    No decoding happens here, mods and channels are decoded the first
+    time something reads them.
+    """
+    data: dict[str, Any] = cast("dict[str, Any]", response)
+
+    if "forgeData" not in response:
+        return data
+    forge = data["forgeData"]
+    if "d" not in forge:
+        return data
 
-    new_forge = {}
-    for k, v in forge.items():
-        if k == "d":
-            continue
-        new_forge[k] = v
-    new_forge["truncated"] = truncated
-    new_forge["mods"] = mods
-    new_forge["channels"] = channels
-    data["forgeData"] = new_forge
+    data["forgeData"] = ForgeView(forge)
     return data
 
 
@@ -0,0 +1,123 @@
+"""Favicons - Decoded server favicons shared by content hash."""
+
+# Programmed by CoolCat467
+
+# Copyright 2025 CoolCat467
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+from __future__ import annotations
+
+__title__ = "Favicons"
+__author__ = "CoolCat467"
+__license__ = "Apache License 2.0"
+__version__ = "0.1.0"
+
+import base64
+import binascii
+import hashlib
+from typing import Any
+
+__all__ = [
+    "PNG_PREFIX",
+    "decode_favicon",
+    "extract_favicon",
+    "favicon_cache",
+    "get_favicon",
+    "release_favicon",
+    "store_favicon",
+]
+
+PNG_PREFIX = "data:image/png;base64,"
+
+# Decoded pngs by hash, kept while any watched server still uses them
+favicon_cache: dict[str, bytes] = {}
+# Number of watched servers using each favicon in the cache
+favicon_references: dict[str, int] = {}
+
+
+def decode_favicon(favicon: str) -> bytes:
+    """Return png bytes from favicon data URI.
+
+    Raises ValueError if favicon is not a base64 encoded png.
+    """
+    if not favicon.startswith(PNG_PREFIX):
+        raise ValueError("Server favicon is not encoded properly.")
+    try:
+        return base64.b64decode(favicon[len(PNG_PREFIX) :])
+    except binascii.Error as exc:
+        raise ValueError(
+            "Encountered error decoding base64 string for favicon.",
+        ) from exc
+
+
+def extract_favicon(
+    json_data: dict[str, Any],
+    known: str | None = None,
+) -> bytes | None:
+    """Replace favicon in status json with hash, return decoded png.
+
+    The hash is found in the "favicon_hash" field afterwards. If the
+    hash is known, the caller already has the png, so it is not decoded
+    and None is returned. Favicons that fail to decode are left alone
+    so errors can be reported later, and None is returned for them.
+    """
+    favicon = json_data.get("favicon")
+    if not isinstance(favicon, str):
+        return None
+    key = hashlib.blake2b(
+        favicon.encode("utf-8"),
+        digest_size=16,
+    ).hexdigest()
+    if key == known:
+        del json_data["favicon"]
+        json_data["favicon_hash"] = key
+        return None
+    png = favicon_cache.get(key)
+    if png is None:
+        try:
+            png = decode_favicon(favicon)
+        except ValueError:
+            return None
+    del json_data["favicon"]
+    json_data["favicon_hash"] = key
+    return png
+
+
+def store_favicon(key: str, png: bytes) -> None:
+    """Store png bytes in favicon cache under hash, adding a reference.
+
+    Every call must be matched by a release_favicon call once the
+    favicon is no longer used.
+    """
+    favicon_cache.setdefault(key, png)
+    favicon_references[key] = favicon_references.get(key, 0) + 1
+
+
+def release_favicon(key: str) -> None:
+    """Remove reference to favicon, forgetting it once nothing uses it."""
+    count = favicon_references.get(key, 0) - 1
+    if count > 0:
+        favicon_references[key] = count
+        return
+    favicon_references.pop(key, None)
+    favicon_cache.pop(key, None)
+
+
+def get_favicon(key: str) -> bytes | None:
+    """Return png bytes for favicon hash, or None if no longer cached."""
+    return favicon_cache.get(key)
+
+
+if __name__ == "__main__":
+    print(f"{__title__}\nProgrammed by {__author__}.\n")
@@ -21,33 +21,102 @@ from __future__ import annotations
 __title__ = "Gears"
 __author__ = "CoolCat467"
 __license__ = "Apache License 2.0"
-__version__ = "0.1.9"
+__version__ = "0.2.0"
 __ver_major__ = 0
-__ver_minor__ = 1
-__ver_patch__ = 9
+__ver_minor__ = 2
+__ver_patch__ = 0
 
 import asyncio
 import concurrent.futures
-import math
+import heapq
+import itertools
 import traceback
 from typing import TYPE_CHECKING, Any
 
 import async_timeout
 
-from statusbot.statemachine import AsyncState, AsyncStateMachine
+from statusbot.statemachine import (
+    AsyncState,
+    AsyncStateMachine,
+    MachineListener,
+)
 
 if TYPE_CHECKING:
     from collections.abc import Coroutine
 
+    from statusbot.statemachine import TransitionListener
+
 __all__ = [
     "BaseBot",
     "Gear",
     "StateTimer",
     "StateTimerExitState",
+    "TickScheduler",
     "Timer",
 ]
 
 
+class TickScheduler:
+    """Wake up waiters at their event loop time deadlines.
+
+    Deadlines are kept in a single heap, and only one event loop timer
+    handle is ever armed, for whichever deadline comes first.
+    """
+
+    __slots__ = ("_counter", "_handle", "_heap", "loop")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Initialize with event loop and no deadlines."""
+        self.loop = loop
+        self._heap: list[tuple[float, int, asyncio.Future[None]]] = []
+        self._counter = itertools.count()
+        self._handle: asyncio.TimerHandle | None = None
+
+    def __repr__(self) -> str:
+        """Return representation of self."""
+        return f"<{self.__class__.__name__} {len(self)} waiting>"
+
+    def __len__(self) -> int:
+        """Return number of deadlines still waiting."""
+        return sum(not future.done() for _, _, future in self._heap)
+
+    def _arm(self) -> None:
+        """Arm event loop timer for earliest deadline still waiting."""
+        heap = self._heap
+        # Drop waiters that were canceled or woken up early
+        while heap and heap[0][2].done():
+            heapq.heappop(heap)
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if heap:
+            self._handle = self.loop.call_at(heap[0][0], self._fire)
+
+    def _fire(self) -> None:
+        """Wake up all waiters whose deadline has passed."""
+        self._handle = None
+        now = self.loop.time()
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            _, _, future = heapq.heappop(heap)
+            if not future.done():
+                future.set_result(None)
+        self._arm()
+
+    def schedule(self, deadline: float) -> asyncio.Future[None]:
+        """Return future that will be resolved at event loop time deadline."""
+        future: asyncio.Future[None] = self.loop.create_future()
+        entry = (deadline, next(self._counter), future)
+        heapq.heappush(self._heap, entry)
+        if self._heap[0] is entry:
+            self._arm()
+        return future
+
+    async def sleep_until(self, deadline: float) -> None:
+        """Sleep until event loop time deadline."""
+        await self.schedule(deadline)
+
+
 class Gear(AsyncStateMachine):
     """Class that gets run by bots."""
 
@@ -87,12 +156,21 @@ class Gear(AsyncStateMachine):
 class BaseBot:
     """Bot base class."""
 
-    __slots__ = ("gears", "loop")
+    __slots__ = (
+        "gears",
+        "loop",
+        "machine_listener",
+        "scheduler",
+        "transition_listeners",
+    )
 
     def __init__(self, eventloop: asyncio.AbstractEventLoop) -> None:
         """Initialize with event loop and no gears."""
         self.loop = eventloop
         self.gears: dict[str, Gear] = {}
+        self.scheduler = TickScheduler(eventloop)
+        self.machine_listener: MachineListener | None = None
+        self.transition_listeners: list[TransitionListener] = []
 
     def __repr__(self) -> str:
         """Return <{class-name}>."""
@@ -108,9 +186,30 @@ class BaseBot:
             raise RuntimeError(
                 f'A gear named "{new_gear.name}" already exists!',
             )
+        if new_gear.listener is None:
+            new_gear.listener = self.machine_listener
+        for listener in self.transition_listeners:
+            new_gear.add_transition_listener(listener)
         self.gears[new_gear.name] = new_gear
         self.gears[new_gear.name].gear_init()
 
+    def set_machine_listener(self, listener: MachineListener | None) -> None:
+        """Set state machine listener of current and future gears."""
+        for gear in self.gears.values():
+            if gear.listener is self.machine_listener:
+                gear.listener = listener
+        self.machine_listener = listener
+
+    def record_tick_lateness(self, timer: Timer, seconds: float) -> None:
+        """Handle timer tick starting seconds after its deadline."""
+        return
+
+    def add_transition_listener(self, listener: TransitionListener) -> None:
+        """Add transition listener to current and future gears."""
+        self.transition_listeners.append(listener)
+        for gear in self.gears.values():
+            gear.add_transition_listener(listener)
+
     def remove_gear(self, gear_name: str) -> None:
         """Remove a gear from this bot."""
         if gear_name in self.gears:
@@ -150,7 +249,8 @@ class BaseBot:
 class Timer(Gear):
     """Class that will run coroutine self.run every delay seconds."""
 
-    __slots__ = ("delay", "task", "ticks")
+    __slots__ = ("deadline", "delay", "hibernating", "task", "waiter")
+    # Polling interval used when waiting for timer to stop
     min_delay: int | float = 1
 
     def __init__(
@@ -164,7 +264,9 @@ class Timer(Gear):
 
         self.delay = max(0, delay)
         self.task: asyncio.Task[Any] | None = None
-        self.ticks = math.inf
+        self.deadline = 0.0
+        self.waiter: asyncio.Future[None] | None = None
+        self.hibernating = False
 
     def gear_init(self) -> None:
         """Create task in the bot event loop."""
@@ -192,6 +294,7 @@ class Timer(Gear):
         """Set self.running to False, cancel self.task, wait for it to cancel."""
         # Stop running no matter what
         self.running = False
+        self.wake()
         # Cancel task
         if self.task is not None:
             try:
@@ -221,34 +324,59 @@ class Timer(Gear):
         """Return False if Timer should continue running. Called periodically."""
         return True
 
+    def wake(self) -> None:
+        """Wake timer up early if it is waiting for it's next tick."""
+        if self.waiter is not None and not self.waiter.done():
+            self.waiter.set_result(None)
+
+    def hibernate(self) -> None:
+        """Stop ticking after current tick until woken up by wake."""
+        self.hibernating = True
+
+    async def sleep_until(self, deadline: float | None) -> None:
+        """Sleep until event loop time deadline or until woken up.
+
+        If deadline is None, sleep until woken up.
+        """
+        if deadline is None:
+            self.waiter = self.bot.loop.create_future()
+        else:
+            self.waiter = self.bot.scheduler.schedule(deadline)
+        try:
+            await self.waiter
+        finally:
+            self.waiter = None
+
     async def start(self) -> None:
         """Keep running self.tick every self.delay second or until close time."""
-        if self.min_delay > 0:
-            while self.running:
-                waited = self.min_delay * self.ticks
-                stop = False
-                if waited >= self.delay:
-                    try:
-                        stop = await self.tick()
-                    except Exception:
-                        self.running = False
-                        raise
-                    self.ticks = 0
-                    waited = 0
-                if stop or self.bot.gear_close:
-                    self.running = False
-                else:
-                    to_wait = min(self.min_delay, self.delay - waited)
-                    try:
-                        await asyncio.sleep(to_wait)
-                    except concurrent.futures.CancelledError:
-                        self.running = False
-                    self.ticks += math.ceil(to_wait / self.min_delay)
-        else:
-            self.ticks = 0
-            while self.running:
-                if (await self.tick()) or self.bot.gear_close:
-                    self.running = False
+        loop = self.bot.loop
+        self.deadline = loop.time()
+        while self.running:
+            self.bot.record_tick_lateness(
+                self,
+                max(0.0, loop.time() - self.deadline),
+            )
+            try:
+                stop = await self.tick()
+            except Exception:
+                self.running = False
+                raise
+            if stop or self.bot.gear_close:
+                self.running = False
+                break
+            # Count from last deadline so time spent in tick does not
+            # make timing drift, but do not try to catch up missed ticks.
+            self.deadline = max(self.deadline + self.delay, loop.time())
+            try:
+                await self.sleep_until(
+                    None if self.hibernating else self.deadline,
+                )
+            except concurrent.futures.CancelledError:
+                self.running = False
+            if self.hibernating:
+                # Woken up, tick right away
+                self.hibernating = False
+                self.deadline = loop.time()
 
 
 class StateTimer(Timer):
@@ -297,7 +425,7 @@ class StateTimer(Timer):
     async def hault(self) -> None:
         """Set self.running to False, cancel self.task, wait for it to cancel."""
         await self.set_state("Hault")
-        self.ticks = math.inf
+        self.wake()
 
         async def wait_stop() -> None:
             while self.running:  # noqa: ASYNC110
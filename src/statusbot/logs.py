@@ -0,0 +1,282 @@
+"""Logs - Queued logging that writes files from a background thread."""
+
+# Programmed by CoolCat467
+
+# Copyright 2025 CoolCat467
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+from __future__ import annotations
+
+__title__ = "Logs"
+__author__ = "CoolCat467"
+__license__ = "Apache License 2.0"
+__version__ = "0.1.0"
+
+import hashlib
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import sys
+import time
+import traceback
+
+__all__ = [
+    "LOG_FORMAT",
+    "ErrorAggregator",
+    "RemoteTraceback",
+    "errors",
+    "fingerprint",
+    "logger",
+    "setup_logging",
+    "stop_logging",
+]
+
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+
+logger = logging.getLogger("statusbot")
+
+
+def setup_logging(
+    logpath: str,
+    max_bytes: int = 5 * 1024 * 1024,
+    backup_count: int = 5,
+    when: str | None = None,
+    level: int = logging.INFO,
+) -> logging.handlers.QueueListener:
+    """Send statusbot log records to log file and stdout through a queue.
+
+    Records are put on a queue by the logging thread and written by a
+    background thread, so slow disks never block the event loop.
+    The log file rotates when it reaches max_bytes, or if when is
+    given, at that interval (see TimedRotatingFileHandler), keeping
+    backup_count old log files.
+
+    Return started queue listener. Stop it to flush remaining records.
+    """
+    directory = os.path.dirname(os.path.abspath(logpath))
+    os.makedirs(directory, exist_ok=True)
+    file_handler: logging.Handler
+    if when is None:
+        file_handler = logging.handlers.RotatingFileHandler(
+            logpath,
+            maxBytes=max_bytes,
+            backupCount=backup_count,
+            encoding="utf-8",
+        )
+    else:
+        file_handler = logging.handlers.TimedRotatingFileHandler(
+            logpath,
+            when=when,
+            backupCount=backup_count,
+            encoding="utf-8",
+        )
+    formatter = logging.Formatter(LOG_FORMAT)
+    file_handler.setFormatter(formatter)
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(formatter)
+
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    for handler in tuple(logger.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            logger.removeHandler(handler)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.setLevel(level)
+    # Handled here, don't also go to root logger's handlers
+    logger.propagate = False
+
+    listener = logging.handlers.QueueListener(
+        log_queue,
+        file_handler,
+        console_handler,
+        respect_handler_level=True,
+    )
+    listener.start()
+    return listener
+
+
+def stop_logging(listener: logging.handlers.QueueListener) -> None:
+    """Write remaining records, close log file, and stop queueing records."""
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+    for handler in tuple(logger.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            logger.removeHandler(handler)
+    logger.propagate = True
+
+
+_FRAME_LINE = re.compile(r'^  File "(.*)", line (\d+), in (.*)$', re.MULTILINE)
+
+
+class RemoteTraceback(Exception):  # noqa: N818
+    """Formatted traceback of an exception raised in another process.
+
+    Set as the __cause__ of the exception once it is raised again here,
+    like concurrent.futures does.
+    """
+
+    def __init__(self, text: str) -> None:
+        """Initialize with formatted traceback text."""
+        super().__init__(text)
+        self.text = text
+
+    def __str__(self) -> str:
+        """Return formatted traceback."""
+        return f'\n"""\n{self.text}"""'
+
+    def frames(self) -> list[tuple[str, int, str]]:
+        """Return file name, line number, and function name of frames."""
+        return [
+            (filename, int(lineno), name)
+            for filename, lineno, name in _FRAME_LINE.findall(self.text)
+        ]
+
+
+def fingerprint(exc: BaseException) -> tuple[str, str]:
+    """Return fingerprint of exception type and traceback, and location.
+
+    Location is where exception was raised, as "file:line in function".
+    Frames of a RemoteTraceback cause are included, so exceptions sent
+    from worker processes are told apart by where they were raised.
+    """
+    frames: list[tuple[str, int | None, str]] = [
+        (frame.filename, frame.lineno, frame.name)
+        for frame in traceback.extract_tb(exc.__traceback__)
+    ]
+    if isinstance(exc.__cause__, RemoteTraceback):
+        frames.extend(exc.__cause__.frames())
+    parts = [f"{type(exc).__module__}.{type(exc).__qualname__}"]
+    parts.extend(
+        f"{os.path.basename(filename)}:{lineno}:{name}"
+        for filename, lineno, name in frames
+    )
+    digest = hashlib.sha1(
+        "\n".join(parts).encode("utf-8"),
+        usedforsecurity=False,
+    ).hexdigest()[:12]
+    location = "<unknown>"
+    if frames:
+        filename, lineno, name = frames[-1]
+        location = f"{os.path.basename(filename)}:{lineno} in {name}"
+    return digest, location
+
+
+class _ErrorEntry:
+    """How often one error fingerprint has been seen."""
+
+    __slots__ = (
+        "last_seen",
+        "last_summary",
+        "location",
+        "message",
+        "name",
+        "pending",
+        "total",
+    )
+
+    def __init__(self, name: str, location: str, message: str) -> None:
+        """Initialize with exception name, location, and first message."""
+        self.name = name
+        self.location = location
+        self.message = message
+        self.total = 0
+        # Times seen since last summary
+        self.pending = 0
+        self.last_seen = 0.0
+        self.last_summary = 0.0
+
+
+class ErrorAggregator:
+    """Count repeated exceptions by fingerprint.
+
+    Only the first time a fingerprint is seen should it's traceback be
+    logged, after that log_summaries periodically logs how many more
+    times each fingerprint was seen.
+    """
+
+    __slots__ = ("entries",)
+
+    # Seconds between summaries of one fingerprint
+    summary_interval: float = 600
+    # Forget least recently seen fingerprints past this many
+    max_fingerprints: int = 1000
+
+    def __init__(self) -> None:
+        """Initialize with no errors seen."""
+        self.entries: dict[str, _ErrorEntry] = {}
+
+    def __repr__(self) -> str:
+        """Return representation of self."""
+        return f"<{self.__class__.__name__} {len(self.entries)} fingerprints>"
+
+    def record(self, exc: BaseException) -> tuple[str, bool]:
+        """Count exception. Return fingerprint and if this is the first time."""
+        digest, location = fingerprint(exc)
+        now = time.monotonic()
+        entry = self.entries.pop(digest, None)
+        first = entry is None
+        if entry is None:
+            if len(self.entries) >= self.max_fingerprints:
+                # Dictionary is in least recently seen order
+                del self.entries[next(iter(self.entries))]
+            entry = _ErrorEntry(type(exc).__name__, location, str(exc))
+            entry.last_summary = now
+        else:
+            entry.pending += 1
+        entry.total += 1
+        entry.last_seen = now
+        self.entries[digest] = entry
+        return digest, first
+
+    def log_summaries(self, force: bool = False) -> None:
+        """Log how often fingerprints were seen since their last summary.
+
+        Only fingerprints whose last summary is at least summary_interval
+        seconds old are summarized, unless force is True.
+        """
+        now = time.monotonic()
+        for digest, entry in self.entries.items():
+            if not entry.pending:
+                continue
+            elapsed = now - entry.last_summary
+            if not force and elapsed < self.summary_interval:
+                continue
+            logger.warning(
+                "Error %s (%s at %s) seen %d more times "
+                "in the last %d minutes",
+                digest,
+                entry.name,
+                entry.location,
+                entry.pending,
+                max(1, round(elapsed / 60)),
+            )
+            entry.pending = 0
+            entry.last_summary = now
+
+    def top(self, count: int = 10) -> list[tuple[str, _ErrorEntry]]:
+        """Return most often seen fingerprints and their entries."""
+        return sorted(
+            self.entries.items(),
+            key=lambda item: item[1].total,
+            reverse=True,
+        )[:count]
+
+
+errors = ErrorAggregator()
+
+
+if __name__ == "__main__":
+    print(f"{__title__}\nProgrammed by {__author__}.\n")
@@ -0,0 +1,133 @@
+"""Loop Monitor - Measure event loop lag and decide when to shed work."""
+
+# Programmed by CoolCat467
+
+# Copyright 2025 CoolCat467
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+from __future__ import annotations
+
+__title__ = "Loop Monitor"
+__author__ = "CoolCat467"
+__license__ = "Apache License 2.0"
+__version__ = "0.0.0"
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import asyncio
+
+__all__ = ["LagMonitor"]
+
+
+class LagMonitor:
+    """Measure how late the event loop runs scheduled callbacks.
+
+    Every interval seconds a callback is scheduled and how late it runs
+    is folded into a moving average. Once the average goes over
+    shed_threshold the monitor is shedding, and it stops once the
+    average is back under recover_threshold.
+    """
+
+    __slots__ = (
+        "expected",
+        "handle",
+        "lag",
+        "loop",
+        "shedding",
+        "skipped",
+        "worst",
+    )
+
+    # Seconds between measurements
+    interval: float = 0.5
+    # Average lag in seconds to start and stop shedding work at
+    shed_threshold: float = 0.25
+    recover_threshold: float = 0.1
+    # Weight of newest measurement in moving average
+    smoothing: float = 0.3
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Initialize with event loop to monitor."""
+        self.loop = loop
+        self.handle: asyncio.TimerHandle | None = None
+        self.expected = 0.0
+        self.lag = 0.0
+        self.worst = 0.0
+        self.shedding = False
+        self.skipped = 0
+
+    def __repr__(self) -> str:
+        """Return representation of self."""
+        return (
+            f"<{self.__class__.__name__} lag={self.lag:.3f}s "
+            f"shedding={self.shedding}>"
+        )
+
+    @property
+    def running(self) -> bool:
+        """Is monitor measuring lag."""
+        return self.handle is not None
+
+    def start(self) -> None:
+        """Start measuring lag if not already."""
+        if self.handle is None:
+            self._schedule()
+
+    def stop(self) -> None:
+        """Stop measuring lag."""
+        if self.handle is not None:
+            self.handle.cancel()
+            self.handle = None
+
+    def shed(self) -> bool:
+        """Return if caller should skip non-critical work, counting skips."""
+        if self.shedding:
+            self.skipped += 1
+        return self.shedding
+
+    def _schedule(self) -> None:
+        """Schedule next measurement."""
+        self.expected = self.loop.time() + self.interval
+        self.handle = self.loop.call_at(self.expected, self._measure)
+
+    def _measure(self) -> None:
+        """Record how late we were called and update shedding mode."""
+        self.record(self.loop.time() - self.expected)
+        self._schedule()
+
+    def record(self, lag: float) -> None:
+        """Fold lag measurement into average and update shedding mode."""
+        lag = max(0.0, lag)
+        self.worst = max(self.worst, lag)
+        self.lag += (lag - self.lag) * self.smoothing
+        if not self.shedding and self.lag >= self.shed_threshold:
+            self.shedding = True
+            print(
+                f"[{self.__class__.__name__}] Event loop lag is "
+                f"{self.lag:.3f}s, shedding background work",
+            )
+        elif self.shedding and self.lag <= self.recover_threshold:
+            self.shedding = False
+            print(
+                f"[{self.__class__.__name__}] Event loop lag is "
+                f"{self.lag:.3f}s, no longer shedding background work "
+                f"(skipped {self.skipped} tasks, worst lag {self.worst:.3f}s)",
+            )
+            self.skipped = 0
+            self.worst = 0.0
+
+
+if __name__ == "__main__":
+    print(f"{__title__}\nProgrammed by {__author__}.\n")
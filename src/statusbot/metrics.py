@@ -0,0 +1,438 @@
+"""Metrics - Counters and histograms served in Prometheus text format."""
+
+# Programmed by CoolCat467
+
+# Copyright 2025 CoolCat467
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+from __future__ import annotations
+
+__title__ = "Metrics"
+__author__ = "CoolCat467"
+__license__ = "Apache License 2.0"
+__version__ = "0.0.0"
+
+import asyncio
+import bisect
+import contextlib
+import math
+from typing import TYPE_CHECKING, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+__all__ = [
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "MetricsRegistry",
+    "MetricsServer",
+    "command_latency",
+    "commands",
+    "config_lookups",
+    "discord_send_failures",
+    "discord_send_latency",
+    "forge_cache_lookups",
+    "gear_states",
+    "gear_transitions",
+    "ping_failures",
+    "ping_latency",
+    "registry",
+    "tick_lateness",
+]
+
+
+def _format_value(value: float) -> str:
+    """Return value formatted for text exposition format."""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value: str) -> str:
+    """Return label value escaped for text exposition format."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: Iterable[str]) -> str:
+    """Return label set text like {name="value"}, or empty string."""
+    pairs = [
+        f'{name}="{_escape(value)}"'
+        for name, value in zip(names, values, strict=True)
+    ]
+    if not pairs:
+        return ""
+    return "{" + ",".join(pairs) + "}"
+
+
+class _Metric:
+    """Named metric with help text and label names."""
+
+    __slots__ = ("help", "labelnames", "name")
+
+    kind = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...] = (),
+    ) -> None:
+        """Initialize with metric name, help text, and label names."""
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+
+    def __repr__(self) -> str:
+        """Return representation of self."""
+        return f"<{self.__class__.__name__} {self.name}>"
+
+    def _key(self, labels: tuple[str, ...]) -> tuple[str, ...]:
+        """Return label values, checking there is one per label name."""
+        if len(labels) != len(self.labelnames):
+            raise ValueError(
+                f"{self.name} takes labels {self.labelnames}, got {labels}",
+            )
+        return labels
+
+    def samples(self) -> list[str]:
+        """Return sample lines."""
+        raise NotImplementedError()
+
+    def render(self) -> str:
+        """Return metric in text exposition format."""
+        lines = [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} {self.kind}",
+            *self.samples(),
+        ]
+        return "\n".join(lines) + "\n"
+
+
+class Counter(_Metric):
+    """Value that only goes up, one per set of label values."""
+
+    __slots__ = ("values",)
+
+    kind = "counter"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...] = (),
+    ) -> None:
+        """Initialize with metric name, help text, and label names."""
+        super().__init__(name, help_text, labelnames)
+        self.values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """Increase counter for label values by amount."""
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, *labels: str) -> float:
+        """Return counter value for label values."""
+        return self.values.get(self._key(labels), 0)
+
+    def samples(self) -> list[str]:
+        """Return sample lines."""
+        return [
+            f"{self.name}{_labels(self.labelnames, key)} "
+            f"{_format_value(value)}"
+            for key, value in sorted(self.values.items())
+        ]
+
+
+class Gauge(_Metric):
+    """Values read from a callback every time metrics are rendered."""
+
+    __slots__ = ("callback",)
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...] = (),
+    ) -> None:
+        """Initialize with metric name, help text, and label names."""
+        super().__init__(name, help_text, labelnames)
+        self.callback: Callable[[], dict[tuple[str, ...], float]] | None = None
+
+    def set_function(
+        self,
+        callback: Callable[[], dict[tuple[str, ...], float]] | None,
+    ) -> None:
+        """Set callback returning dictionary of label values to value."""
+        self.callback = callback
+
+    def samples(self) -> list[str]:
+        """Return sample lines."""
+        if self.callback is None:
+            return []
+        return [
+            f"{self.name}{_labels(self.labelnames, self._key(key))} "
+            f"{_format_value(value)}"
+            for key, value in sorted(self.callback().items())
+        ]
+
+
+class Histogram(_Metric):
+    """Counts of observed values in cumulative buckets."""
+
+    __slots__ = ("buckets", "counts", "sums")
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        buckets: tuple[float, ...],
+        labelnames: tuple[str, ...] = (),
+    ) -> None:
+        """Initialize with name, help text, bucket bounds, and label names."""
+        super().__init__(name, help_text, labelnames)
+        self.buckets = (*sorted(buckets), math.inf)
+        self.counts: dict[tuple[str, ...], list[int]] = {}
+        self.sums: dict[tuple[str, ...], float] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Record observed value for label values."""
+        key = self._key(labels)
+        counts = self.counts.get(key)
+        if counts is None:
+            counts = [0] * len(self.buckets)
+            self.counts[key] = counts
+        # Counts are stored per bucket and summed when rendering
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sums[key] = self.sums.get(key, 0) + value
+
+    def count(self, *labels: str) -> int:
+        """Return number of observations for label values."""
+        return sum(self.counts.get(self._key(labels), ()))
+
+    def samples(self) -> list[str]:
+        """Return sample lines."""
+        lines = []
+        names = (*self.labelnames, "le")
+        for key, counts in sorted(self.counts.items()):
+            total = 0
+            for bound, count in zip(self.buckets, counts, strict=True):
+                total += count
+                label = _labels(names, (*key, _format_value(bound)))
+                lines.append(f"{self.name}_bucket{label} {total}")
+            label = _labels(self.labelnames, key)
+            lines.append(
+                f"{self.name}_sum{label} {_format_value(self.sums[key])}",
+            )
+            lines.append(f"{self.name}_count{label} {total}")
+        return lines
+
+
+_MetricT = TypeVar("_MetricT", bound=_Metric)
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together."""
+
+    __slots__ = ("metrics",)
+
+    def __init__(self) -> None:
+        """Initialize with no metrics."""
+        self.metrics: dict[str, _Metric] = {}
+
+    def __repr__(self) -> str:
+        """Return representation of self."""
+        return f"<{self.__class__.__name__} {len(self.metrics)} metrics>"
+
+    def register(self, metric: _Metric) -> None:
+        """Add metric to registry."""
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name!r} already registered")
+        self.metrics[metric.name] = metric
+
+    def render(self) -> str:
+        """Return all metrics in text exposition format."""
+        return "".join(metric.render() for metric in self.metrics.values())
+
+
+class MetricsServer:
+    """Minimal HTTP server answering every GET with rendered metrics.
+
+    Only listens on the loopback interface.
+    """
+
+    __slots__ = ("port", "registry", "server")
+
+    host = "127.0.0.1"
+
+    def __init__(self, registry: MetricsRegistry, port: int) -> None:
+        """Initialize with metrics registry and port to listen on."""
+        self.registry = registry
+        self.port = port
+        self.server: asyncio.Server | None = None
+
+    def __repr__(self) -> str:
+        """Return representation of self."""
+        return f"<{self.__class__.__name__} {self.host}:{self.port}>"
+
+    async def start(self) -> None:
+        """Start listening."""
+        self.server = await asyncio.start_server(
+            self._handle,
+            self.host,
+            self.port,
+        )
+        if self.port == 0:
+            self.port = self.server.sockets[0].getsockname()[1]
+
+    async def _handle(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        """Answer one HTTP request."""
+        try:
+            request = await asyncio.wait_for(reader.readline(), 5)
+            # Skip headers
+            while (await asyncio.wait_for(reader.readline(), 5)) not in {
+                b"\r\n",
+                b"\n",
+                b"",
+            }:
+                pass
+            if request.split(b" ", 1)[0] == b"GET":
+                status = "200 OK"
+                body = self.registry.render().encode("utf-8")
+            else:
+                status = "405 Method Not Allowed"
+                body = b""
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                "Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n".encode("ascii")
+                + body,
+            )
+            await writer.drain()
+        except (OSError, asyncio.TimeoutError):
+            pass
+        finally:
+            writer.close()
+            with contextlib.suppress(OSError):
+                await writer.wait_closed()
+
+    async def stop(self) -> None:
+        """Stop listening."""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+
+def _registered(metric: _MetricT) -> _MetricT:
+    """Register metric with module registry and return it."""
+    registry.register(metric)
+    return metric
+
+
+registry = MetricsRegistry()
+
+gear_states = _registered(
+    Gauge(
+        "statusbot_gears",
+        "Number of gears by state.",
+        ("state",),
+    ),
+)
+gear_transitions = _registered(
+    Counter(
+        "statusbot_gear_transitions_total",
+        "Gear state changes by old and new state.",
+        ("old", "new"),
+    ),
+)
+ping_latency = _registered(
+    Histogram(
+        "statusbot_ping_latency_milliseconds",
+        "Latency of successful server status requests.",
+        (10, 25, 50, 100, 250, 500, 1000, 2500, 5000),
+    ),
+)
+ping_failures = _registered(
+    Counter(
+        "statusbot_ping_failures_total",
+        "Failed server status requests by exception class.",
+        ("exception",),
+    ),
+)
+tick_lateness = _registered(
+    Histogram(
+        "statusbot_tick_lateness_seconds",
+        "How late timer ticks start after their deadline.",
+        (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+    ),
+)
+discord_send_latency = _registered(
+    Histogram(
+        "statusbot_discord_send_seconds",
+        "Time taken to send messages to Discord.",
+        (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+    ),
+)
+discord_send_failures = _registered(
+    Counter(
+        "statusbot_discord_send_failures_total",
+        "Failed Discord message sends by exception class.",
+        ("exception",),
+    ),
+)
+commands = _registered(
+    Counter(
+        "statusbot_commands_total",
+        "Command messages processed by command.",
+        ("command",),
+    ),
+)
+command_latency = _registered(
+    Histogram(
+        "statusbot_command_seconds",
+        "Time taken to run command messages.",
+        (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+        ("command",),
+    ),
+)
+config_lookups = _registered(
+    Counter(
+        "statusbot_config_lookups_total",
+        "Configuration store lookups by cache hit or miss.",
+        ("result",),
+    ),
+)
+forge_cache_lookups = _registered(
+    Counter(
+        "statusbot_forge_cache_lookups_total",
+        "Decoded forge mod list cache lookups by cache hit or miss.",
+        ("result",),
+    ),
+)
+
+
+if __name__ == "__main__":
+    print(f"{__title__}\nProgrammed by {__author__}.\n")
@@ -0,0 +1,328 @@
+"""Ping Registry - Share server status requests between guilds."""
+
+# Programmed by CoolCat467
+
+# Copyright 2025 CoolCat467
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+from __future__ import annotations
+
+__title__ = "Ping Registry"
+__author__ = "CoolCat467"
+__license__ = "Apache License 2.0"
+__version__ = "0.2.0"
+
+import asyncio
+from typing import TYPE_CHECKING, Any
+
+from statusbot import decode_mods, favicons, metrics
+from statusbot.status import StatusSnapshot, status_fingerprint
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Coroutine
+
+    import mcstatus
+
+    from statusbot.loopmonitor import LagMonitor
+    from statusbot.ratelimit import PingBudget
+    from statusbot.workers import PingWorkerPool
+
+__all__ = [
+    "PingRegistry",
+    "fetch_ping",
+    "fetch_snapshot",
+    "fetch_status",
+    "server_key",
+]
+
+
+def server_key(server: mcstatus.JavaServer) -> str:
+    """Return canonical key of resolved (post SRV lookup) server address."""
+    host = server.address.host.lower().rstrip(".")
+    if ":" in host:
+        # IPv6 literal
+        host = f"[{host}]"
+    return f"{host}:{server.address.port}"
+
+
+async def fetch_status(
+    server: mcstatus.JavaServer,
+) -> tuple[dict[str, Any], float]:
+    """Return processed status json and latency of server."""
+    response = await server.async_status()
+    # TODO: Change this now that
+    # https://github.com/py-mine/mcstatus/pull/578
+    # was included in a release finally
+    json_data = decode_mods.process_response(response.raw)
+    return json_data, round(response.latency, 3)
+
+
+async def fetch_snapshot(
+    server: mcstatus.JavaServer,
+    known_favicon: str | None = None,
+    previous: int | None = None,
+    extract: bool = True,
+) -> tuple[StatusSnapshot | None, float, bytes | None]:
+    """Return status snapshot, latency, and decoded favicon png of server.
+
+    If the raw status json has fingerprint previous, nothing changed
+    since the previous snapshot, so the response is not processed and
+    None is returned instead of a snapshot.
+
+    The favicon is replaced by its hash in the snapshot, the png is
+    returned separately for storing in the favicon cache. If the hash is
+    known_favicon, the favicon is not decoded and no png is returned.
+    If extract is False, the favicon is left in the snapshot as is.
+    """
+    response = await server.async_status()
+    latency = round(response.latency, 3)
+    fingerprint = status_fingerprint(response.raw)
+    if fingerprint == previous:
+        return None, latency, None
+    # TODO: Change this now that
+    # https://github.com/py-mine/mcstatus/pull/578
+    # was included in a release finally
+    json_data = decode_mods.process_response(response.raw)
+    png = None
+    if extract:
+        png = favicons.extract_favicon(json_data, known_favicon)
+    return StatusSnapshot(json_data, latency, fingerprint), latency, png
+
+
+async def fetch_ping(server: mcstatus.JavaServer) -> float:
+    """Return ping latency of server."""
+    return await server.async_ping()
+
+
+def _consume_exception(task: asyncio.Task[Any]) -> None:
+    """Retrieve task exception so nobody gets warned about it."""
+    if not task.cancelled():
+        task.exception()
+
+
+class _SharedRequest:
+    """Most recent request of one kind for a server."""
+
+    __slots__ = ("started", "task")
+
+    def __init__(self, task: asyncio.Task[Any], started: float) -> None:
+        """Initialize with request task and loop time it started."""
+        self.task = task
+        self.started = started
+
+
+class _ServerEntry:
+    """Server and shared requests for one canonical server address."""
+
+    __slots__ = (
+        "favicon_hash",
+        "requests",
+        "server",
+        "snapshot",
+        "subscribers",
+    )
+
+    def __init__(self, server: mcstatus.JavaServer) -> None:
+        """Initialize with server and no subscribers."""
+        self.server = server
+        self.subscribers = 0
+        self.requests: dict[str, _SharedRequest] = {}
+        # Hash of server's favicon, referenced in favicon cache
+        self.favicon_hash: str | None = None
+        # Most recent status snapshot, reused if status did not change
+        self.snapshot: StatusSnapshot | None = None
+
+
+class PingRegistry:
+    """Registry of watched servers, one status poll per unique server.
+
+    Guild pingers subscribe with their resolved server and get back a
+    canonical key. Status and ping requests for a key made while a
+    previous request is in flight or younger than the given max age
+    reuse that request instead of opening another connection.
+
+    If given a ping budget, requests that actually go out over the
+    network wait for admission from it, with servers taking turns.
+    If given a worker pool, requests are sent from worker processes.
+    If given a lag monitor, favicons are not extracted in this process
+    while it is shedding load.
+    """
+
+    __slots__ = ("budget", "entries", "lag_monitor", "loop", "workers")
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        budget: PingBudget | None = None,
+        workers: PingWorkerPool | None = None,
+        lag_monitor: LagMonitor | None = None,
+    ) -> None:
+        """Initialize with event loop and optional helpers."""
+        self.loop = loop
+        self.budget = budget
+        self.workers = workers
+        self.lag_monitor = lag_monitor
+        self.entries: dict[str, _ServerEntry] = {}
+
+    def __repr__(self) -> str:
+        """Return representation of self."""
+        return f"<{self.__class__.__name__} {len(self.entries)} servers>"
+
+    def subscribe(self, server: mcstatus.JavaServer) -> str:
+        """Subscribe to server and return canonical key for it."""
+        key = server_key(server)
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = _ServerEntry(server)
+            self.entries[key] = entry
+        entry.subscribers += 1
+        return key
+
+    def unsubscribe(self, key: str) -> None:
+        """Unsubscribe from server with given key."""
+        entry = self.entries.get(key)
+        if entry is None:
+            return
+        entry.subscribers -= 1
+        if entry.subscribers <= 0:
+            del self.entries[key]
+            if entry.favicon_hash is not None:
+                favicons.release_favicon(entry.favicon_hash)
+
+    def subscriber_count(self, key: str) -> int:
+        """Return number of subscribers watching server with given key."""
+        entry = self.entries.get(key)
+        if entry is None:
+            return 0
+        return entry.subscribers
+
+    async def _shared(
+        self,
+        key: str,
+        kind: str,
+        max_age: float,
+        request: Callable[[_ServerEntry], Coroutine[Any, Any, Any]],
+    ) -> Any:
+        """Return result of shared request, starting a new one if stale."""
+        entry = self.entries.get(key)
+        if entry is None:
+            raise KeyError(f"Server {key!r} has no subscribers!")
+        now = self.loop.time()
+        shared = entry.requests.get(kind)
+        if shared is None or (
+            shared.task.done() and now - shared.started >= max_age
+        ):
+            task = self.loop.create_task(
+                self._budgeted(key, request, entry),
+            )
+            task.add_done_callback(_consume_exception)
+            shared = _SharedRequest(task, now)
+            entry.requests[kind] = shared
+        # Shield so one subscriber being canceled does not cancel
+        # the request everyone else is waiting on.
+        return await asyncio.shield(shared.task)
+
+    async def _budgeted(
+        self,
+        key: str,
+        request: Callable[[_ServerEntry], Coroutine[Any, Any, Any]],
+        entry: _ServerEntry,
+    ) -> Any:
+        """Return result of request once admitted by ping budget."""
+        if self.budget is None:
+            return await request(entry)
+        async with self.budget.slot(key):
+            return await request(entry)
+
+    async def status(self, key: str, max_age: float = 0) -> StatusSnapshot:
+        """Return shared status snapshot for server with given key.
+
+        Favicons are moved to the favicon cache and replaced by the
+        "favicon_hash" key before the snapshot is made.
+        """
+        result: StatusSnapshot = await self._shared(
+            key,
+            "status",
+            max_age,
+            self._fetch_status,
+        )
+        return result
+
+    async def _fetch_status(self, entry: _ServerEntry) -> StatusSnapshot:
+        """Return status snapshot from worker pool or this process.
+
+        Recorded in metrics here, once per request that went out, no
+        matter how many subscribers share it.
+        """
+        known = entry.favicon_hash
+        previous = entry.snapshot
+        fingerprint = None if previous is None else previous.fingerprint
+        shedding = self.lag_monitor is not None and self.lag_monitor.shed()
+        try:
+            if self.workers is not None:
+                result = await self.workers.status(
+                    entry.server,
+                    known,
+                    fingerprint,
+                )
+            else:
+                result = await fetch_snapshot(
+                    entry.server,
+                    known,
+                    fingerprint,
+                    extract=not shedding,
+                )
+        except Exception as exc:
+            metrics.ping_failures.inc(type(exc).__name__)
+            raise
+        snapshot, latency, png = result
+        metrics.ping_latency.observe(latency)
+        if snapshot is None:
+            # Nothing changed, reuse everything but latency
+            assert previous is not None
+            return previous.with_latency(latency)
+        if self.workers is None and shedding:
+            # Favicon still encoded, extract it next time instead
+            return snapshot
+        if snapshot.favicon_hash != known and entry.subscribers > 0:
+            # Favicon stays cached while this server uses it
+            if snapshot.favicon_hash is not None:
+                assert png is not None
+                favicons.store_favicon(snapshot.favicon_hash, png)
+            if known is not None:
+                favicons.release_favicon(known)
+            entry.favicon_hash = snapshot.favicon_hash
+        if entry.subscribers > 0:
+            entry.snapshot = snapshot
+        return snapshot
+
+    async def _fetch_ping(self, entry: _ServerEntry) -> float:
+        """Return ping latency from worker pool or this process."""
+        if self.workers is not None:
+            return await self.workers.ping(entry.server)
+        return await fetch_ping(entry.server)
+
+    async def ping(self, key: str, max_age: float = 0) -> float:
+        """Return shared ping latency for server with given key."""
+        result: float = await self._shared(
+            key,
+            "ping",
+            max_age,
+            self._fetch_ping,
+        )
+        return result
+
+
+if __name__ == "__main__":
+    print(f"{__title__}\nProgrammed by {__author__}.\n")
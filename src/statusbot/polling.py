@@ -0,0 +1,114 @@
+"""Polling - Policies for how often to poll servers."""
+
+# Programmed by CoolCat467
+
+# Copyright 2025 CoolCat467
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+from __future__ import annotations
+
+__title__ = "Polling"
+__author__ = "CoolCat467"
+__license__ = "Apache License 2.0"
+__version__ = "0.0.0"
+
+__all__ = ["AdaptiveInterval", "ExponentialBackoff"]
+
+
+class AdaptiveInterval:
+    """Poll interval that follows how active a server is.
+
+    While the player list is changing the interval shrinks toward floor,
+    while players are online but nothing changes it drifts back to base,
+    and while the server is empty and unchanged it grows toward ceiling.
+    """
+
+    __slots__ = ("base", "ceiling", "floor", "interval")
+
+    # Multiplier applied to interval when players change
+    speedup: float = 0.5
+    # Multiplier applied to interval when empty server does not change
+    backoff: float = 1.5
+
+    def __init__(self, base: float, floor: float, ceiling: float) -> None:
+        """Initialize with base interval and interval bounds in seconds."""
+        if floor > ceiling:
+            raise ValueError(
+                f"Floor {floor} must not be more than ceiling {ceiling}",
+            )
+        self.floor = floor
+        self.ceiling = ceiling
+        self.base = min(max(base, floor), ceiling)
+        self.interval = self.base
+
+    def __repr__(self) -> str:
+        """Return representation of self."""
+        return (
+            f"{self.__class__.__name__}({self.base!r}, "
+            f"{self.floor!r}, {self.ceiling!r})"
+        )
+
+    def reset(self) -> float:
+        """Reset interval to base interval and return it."""
+        self.interval = self.base
+        return self.interval
+
+    def update(self, changed: bool, online: int) -> float:
+        """Return next interval given if players changed and online count."""
+        if changed:
+            self.interval = max(self.floor, self.interval * self.speedup)
+        elif online:
+            # Busy but stable, head back to base interval
+            if self.interval < self.base:
+                self.interval = min(self.base, self.interval / self.speedup)
+            else:
+                self.interval = max(self.base, self.interval / self.backoff)
+        else:
+            self.interval = min(self.ceiling, self.interval * self.backoff)
+        return self.interval
+
+
+class ExponentialBackoff:
+    """Delays between retries that grow exponentially up to a ceiling."""
+
+    __slots__ = ("attempts", "base", "ceiling")
+
+    # Multiplier applied to delay after every attempt
+    factor: float = 2
+
+    def __init__(self, base: float, ceiling: float) -> None:
+        """Initialize with first delay and maximum delay in seconds."""
+        self.base = base
+        self.ceiling = max(base, ceiling)
+        self.attempts = 0
+
+    def __repr__(self) -> str:
+        """Return representation of self."""
+        return f"{self.__class__.__name__}({self.base!r}, {self.ceiling!r})"
+
+    def reset(self) -> None:
+        """Reset to no attempts."""
+        self.attempts = 0
+
+    def next_delay(self) -> float:
+        """Return delay before next attempt and count attempt."""
+        delay = min(self.ceiling, self.base * self.factor**self.attempts)
+        # Do not let exponent get huge after ceiling is reached
+        if delay < self.ceiling:
+            self.attempts += 1
+        return delay
+
+
+if __name__ == "__main__":
+    print(f"{__title__}\nProgrammed by {__author__}.\n")
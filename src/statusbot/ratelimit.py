@@ -0,0 +1,208 @@
+"""Rate Limit - Global budget for outgoing server requests."""
+
+# Programmed by CoolCat467
+
+# Copyright 2025 CoolCat467
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+from __future__ import annotations
+
+__title__ = "Rate Limit"
+__author__ = "CoolCat467"
+__license__ = "Apache License 2.0"
+__version__ = "0.0.0"
+
+import asyncio
+import contextlib
+from collections import OrderedDict, deque
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+__all__ = ["PingBudget"]
+
+
+class PingBudget:
+    """Token bucket limiting requests per second and requests in flight.
+
+    Requests that can not be admitted right away wait in a queue per
+    client, and queues take turns in round-robin order so one client
+    with a lot of requests can not starve the others.
+    """
+
+    __slots__ = (
+        "admitted",
+        "burst",
+        "delayed",
+        "handle",
+        "in_flight",
+        "loop",
+        "max_delay",
+        "max_in_flight",
+        "rate",
+        "tokens",
+        "total_delay",
+        "updated",
+        "waiting",
+    )
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        rate: float,
+        burst: float,
+        max_in_flight: int,
+    ) -> None:
+        """Initialize with requests per second, burst, and in flight limit."""
+        if rate <= 0:
+            raise ValueError(f"Rate must be positive, got {rate!r}")
+        if max_in_flight < 1:
+            raise ValueError(
+                f"Max in flight must be at least 1, got {max_in_flight!r}",
+            )
+        self.loop = loop
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.max_in_flight = max_in_flight
+        self.tokens = self.burst
+        self.updated = loop.time()
+        self.in_flight = 0
+        self.waiting: OrderedDict[
+            str,
+            deque[tuple[asyncio.Future[None], float]],
+        ] = OrderedDict()
+        self.handle: asyncio.TimerHandle | None = None
+
+        # Metrics
+        self.admitted = 0
+        self.delayed = 0
+        self.total_delay = 0.0
+        self.max_delay = 0.0
+
+    def __repr__(self) -> str:
+        """Return representation of self."""
+        return (
+            f"<{self.__class__.__name__} {self.in_flight} in flight, "
+            f"{self.queued} queued>"
+        )
+
+    @property
+    def queued(self) -> int:
+        """Number of requests waiting to be admitted."""
+        return sum(len(queue) for queue in self.waiting.values())
+
+    def stats(self) -> dict[str, float]:
+        """Return dictionary of admission metrics."""
+        average = self.total_delay / self.delayed if self.delayed else 0.0
+        return {
+            "admitted": self.admitted,
+            "delayed": self.delayed,
+            "average_delay": round(average, 3),
+            "max_delay": round(self.max_delay, 3),
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+        }
+
+    def _refill(self) -> None:
+        """Add tokens for time passed since last refill."""
+        now = self.loop.time()
+        self.tokens = min(
+            self.burst,
+            self.tokens + (now - self.updated) * self.rate,
+        )
+        self.updated = now
+
+    def _can_admit(self) -> bool:
+        """Return if a request can be admitted right now."""
+        return self.tokens >= 1 and self.in_flight < self.max_in_flight
+
+    def _admit(self) -> None:
+        """Take token and in flight slot for a request."""
+        self.tokens -= 1
+        self.in_flight += 1
+        self.admitted += 1
+
+    def _dispatch(self) -> None:
+        """Admit waiting requests in round-robin order while budget allows."""
+        self.handle = None
+        self._refill()
+        while self.waiting and self._can_admit():
+            client, queue = next(iter(self.waiting.items()))
+            future, queued_at = queue.popleft()
+            if queue:
+                # Go to the back of the line
+                self.waiting.move_to_end(client)
+            else:
+                del self.waiting[client]
+            if future.done():
+                continue
+            self._admit()
+            delay = self.loop.time() - queued_at
+            self.delayed += 1
+            self.total_delay += delay
+            self.max_delay = max(self.max_delay, delay)
+            future.set_result(None)
+        if (
+            self.waiting
+            and self.in_flight < self.max_in_flight
+            and self.handle is None
+        ):
+            # Out of tokens, wake up when next one is ready
+            self.handle = self.loop.call_later(
+                (1 - self.tokens) / self.rate,
+                self._dispatch,
+            )
+
+    def release(self) -> None:
+        """Release in flight slot of finished request."""
+        self.in_flight -= 1
+        if self.waiting and self.handle is None:
+            self._dispatch()
+
+    async def acquire(self, client: str) -> None:
+        """Wait until request from client is admitted.
+
+        Caller must call release once request is finished.
+        """
+        self._refill()
+        if not self.waiting and self._can_admit():
+            self._admit()
+            return
+        future: asyncio.Future[None] = self.loop.create_future()
+        self.waiting.setdefault(client, deque()).append(
+            (future, self.loop.time()),
+        )
+        if self.handle is None:
+            self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Admitted just as we were canceled, give slot back
+                self.release()
+            raise
+
+    @contextlib.asynccontextmanager
+    async def slot(self, client: str) -> AsyncIterator[None]:
+        """Async context manager holding admission for one request."""
+        await self.acquire(client)
+        try:
+            yield
+        finally:
+            self.release()
+
+
+if __name__ == "__main__":
+    print(f"{__title__}\nProgrammed by {__author__}.\n")
@@ -0,0 +1,284 @@
+"""Resolver - TTL aware cache of Minecraft server address lookups."""
+
+# Programmed by CoolCat467
+
+# Copyright 2025 CoolCat467
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+from __future__ import annotations
+
+__title__ = "Resolver"
+__author__ = "CoolCat467"
+__license__ = "Apache License 2.0"
+__version__ = "0.0.0"
+
+import asyncio
+import ipaddress
+import math
+from typing import TYPE_CHECKING, Any
+from urllib.parse import urlparse
+
+import dns.asyncresolver
+import dns.resolver
+import mcstatus
+from dns.rdatatype import RdataType
+
+from statusbot.utils import pretty_exception_name
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+__all__ = ["ServerResolver", "canonical_address", "lookup_server"]
+
+
+def canonical_address(address: str) -> str:
+    """Return configured server address with case and whitespace normalized."""
+    return address.strip().lower().rstrip(".")
+
+
+def _is_ip_address(host: str) -> bool:
+    """Return if host is an IP address literal."""
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return True
+
+
+async def lookup_server(
+    address: str,
+    negative_ttl: float,
+    timeout: float = 3,
+) -> tuple[mcstatus.JavaServer, float]:
+    """Look up server like Minecraft's server address field does.
+
+    Return server and how many seconds the lookup is valid for.
+    Raises ValueError if address cannot be parsed, and
+    dns.exception.DNSException on SRV lookup errors other than there
+    not being a SRV record.
+    """
+    parsed = urlparse("//" + address)
+    host = parsed.hostname
+    if not host:
+        raise ValueError(f"Invalid address {address!r}, can't parse.")
+    # Addresses with a port or that are IP addresses have nothing to
+    # look up, they are good forever.
+    if parsed.port is not None:
+        return mcstatus.JavaServer(host, parsed.port, timeout), math.inf
+    if _is_ip_address(host):
+        return mcstatus.JavaServer(host, None, timeout), math.inf
+
+    try:
+        answers = await dns.asyncresolver.resolve(
+            f"_minecraft._tcp.{host}",
+            RdataType.SRV,
+            lifetime=timeout,
+            search=True,
+        )
+    except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+        # No SRV record, use default port
+        return mcstatus.JavaServer(host, None, timeout), negative_ttl
+    # Like mcstatus, if there are multiple records just use the first one
+    answer: Any = answers[0]
+    target = str(answer.target).rstrip(".")
+    ttl = answers.rrset.ttl if answers.rrset is not None else negative_ttl
+    return mcstatus.JavaServer(target, int(answer.port), timeout), ttl
+
+
+class _CacheEntry:
+    """Resolved server for one canonical address."""
+
+    __slots__ = ("expires", "listeners", "refresh", "server")
+
+    def __init__(self) -> None:
+        """Initialize as not resolved yet."""
+        self.server: mcstatus.JavaServer | None = None
+        self.expires = 0.0
+        self.listeners: list[Callable[[mcstatus.JavaServer], None]] = []
+        self.refresh: asyncio.TimerHandle | None = None
+
+
+class ServerResolver:
+    """Cache of server address lookups shared between guild pingers.
+
+    Lookups are cached for as long as their SRV record's TTL says.
+    Addresses that are being watched are re-resolved in the background
+    when their TTL expires, and watchers are told when the target
+    changed so they can swap servers in place.
+    """
+
+    __slots__ = ("entries", "lookups", "loop")
+
+    # Seconds to cache a missing SRV record or a failed re-resolve for
+    negative_ttl: float = 300
+    # TTLs are clamped into this range
+    min_ttl: float = 30
+    max_ttl: float = 86400
+    timeout: float = 3
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Initialize with event loop and empty cache."""
+        self.loop = loop
+        self.entries: dict[str, _CacheEntry] = {}
+        self.lookups: dict[str, asyncio.Task[mcstatus.JavaServer]] = {}
+
+    def __repr__(self) -> str:
+        """Return representation of self."""
+        return f"<{self.__class__.__name__} {len(self.entries)} addresses>"
+
+    def _entry(self, key: str) -> _CacheEntry:
+        """Return cache entry for canonical address, creating if needed."""
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = _CacheEntry()
+            self.entries[key] = entry
+        return entry
+
+    async def _resolve(self, key: str) -> mcstatus.JavaServer:
+        """Look up canonical address and update cache entry."""
+        server, ttl = await lookup_server(key, self.negative_ttl, self.timeout)
+        if not math.isinf(ttl):
+            # Infinite TTL means lookup never expires, don't clamp it
+            ttl = min(max(ttl, self.min_ttl), self.max_ttl)
+        entry = self._entry(key)
+        old = entry.server
+        entry.server = server
+        entry.expires = self.loop.time() + ttl
+        self._schedule_refresh(key, entry)
+        if old is not None and old.address != server.address:
+            print(
+                f"[{self.__class__.__name__}] {key!r} moved from "
+                f"{old.address.host}:{old.address.port} to "
+                f"{server.address.host}:{server.address.port}",
+            )
+            for listener in tuple(entry.listeners):
+                listener(server)
+        return server
+
+    def _lookup(self, key: str) -> asyncio.Task[mcstatus.JavaServer]:
+        """Return lookup task for key, sharing one already running."""
+        task = self.lookups.get(key)
+        if task is None:
+            task = self.loop.create_task(self._resolve(key))
+            self.lookups[key] = task
+
+            def done(_: asyncio.Task[mcstatus.JavaServer]) -> None:
+                if self.lookups.get(key) is task:
+                    del self.lookups[key]
+
+            task.add_done_callback(done)
+        return task
+
+    async def resolve(self, address: str) -> mcstatus.JavaServer:
+        """Return server for address, from cache if lookup is still valid."""
+        key = canonical_address(address)
+        entry = self.entries.get(key)
+        if (
+            entry is not None
+            and entry.server is not None
+            and entry.expires > self.loop.time()
+        ):
+            return entry.server
+        return await asyncio.shield(self._lookup(key))
+
+    def _schedule_refresh(self, key: str, entry: _CacheEntry) -> None:
+        """Schedule background re-resolve when entry expires."""
+        if entry.refresh is not None:
+            entry.refresh.cancel()
+            entry.refresh = None
+        if not entry.listeners or math.isinf(entry.expires):
+            return
+        entry.refresh = self.loop.call_at(
+            entry.expires,
+            self._refresh,
+            key,
+        )
+
+    def _refresh(self, key: str) -> None:
+        """Re-resolve expired watched address in the background."""
+        entry = self.entries.get(key)
+        if entry is None:
+            return
+        entry.refresh = None
+        if not entry.listeners:
+            return
+        task = self._lookup(key)
+
+        def done(task: asyncio.Task[mcstatus.JavaServer]) -> None:
+            if task.cancelled():
+                return
+            exc = task.exception()
+            if exc is None:
+                return
+            # Keep using old target, try again later
+            print(
+                f"[{self.__class__.__name__}] Re-resolving {key!r} failed: "
+                f"{pretty_exception_name(exc)}",
+            )
+            entry.expires = self.loop.time() + self.negative_ttl
+            self._schedule_refresh(key, entry)
+
+        task.add_done_callback(done)
+
+    def watch(
+        self,
+        address: str,
+        listener: Callable[[mcstatus.JavaServer], None],
+    ) -> None:
+        """Call listener with new server whenever address target changes."""
+        key = canonical_address(address)
+        entry = self._entry(key)
+        entry.listeners.append(listener)
+        if entry.refresh is None and entry.server is not None:
+            self._schedule_refresh(key, entry)
+
+    def unwatch(
+        self,
+        address: str,
+        listener: Callable[[mcstatus.JavaServer], None],
+    ) -> None:
+        """Stop calling listener when address target changes."""
+        key = canonical_address(address)
+        entry = self.entries.get(key)
+        if entry is None:
+            return
+        if listener in entry.listeners:
+            entry.listeners.remove(listener)
+        if not entry.listeners and entry.refresh is not None:
+            entry.refresh.cancel()
+            entry.refresh = None
+
+    async def prewarm(
+        self,
+        addresses: Iterable[str],
+        concurrency: int = 16,
+    ) -> int:
+        """Resolve addresses in parallel. Return number of failed lookups."""
+        limit = asyncio.Semaphore(concurrency)
+
+        async def warm(address: str) -> bool:
+            async with limit:
+                try:
+                    await self.resolve(address)
+                except Exception:  # pylint: disable=broad-except
+                    return False
+            return True
+
+        keys = {canonical_address(address) for address in addresses}
+        results = await asyncio.gather(*(warm(key) for key in keys))
+        return results.count(False)
+
+
+if __name__ == "__main__":
+    print(f"{__title__}\nProgrammed by {__author__}.\n")
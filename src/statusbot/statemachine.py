@@ -6,17 +6,35 @@ from __future__ import annotations
 
 __title__ = "State Machine"
 __author__ = "CoolCat467"
-__version__ = "0.1.9"
+__version__ = "0.3.0"
 
-from typing import TYPE_CHECKING, Generic, TypeVar
+import asyncio
+import inspect
+import traceback
+from time import perf_counter, time
+from typing import TYPE_CHECKING, Any, Generic, TypeVar
 from weakref import ref
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable
+    from collections.abc import Callable, Iterable
 
     from typing_extensions import Self
 
-__all__ = ["AsyncState", "AsyncStateMachine", "State", "StateMachine"]
+    # Called with machine, old state name, new state name, and timestamp
+    TransitionListener = Callable[
+        ["BaseStateMachine", str | None, str | None, float],
+        object,
+    ]
+
+__all__ = [
+    "AsyncState",
+    "AsyncStateMachine",
+    "MachineListener",
+    "PhaseHistogram",
+    "State",
+    "StateMachine",
+    "StateTimings",
+]
 
 
 class BaseState:
@@ -121,10 +139,182 @@ class AsyncState(BaseState, Generic[AsyncMachine]):
         return
 
 
+class MachineListener:
+    """Base class for listeners timing what state machines are doing.
+
+    Set as a state machine's listener to opt in. Without a listener,
+    state machines do not time anything. Called inline, so only meant
+    for cheap bookkeeping like StateTimings. To react to changes of
+    state, add a transition listener instead.
+    """
+
+    __slots__ = ()
+
+    def phase(self, state_name: str, phase: str, seconds: float) -> None:
+        """Handle state phase (like "do_actions") taking seconds to run."""
+        return
+
+    def transition(self, old_name: str | None, new_name: str | None) -> None:
+        """Handle state machine changing from old state to new state."""
+        return
+
+
+class PhaseHistogram:
+    """Count of durations in power of two microsecond buckets."""
+
+    __slots__ = ("buckets", "count", "total", "worst")
+
+    # Bucket i counts durations under 2 ** i microseconds
+    bucket_count = 32
+
+    def __init__(self) -> None:
+        """Initialize with no durations."""
+        self.buckets = [0] * self.bucket_count
+        self.count = 0
+        self.total = 0.0
+        self.worst = 0.0
+
+    def __repr__(self) -> str:
+        """Return representation of self."""
+        return f"<{self.__class__.__name__} {self.count} durations>"
+
+    def observe(self, seconds: float) -> None:
+        """Record duration."""
+        micros = int(seconds * 1_000_000)
+        self.buckets[min(micros.bit_length(), self.bucket_count - 1)] += 1
+        self.count += 1
+        self.total += seconds
+        self.worst = max(self.worst, seconds)
+
+    def quantile(self, fraction: float) -> float:
+        """Return upper bound in seconds of durations below fraction."""
+        target = fraction * self.count
+        seen = 0
+        for index, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen >= target and seen:
+                return min((1 << index) / 1_000_000, self.worst)
+        return self.worst
+
+
+class StateTimings(MachineListener):
+    """Listener recording per-state, per-phase durations and transitions.
+
+    Async phase durations are wall time, including time spent awaiting.
+    One instance can listen to many state machines, and states with the
+    same name are recorded together.
+    """
+
+    __slots__ = ("histograms", "transitions")
+
+    def __init__(self) -> None:
+        """Initialize with nothing recorded."""
+        self.histograms: dict[tuple[str, str], PhaseHistogram] = {}
+        self.transitions: dict[tuple[str | None, str | None], int] = {}
+
+    def __repr__(self) -> str:
+        """Return representation of self."""
+        return f"<{self.__class__.__name__} {len(self.histograms)} phases>"
+
+    def phase(self, state_name: str, phase: str, seconds: float) -> None:
+        """Record state phase taking seconds to run."""
+        key = (state_name, phase)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = PhaseHistogram()
+            self.histograms[key] = histogram
+        histogram.observe(seconds)
+
+    def transition(self, old_name: str | None, new_name: str | None) -> None:
+        """Count transition from old state to new state."""
+        key = (old_name, new_name)
+        self.transitions[key] = self.transitions.get(key, 0) + 1
+
+    def clear(self) -> None:
+        """Forget everything recorded."""
+        self.histograms.clear()
+        self.transitions.clear()
+
+    def report(self) -> list[str]:
+        """Return lines describing phases by total time, then transitions."""
+        lines = []
+        for (state_name, phase), histogram in sorted(
+            self.histograms.items(),
+            key=lambda item: item[1].total,
+            reverse=True,
+        ):
+            lines.append(
+                f"{state_name}.{phase}: {histogram.count}x "
+                f"total {histogram.total:.3f}s "
+                f"p50<={histogram.quantile(0.5) * 1000:.2f}ms "
+                f"p99<={histogram.quantile(0.99) * 1000:.2f}ms "
+                f"max {histogram.worst * 1000:.2f}ms",
+            )
+        for (old_name, new_name), count in sorted(
+            self.transitions.items(),
+            key=lambda item: item[1],
+            reverse=True,
+        ):
+            lines.append(f"{old_name} -> {new_name}: {count}x")
+        return lines
+
+
+# Tasks of async transition listeners, so they are not garbage collected
+_listener_tasks: set[asyncio.Future[Any]] = set()
+
+
+def _report_listener_error(exc: BaseException) -> None:
+    """Report exception raised by transition listener."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        traceback.print_exception(exc)
+        return
+    loop.call_exception_handler(
+        {"message": "Transition listener failed", "exception": exc},
+    )
+
+
+def _listener_done(task: asyncio.Future[Any]) -> None:
+    """Forget finished transition listener task, reporting exceptions."""
+    _listener_tasks.discard(task)
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if exc is not None:
+        _report_listener_error(exc)
+
+
+def _deliver(
+    listener: TransitionListener,
+    machine: BaseStateMachine,
+    old_name: str | None,
+    new_name: str | None,
+    timestamp: float,
+) -> None:
+    """Call transition listener, running awaitable results as tasks."""
+    try:
+        result = listener(machine, old_name, new_name, timestamp)
+        if inspect.isawaitable(result):
+            task = asyncio.ensure_future(result)
+            _listener_tasks.add(task)
+            task.add_done_callback(_listener_done)
+    except Exception as exc:  # pylint: disable=broad-except
+        _report_listener_error(exc)
+
+
 class BaseStateMachine:
     """State Machine base class."""
 
-    __slots__ = ("__weakref__", "active_state", "states")
+    __slots__ = (
+        "__weakref__",
+        "active_state",
+        "listener",
+        "states",
+        "transition_listeners",
+    )
+
+    transition_listeners: list[TransitionListener]
 
     def __repr__(self) -> str:
         """Return <{class-name} {self.states}>."""
@@ -133,6 +323,44 @@ class BaseStateMachine:
             text += f" {self.states}"
         return f"{text}>"
 
+    def add_transition_listener(self, listener: TransitionListener) -> None:
+        """Add listener called after every change of state.
+
+        Listeners are called with this machine, old state name, new state
+        name, and time.time() timestamp of transition. If there is a
+        running event loop, listeners are called soon after instead of
+        during the transition, and if they return an awaitable it is
+        run as a task, so they never hold up the machine.
+        """
+        self.transition_listeners.append(listener)
+
+    def remove_transition_listener(self, listener: TransitionListener) -> None:
+        """Remove transition listener."""
+        self.transition_listeners.remove(listener)
+
+    def _notify_transition(
+        self,
+        old_name: str | None,
+        new_name: str | None,
+    ) -> None:
+        """Hand transition to transition listeners."""
+        timestamp = time()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            for listener in tuple(self.transition_listeners):
+                _deliver(listener, self, old_name, new_name, timestamp)
+            return
+        for listener in self.transition_listeners:
+            loop.call_soon(
+                _deliver,
+                listener,
+                self,
+                old_name,
+                new_name,
+                timestamp,
+            )
+
 
 class StateMachine(BaseStateMachine):
     """Synchronous State Machine base class."""
@@ -145,6 +373,8 @@ class StateMachine(BaseStateMachine):
         self.active_state: State[Self] | None = (
             None  # The currently active state
         )
+        self.listener: MachineListener | None = None
+        self.transition_listeners: list[TransitionListener] = []
 
     def add_state(self, state: State[Self]) -> None:
         """Add a State instance to the internal dictionary."""
@@ -174,24 +404,74 @@ class StateMachine(BaseStateMachine):
                 f'"{new_state_name}" not found in internal states dictionary!',
             )
 
-        if self.active_state is not None:
-            self.active_state.exit_actions()
+        old_state = self.active_state
+        listener = self.listener
+        if listener is not None:
+            self._timed_set_state(listener, new_state_name)
+        else:
+            if self.active_state is not None:
+                self.active_state.exit_actions()
+
+            if new_state_name is None:
+                self.active_state = None
+            else:
+                self.active_state = self.states[new_state_name]
+                self.active_state.entry_actions()
+
+        if self.transition_listeners:
+            self._notify_transition(
+                None if old_state is None else old_state.name,
+                new_state_name,
+            )
+
+    def _timed(
+        self,
+        listener: MachineListener,
+        state: State[Self],
+        phase: str,
+    ) -> Any:
+        """Return result of running state phase, telling listener duration."""
+        start = perf_counter()
+        try:
+            return getattr(state, phase)()
+        finally:
+            listener.phase(state.name, phase, perf_counter() - start)
+
+    def _timed_set_state(
+        self,
+        listener: MachineListener,
+        new_state_name: str | None,
+    ) -> None:
+        """Change states like set_state, timing exit / entry actions."""
+        old_state = self.active_state
+        if old_state is not None:
+            self._timed(listener, old_state, "exit_actions")
 
         if new_state_name is None:
             self.active_state = None
         else:
             self.active_state = self.states[new_state_name]
-            self.active_state.entry_actions()
+            self._timed(listener, self.active_state, "entry_actions")
+        listener.transition(
+            None if old_state is None else old_state.name,
+            new_state_name,
+        )
 
     def think(self) -> None:
         """Perform actions check conditions and potentially change states."""
         # Only continue if there is an active state
         if self.active_state is None:
             return
-        # Perform the actions of the active state
-        self.active_state.do_actions()
-        # Check conditions and potentially change states.
-        new_state_name = self.active_state.check_conditions()
+        listener = self.listener
+        if listener is None:
+            # Perform the actions of the active state
+            self.active_state.do_actions()
+            # Check conditions and potentially change states.
+            new_state_name = self.active_state.check_conditions()
+        else:
+            state = self.active_state
+            self._timed(listener, state, "do_actions")
+            new_state_name = self._timed(listener, state, "check_conditions")
         if new_state_name is not None:
             self.set_state(new_state_name)
 
@@ -205,6 +485,8 @@ class AsyncStateMachine(BaseStateMachine):
         """Initialize async state machine."""
         self.states: dict[str, AsyncState[Self]] = {}  # Stores the states
         self.active_state: AsyncState[Self] | None = None  # active state
+        self.listener: MachineListener | None = None
+        self.transition_listeners: list[TransitionListener] = []
 
     def add_state(self, state: AsyncState[Self]) -> None:
         """Add an AsyncState instance to the internal dictionary."""
@@ -234,24 +516,78 @@ class AsyncStateMachine(BaseStateMachine):
                 f'"{new_state_name}" not found in internal states dictionary!',
             )
 
-        if self.active_state is not None:
-            await self.active_state.exit_actions()
+        old_state = self.active_state
+        listener = self.listener
+        if listener is not None:
+            await self._timed_set_state(listener, new_state_name)
+        else:
+            if self.active_state is not None:
+                await self.active_state.exit_actions()
+
+            if new_state_name is None:
+                self.active_state = None
+            else:
+                self.active_state = self.states[new_state_name]
+                await self.active_state.entry_actions()
+
+        if self.transition_listeners:
+            self._notify_transition(
+                None if old_state is None else old_state.name,
+                new_state_name,
+            )
+
+    async def _timed(
+        self,
+        listener: MachineListener,
+        state: AsyncState[Self],
+        phase: str,
+    ) -> Any:
+        """Return result of running state phase, telling listener duration."""
+        start = perf_counter()
+        try:
+            return await getattr(state, phase)()
+        finally:
+            listener.phase(state.name, phase, perf_counter() - start)
+
+    async def _timed_set_state(
+        self,
+        listener: MachineListener,
+        new_state_name: str | None,
+    ) -> None:
+        """Change states like set_state, timing exit / entry actions."""
+        old_state = self.active_state
+        if old_state is not None:
+            await self._timed(listener, old_state, "exit_actions")
 
         if new_state_name is None:
             self.active_state = None
         else:
             self.active_state = self.states[new_state_name]
-            await self.active_state.entry_actions()
+            await self._timed(listener, self.active_state, "entry_actions")
+        listener.transition(
+            None if old_state is None else old_state.name,
+            new_state_name,
+        )
 
     async def think(self) -> None:
         """Perform actions check conditions and potentially change states."""
         # Only continue if there is an active state
         if self.active_state is None:
             return
-        # Perform the actions of the active state
-        await self.active_state.do_actions()
-        # Check conditions and potentially change states.
-        new_state_name = await self.active_state.check_conditions()
+        listener = self.listener
+        if listener is None:
+            # Perform the actions of the active state
+            await self.active_state.do_actions()
+            # Check conditions and potentially change states.
+            new_state_name = await self.active_state.check_conditions()
+        else:
+            state = self.active_state
+            await self._timed(listener, state, "do_actions")
+            new_state_name = await self._timed(
+                listener,
+                state,
+                "check_conditions",
+            )
         if new_state_name is not None:
             await self.set_state(new_state_name)
 
@@ -0,0 +1,316 @@
+"""Status - Immutable snapshots of server status responses."""
+
+# Programmed by CoolCat467
+
+# Copyright 2025 CoolCat467
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+from __future__ import annotations
+
+__title__ = "Status"
+__author__ = "CoolCat467"
+__license__ = "Apache License 2.0"
+__version__ = "0.1.0"
+
+import hashlib
+import json
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, NoReturn
+
+from statusbot.decode_mods import ForgeView
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    from typing_extensions import Self
+
+__all__ = ["StatusSnapshot", "status_fingerprint"]
+
+
+def status_fingerprint(json_data: Mapping[str, Any]) -> int:
+    """Return hash of the parts of status json pingers act on.
+
+    Covers player sample names (in any order), online count, version,
+    MOTD, favicon, and forge data, so equal fingerprints mean there is
+    nothing new to process. Cheap enough to run on raw status json
+    before any processing, and also works on processed json with a
+    favicon hash and ForgeView. Same in every process, so snapshots
+    made by worker processes can be compared.
+    """
+    players = json_data.get("players")
+    online = None
+    names: tuple[str, ...] = ()
+    if players is not None:
+        online = players.get("online")
+        sample = players.get("sample")
+        if sample:
+            names = tuple(
+                sorted(
+                    player["name"] for player in sample if "name" in player
+                ),
+            )
+    version = json_data.get("version") or {}
+    description = json_data.get("description")
+    if not isinstance(description, str):
+        description = repr(description)
+    favicon = json_data.get("favicon")
+    forge = json_data.get("forgeData")
+    if isinstance(forge, ForgeView):
+        forge = forge.encoded
+    elif forge is not None:
+        forge = repr(forge)
+    parts = (
+        online,
+        names,
+        version.get("name"),
+        version.get("protocol"),
+        description,
+        json_data.get("favicon_hash"),
+        None if favicon is None else len(favicon),
+        None if forge is None else len(forge),
+    )
+    # Not hash(), string hashes differ between processes
+    hasher = hashlib.blake2b(
+        repr(parts).encode("utf-8", "surrogatepass"),
+        digest_size=8,
+    )
+    # Large parts are hashed as is instead of copied into repr
+    if isinstance(favicon, str):
+        hasher.update(favicon.encode("utf-8", "surrogatepass"))
+    if forge is not None:
+        hasher.update(forge.encode("utf-8", "surrogatepass"))
+    return int.from_bytes(hasher.digest(), "little")
+
+
+def _freeze(value: Any) -> Any:
+    """Return json value with dictionaries and lists made read only."""
+    if isinstance(value, dict):
+        return MappingProxyType(
+            {key: _freeze(item) for key, item in value.items()},
+        )
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    """Return frozen json value as plain dictionaries and lists."""
+    if isinstance(value, (dict, MappingProxyType)):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+# Status fields that get their own snapshot attributes
+_MODELED = frozenset(
+    (
+        "version",
+        "players",
+        "description",
+        "forgeData",
+        "favicon",
+        "favicon_hash",
+    ),
+)
+
+
+class StatusSnapshot:
+    """Read only result of one successful status request.
+
+    Made once per status request and shared by every pinger watching
+    the server, so nothing may change it. online is None if the server
+    did not send a players field at all. Status fields without their
+    own attribute are kept read only in extra.
+    """
+
+    __slots__ = (
+        "_json",
+        "extra",
+        "favicon",
+        "favicon_hash",
+        "fingerprint",
+        "forge",
+        "latency",
+        "max_players",
+        "motd",
+        "online",
+        "protocol",
+        "sample",
+        "sample_ids",
+        "version",
+    )
+
+    latency: float
+    version: str | None
+    protocol: int | None
+    motd: Any
+    online: int | None
+    max_players: int | None
+    sample: tuple[str, ...]
+    sample_ids: tuple[str | None, ...]
+    forge: Mapping[str, Any] | None
+    favicon_hash: str | None
+    favicon: str | None
+    fingerprint: int
+    extra: Mapping[str, Any]
+    _json: str | None
+
+    def __init__(
+        self,
+        json_data: dict[str, Any],
+        latency: float,
+        fingerprint: int | None = None,
+    ) -> None:
+        """Initialize from processed status json and latency.
+
+        fingerprint is status_fingerprint of the raw status json, if not
+        given it is computed from json_data.
+        """
+        if fingerprint is None:
+            fingerprint = status_fingerprint(json_data)
+        version = json_data.get("version") or {}
+        players = json_data.get("players")
+        online = max_players = None
+        sample: tuple[str, ...] = ()
+        sample_ids: tuple[str | None, ...] = ()
+        if players is not None:
+            online = players.get("online", 0)
+            max_players = players.get("max")
+            named = [
+                player
+                for player in players.get("sample") or ()
+                if "name" in player
+            ]
+            sample = tuple(player["name"] for player in named)
+            sample_ids = tuple(player.get("id") for player in named)
+        fields = {
+            "latency": latency,
+            "version": version.get("name"),
+            "protocol": version.get("protocol"),
+            "motd": _freeze(json_data.get("description")),
+            "online": online,
+            "max_players": max_players,
+            "sample": sample,
+            "sample_ids": sample_ids,
+            "forge": _freeze(json_data.get("forgeData")),
+            "favicon_hash": json_data.get("favicon_hash"),
+            "favicon": json_data.get("favicon"),
+            "fingerprint": fingerprint,
+            "extra": _freeze(
+                {
+                    key: value
+                    for key, value in json_data.items()
+                    if key not in _MODELED
+                },
+            ),
+            "_json": None,
+        }
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+
+    def __repr__(self) -> str:
+        """Return representation of self."""
+        return (
+            f"<{self.__class__.__name__} {self.version} "
+            f"{self.online}/{self.max_players} players>"
+        )
+
+    def __setattr__(self, name: str, value: object) -> NoReturn:
+        """Refuse to change attributes."""
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __delattr__(self, name: str) -> NoReturn:
+        """Refuse to delete attributes."""
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __getstate__(self) -> dict[str, Any]:
+        """Return picklable state, used to send snapshots between processes."""
+        return {
+            name: _thaw(getattr(self, name))
+            for name in self.__slots__
+            if name != "_json"
+        }
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        """Restore state returned by __getstate__."""
+        for name, value in state.items():
+            object.__setattr__(self, name, _freeze(value))
+        object.__setattr__(self, "_json", None)
+
+    def with_latency(self, latency: float) -> Self:
+        """Return snapshot sharing everything with this one but latency.
+
+        Used when a new response has the same fingerprint, so nothing
+        has to be processed again.
+        """
+        copy = object.__new__(self.__class__)
+        for name in self.__slots__:
+            object.__setattr__(copy, name, getattr(self, name))
+        object.__setattr__(copy, "latency", latency)
+        return copy
+
+    @property
+    def has_favicon(self) -> bool:
+        """Whether server sent a favicon."""
+        return self.favicon_hash is not None or self.favicon is not None
+
+    def _render(self) -> dict[str, Any]:
+        """Return status json rebuilt from fields, for display."""
+        data: dict[str, Any] = _thaw(self.extra)
+        if self.version is not None or self.protocol is not None:
+            data["version"] = {"name": self.version, "protocol": self.protocol}
+        if self.motd is not None:
+            data["description"] = _thaw(self.motd)
+        if self.online is not None:
+            players: dict[str, Any] = {"online": self.online}
+            if self.max_players is not None:
+                players["max"] = self.max_players
+            if self.sample:
+                players["sample"] = [
+                    {"name": name, "id": player_id}
+                    for name, player_id in zip(
+                        self.sample,
+                        self.sample_ids,
+                        strict=True,
+                    )
+                ]
+            data["players"] = players
+        if self.has_favicon:
+            data["favicon"] = "<base64 image data>"
+        if self.forge is not None:
+            forge = _thaw(dict(self.forge))
+            # Decoded channels have tuple keys json cannot use
+            if isinstance(forge.get("channels"), dict):
+                forge["channels"] = {
+                    ":".join(key): value
+                    for key, value in forge["channels"].items()
+                }
+            data["forgeData"] = forge
+        return data
+
+    def to_json(self) -> str:
+        """Return indented json text for display, rendered once."""
+        if self._json is None:
+            object.__setattr__(
+                self,
+                "_json",
+                json.dumps(self._render(), sort_keys=True, indent=2),
+            )
+        assert self._json is not None
+        return self._json
+
+
+if __name__ == "__main__":
+    print(f"{__title__}\nProgrammed by {__author__}.\n")
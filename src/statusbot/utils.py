@@ -23,11 +23,15 @@ __author__ = "CoolCat467"
 __license__ = "Apache License 2.0"
 __version__ = "0.0.0"
 
-from typing import TYPE_CHECKING
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Generic, TypeVar
 
 if TYPE_CHECKING:
     from collections.abc import Iterable
 
+_KT = TypeVar("_KT")
+_VT = TypeVar("_VT")
+
 
 def split_time(seconds: int) -> list[int]:
     """Split time."""
@@ -128,5 +132,48 @@ def pretty_exception_name(exc: BaseException) -> str:
     return f"{error} ({reason})"
 
 
+class LRUCache(Generic[_KT, _VT]):
+    """Bounded mapping that evicts the least recently used entry."""
+
+    __slots__ = ("data", "maxsize")
+
+    def __init__(self, maxsize: int) -> None:
+        """Initialize with maximum number of entries."""
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.data: OrderedDict[_KT, _VT] = OrderedDict()
+
+    def __repr__(self) -> str:
+        """Return representation of self."""
+        return f"<{self.__class__.__name__} {len(self.data)}/{self.maxsize}>"
+
+    def __len__(self) -> int:
+        """Return number of entries."""
+        return len(self.data)
+
+    def __contains__(self, key: object) -> bool:
+        """Return if key is cached, without marking it as used."""
+        return key in self.data
+
+    def get(self, key: _KT) -> _VT | None:
+        """Return value for key and mark it as used, or None if missing."""
+        value = self.data.get(key)
+        if value is not None:
+            self.data.move_to_end(key)
+        return value
+
+    def put(self, key: _KT, value: _VT) -> None:
+        """Store value for key, evicting least recently used if full."""
+        self.data[key] = value
+        self.data.move_to_end(key)
+        while len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self.data.clear()
+
+
 if __name__ == "__main__":
     print(f"{__title__}\nProgrammed by {__author__}.\n")
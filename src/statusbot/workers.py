@@ -0,0 +1,374 @@
+"""Workers - Send server requests from a pool of worker processes."""
+
+# Programmed by CoolCat467
+
+# Copyright 2025 CoolCat467
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+from __future__ import annotations
+
+__title__ = "Workers"
+__author__ = "CoolCat467"
+__license__ = "Apache License 2.0"
+__version__ = "0.1.0"
+
+import asyncio
+import contextlib
+import multiprocessing
+import pickle
+import threading
+import traceback
+import zlib
+from typing import TYPE_CHECKING, Any, TypeAlias
+
+import mcstatus
+
+from statusbot import logs
+from statusbot.ping_registry import fetch_ping, fetch_snapshot, server_key
+from statusbot.utils import pretty_exception_name
+
+if TYPE_CHECKING:
+    import sys
+    from collections.abc import Callable
+    from multiprocessing.connection import Connection
+    from multiprocessing.process import BaseProcess
+
+    from statusbot.status import StatusSnapshot
+
+    if sys.platform == "win32":
+        from multiprocessing.connection import PipeConnection
+
+        # Pipe() makes PipeConnection on Windows
+        _Connection: TypeAlias = (
+            Connection[Any, Any] | PipeConnection[Any, Any]
+        )
+    else:
+        _Connection: TypeAlias = Connection[Any, Any]
+
+__all__ = ["PingWorkerPool"]
+
+
+def _send_error(conn: _Connection, request_id: int, exc: Exception) -> None:
+    """Send exception and its formatted traceback as response to request.
+
+    Exceptions that can't be pickled are replaced by RuntimeError.
+    """
+    text = "".join(traceback.format_exception(exc))
+    error: Exception = exc
+    try:
+        pickle.loads(pickle.dumps(exc))  # noqa: S301
+    except Exception:  # pylint: disable=broad-except
+        error = RuntimeError(f"{pretty_exception_name(exc)}: {exc}")
+    conn.send((request_id, False, (error, text)))
+
+
+async def _handle(
+    conn: _Connection,
+    request_id: int,
+    kind: str,
+    host: str,
+    port: int,
+    timeout: float,
+    known_favicon: str | None,
+    previous: int | None,
+) -> None:
+    """Perform one request and send back result.
+
+    Favicon png is only sent back if its hash is not known_favicon,
+    the hash of the favicon the bot already has for this server, and
+    no snapshot is sent back if the status fingerprint is previous.
+    """
+    server = mcstatus.JavaServer(host, port, timeout)
+    try:
+        if kind == "status":
+            result: Any = await fetch_snapshot(
+                server,
+                known_favicon,
+                previous,
+            )
+        else:
+            result = await fetch_ping(server)
+    except Exception as exc:  # pylint: disable=broad-except
+        _send_error(conn, request_id, exc)
+    else:
+        conn.send((request_id, True, result))
+
+
+def _read_requests(
+    conn: _Connection,
+    loop: asyncio.AbstractEventLoop,
+    requests: asyncio.Queue[tuple[Any, ...] | None],
+) -> None:
+    """Receive requests in reader thread, queueing them on event loop.
+
+    None is queued once the connection is closed or asked to exit.
+    """
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, OSError):
+            request = None
+        try:
+            loop.call_soon_threadsafe(requests.put_nowait, request)
+        except RuntimeError:
+            # Event loop is closed
+            return
+        if request is None:
+            return
+
+
+async def _serve(conn: _Connection) -> None:
+    """Handle requests from connection until it is closed."""
+    loop = asyncio.get_running_loop()
+    requests: asyncio.Queue[tuple[Any, ...] | None] = asyncio.Queue()
+    # Own thread instead of the default executor, which it would hold
+    # forever, and add_reader does not work on every event loop
+    threading.Thread(
+        target=_read_requests,
+        args=(conn, loop, requests),
+        name="statusbot-request-reader",
+        daemon=True,
+    ).start()
+    tasks: set[asyncio.Task[None]] = set()
+    while (request := await requests.get()) is not None:
+        task = loop.create_task(_handle(conn, *request))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    for task in tuple(tasks):
+        task.cancel()
+
+
+def _worker_main(conn: _Connection) -> None:
+    """Entry point of worker process."""
+    try:
+        asyncio.run(_serve(conn))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        conn.close()
+
+
+def _reap(process: BaseProcess, timeout: float) -> None:
+    """Wait for process to exit, terminating it if it takes too long."""
+    process.join(timeout)
+    if process.is_alive():
+        process.terminate()
+        process.join(timeout)
+
+
+class _Worker:
+    """Worker process and requests waiting on it."""
+
+    __slots__ = ("conn", "pending", "process")
+
+    def __init__(self, conn: _Connection, process: BaseProcess) -> None:
+        """Initialize with connection to and worker process."""
+        self.conn = conn
+        self.process = process
+        self.pending: dict[int, asyncio.Future[Any]] = {}
+
+
+class PingWorkerPool:
+    """Pool of processes, each with it's own event loop, sending requests.
+
+    Servers are partitioned between workers by their canonical key, so
+    requests for one server always go to the same worker. Workers turn
+    status json into status snapshots, decoding favicons and computing
+    change fingerprints, and only snapshots come back over a pipe,
+    with favicon pngs only when the bot does not have them yet.
+    Responses are received and unpickled in a reader thread per worker,
+    leaving the bot's event loop and default executor free. Worker
+    exceptions come back with their traceback as a logs.RemoteTraceback
+    cause.
+    Worker processes are started on first use and restarted if they die.
+    """
+
+    __slots__ = ("context", "loop", "next_id", "size", "workers")
+
+    # Seconds to wait for a worker to exit when closing
+    join_timeout: float = 1
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, size: int) -> None:
+        """Initialize with event loop and number of worker processes."""
+        if size < 1:
+            raise ValueError(f"Need at least one worker, got {size!r}")
+        self.loop = loop
+        self.size = size
+        # Spawn so workers do not inherit the bot's event loop and sockets
+        self.context = multiprocessing.get_context("spawn")
+        self.workers: list[_Worker | None] = [None] * size
+        self.next_id = 0
+
+    def __repr__(self) -> str:
+        """Return representation of self."""
+        running = sum(worker is not None for worker in self.workers)
+        return f"<{self.__class__.__name__} {running}/{self.size} running>"
+
+    def _start_worker(self, index: int) -> _Worker:
+        """Start worker process for given partition."""
+        conn, child_conn = self.context.Pipe()
+        process = self.context.Process(
+            target=_worker_main,
+            args=(child_conn,),
+            name=f"statusbot-ping-worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        worker = _Worker(conn, process)
+        threading.Thread(
+            target=self._read,
+            args=(index, worker),
+            name=f"statusbot-ping-worker-{index}-reader",
+            daemon=True,
+        ).start()
+        self.workers[index] = worker
+        return worker
+
+    def _worker_for(self, key: str) -> tuple[int, _Worker]:
+        """Return partition index and worker for server key."""
+        index = zlib.crc32(key.encode("utf-8")) % self.size
+        worker = self.workers[index]
+        if worker is None:
+            worker = self._start_worker(index)
+        return index, worker
+
+    def _call_soon(self, callback: Callable[..., object], *args: Any) -> None:
+        """Call callback in event loop thread, unless loop is closed."""
+        with contextlib.suppress(RuntimeError):
+            self.loop.call_soon_threadsafe(callback, *args)
+
+    def _read(self, index: int, worker: _Worker) -> None:
+        """Receive worker responses in reader thread until it exits."""
+        while True:
+            try:
+                response = worker.conn.recv()
+            except (EOFError, OSError):
+                break
+            self._call_soon(self._resolve, worker, *response)
+        self._call_soon(self._exited, index, worker)
+        # Only closed here, closing while receiving is not safe
+        worker.conn.close()
+
+    def _resolve(
+        self,
+        worker: _Worker,
+        request_id: int,
+        ok: bool,
+        payload: Any,
+    ) -> None:
+        """Resolve request with response from worker."""
+        future = worker.pending.pop(request_id, None)
+        if future is None or future.done():
+            return
+        if ok:
+            future.set_result(payload)
+        else:
+            exc, text = payload
+            exc.__cause__ = logs.RemoteTraceback(text)
+            future.set_exception(exc)
+
+    def _exited(self, index: int, worker: _Worker) -> None:
+        """Handle worker connection closing."""
+        if self.workers[index] is worker:
+            print(
+                f"[{self.__class__.__name__}] Worker {index} exited, "
+                f"failing {len(worker.pending)} requests",
+            )
+        self._stop_worker(index, worker)
+
+    def _stop_worker(self, index: int, worker: _Worker) -> None:
+        """Stop worker and fail it's pending requests.
+
+        Process is waited for in a thread so the event loop never blocks.
+        """
+        if self.workers[index] is worker:
+            self.workers[index] = None
+        with contextlib.suppress(OSError):
+            # Ask worker to exit, closing it's end ends our reader thread
+            worker.conn.send(None)
+        threading.Thread(
+            target=_reap,
+            args=(worker.process, self.join_timeout),
+            name=f"statusbot-ping-worker-{index}-reaper",
+            daemon=True,
+        ).start()
+        for future in worker.pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("Ping worker exited"))
+        worker.pending.clear()
+
+    async def _request(
+        self,
+        kind: str,
+        server: mcstatus.JavaServer,
+        known_favicon: str | None = None,
+        previous: int | None = None,
+    ) -> Any:
+        """Return result of request performed by server's worker."""
+        index, worker = self._worker_for(server_key(server))
+        self.next_id += 1
+        request_id = self.next_id
+        future: asyncio.Future[Any] = self.loop.create_future()
+        worker.pending[request_id] = future
+        try:
+            worker.conn.send(
+                (
+                    request_id,
+                    kind,
+                    server.address.host,
+                    server.address.port,
+                    server.timeout,
+                    known_favicon,
+                    previous,
+                ),
+            )
+        except OSError:
+            self._stop_worker(index, worker)
+        try:
+            return await future
+        finally:
+            worker.pending.pop(request_id, None)
+
+    async def status(
+        self,
+        server: mcstatus.JavaServer,
+        known_favicon: str | None = None,
+        previous: int | None = None,
+    ) -> tuple[StatusSnapshot | None, float, bytes | None]:
+        """Return status snapshot, latency, and favicon png from worker.
+
+        Same as ping_registry.fetch_snapshot, run by server's worker.
+        """
+        result: tuple[
+            StatusSnapshot | None,
+            float,
+            bytes | None,
+        ] = await self._request("status", server, known_favicon, previous)
+        return result
+
+    async def ping(self, server: mcstatus.JavaServer) -> float:
+        """Return ping latency of server."""
+        result: float = await self._request("ping", server)
+        return result
+
+    def close(self) -> None:
+        """Stop all worker processes."""
+        for index, worker in enumerate(self.workers):
+            if worker is not None:
+                self._stop_worker(index, worker)
+
+
+if __name__ == "__main__":
+    print(f"{__title__}\nProgrammed by {__author__}.\n")
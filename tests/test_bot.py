@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import aiohttp
+from aiohttp import web
+
+from statusbot import bot, gears, metrics
+from statusbot.polling import AdaptiveInterval
+from statusbot.status import StatusSnapshot
+
+
+class Channel:
+    """Messageable that records sent messages."""
+
+    def __init__(self) -> None:
+        self.sent: list[str] = []
+
+    async def send(self, text: str) -> None:
+        """Record message."""
+        self.sent.append(text)
+
+
+class LagMonitor:
+    """Lag monitor that never sheds."""
+
+    def shed(self) -> bool:
+        """Return False."""
+        return False
+
+
+class Registry:
+    """Ping registry returning the status it was last given."""
+
+    def __init__(self) -> None:
+        self.next_status: StatusSnapshot | None = None
+
+    async def status(self, key: str, max_age: float) -> StatusSnapshot:
+        """Return next status."""
+        assert self.next_status is not None
+        return self.next_status
+
+
+class Bot:
+    """Just enough of StatusBot for PingState."""
+
+    def __init__(self) -> None:
+        self.lag_monitor = LagMonitor()
+        self.ping_registry = Registry()
+
+
+class Pinger:
+    """Just enough of GuildServerPinger for PingState."""
+
+    def __init__(self) -> None:
+        self.bot = Bot()
+        self.channel = Channel()
+        self.server_key = "example.com:25565"
+        self.share_age = 0.0
+        self.interval = AdaptiveInterval(60, 15, 300)
+        self.delay = 60.0
+        self.last_delay: float = 0
+        self.last_status: StatusSnapshot | None = None
+        self.last_online: list[str] = []
+        self.last_online_count = 0
+
+    def adapt_delay(self, changed: bool, online: int) -> None:
+        """Update delay."""
+        self.delay = self.interval.update(changed, online)
+
+
+def snapshot(*names: str) -> StatusSnapshot:
+    """Return status snapshot with given players online."""
+    json_data: dict[str, Any] = {
+        "version": {"name": "1.20.4", "protocol": 765},
+        "players": {
+            "online": len(names),
+            "max": 20,
+            "sample": [{"name": name, "id": name} for name in names],
+        },
+    }
+    return StatusSnapshot(json_data, 5)
+
+
+def test_reconnect_does_not_announce_online_players_again() -> None:
+    async def run() -> None:
+        pinger = Pinger()
+        state = bot.PingState()
+        state.machine_ref = lambda: pinger  # type: ignore[assignment,return-value]
+
+        await state.entry_actions()
+        pinger.bot.ping_registry.next_status = snapshot("A", "B", "C")
+        await state.do_actions()
+        assert len(pinger.channel.sent) == 1
+        assert pinger.channel.sent[0].startswith("[Joined]:")
+
+        # Server went away and came back with the same players
+        await state.entry_actions()
+        await state.do_actions()
+        assert sorted(pinger.last_online) == ["A", "B", "C"]
+
+        pinger.channel.sent.clear()
+        pinger.bot.ping_registry.next_status = snapshot("A", "B", "C", "D")
+        await state.do_actions()
+        assert pinger.channel.sent == ["[Joined]:\n`D`"]
+
+    asyncio.run(run())
+
+
+def test_count_transition() -> None:
+    before = metrics.gear_transitions.get("ping", "wait_restart")
+    bot.StatusBot.count_transition(
+        None,  # type: ignore[arg-type]
+        "ping",
+        "wait_restart",
+        0,
+    )
+    assert metrics.gear_transitions.get("ping", "wait_restart") == before + 1
+
+
+def test_discord_send_trace_measures_message_posts() -> None:
+    async def handle(request: web.Request) -> web.Response:
+        status = 403 if request.match_info["channel"] == "6" else 200
+        return web.json_response({}, status=status)
+
+    async def run() -> None:
+        app = web.Application()
+        app.router.add_post("/api/channels/{channel}/messages", handle)
+        app.router.add_get("/api/channels/{channel}/messages", handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        url = f"http://127.0.0.1:{port}/api/channels"
+        try:
+            async with aiohttp.ClientSession(
+                trace_configs=[bot.discord_send_trace()],
+            ) as session:
+                for method, channel in (
+                    ("POST", 5),
+                    ("POST", 6),
+                    ("GET", 5),
+                ):
+                    async with session.request(
+                        method,
+                        f"{url}/{channel}/messages",
+                    ):
+                        pass
+        finally:
+            await runner.cleanup()
+
+    sends = metrics.discord_send_latency.count()
+    forbidden = metrics.discord_send_failures.get("Forbidden")
+    asyncio.run(run())
+    assert metrics.discord_send_latency.count() == sends + 2
+    assert metrics.discord_send_failures.get("Forbidden") == forbidden + 1
+
+
+class Resolver:
+    """Resolver that records watched addresses."""
+
+    def __init__(self) -> None:
+        self.watching: list[str] = []
+        self.target = "first.example.com"
+
+    async def resolve(self, address: str) -> str:
+        """Return current target of address."""
+        return self.target
+
+    def watch(self, address: str, listener: object) -> None:
+        """Record watched address."""
+        self.watching.append(address)
+
+    def unwatch(self, address: str, listener: object) -> None:
+        """Forget watched address."""
+        self.watching.remove(address)
+
+
+class SubscriptionRegistry:
+    """Ping registry that records subscriptions."""
+
+    def __init__(self) -> None:
+        self.subscribed: list[str] = []
+
+    def subscribe(self, server: str) -> str:
+        """Record subscription to server."""
+        self.subscribed.append(server)
+        return server
+
+    def unsubscribe(self, key: str) -> None:
+        """Forget subscription."""
+        self.subscribed.remove(key)
+
+
+class HibernatingBot(gears.BaseBot):
+    """Just enough of StatusBot for GuildServerPinger hibernation."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        super().__init__(loop)
+        self.resolver = Resolver()
+        self.ping_registry = SubscriptionRegistry()
+
+
+def test_hibernating_pinger_stops_following_server() -> None:
+    async def run() -> None:
+        client = HibernatingBot(asyncio.get_running_loop())
+        pinger = bot.GuildServerPinger(client, 1)  # type: ignore[arg-type]
+        pinger.warming_up = False
+        pinger.address = "example.com"
+        await pinger.follow_server()
+        assert client.resolver.watching == ["example.com"]
+        assert client.ping_registry.subscribed == ["first.example.com"]
+
+        pinger.hibernate()
+        assert pinger.hibernating
+        assert pinger.server_key is None
+        assert client.resolver.watching == []
+        assert client.ping_registry.subscribed == []
+
+        # Address moved while hibernating, wake up follows new target
+        client.resolver.target = "second.example.com"
+        pinger.hibernating = False
+        await pinger.tick()
+        assert pinger.server_key == "second.example.com"
+        assert client.resolver.watching == ["example.com"]
+        assert client.ping_registry.subscribed == ["second.example.com"]
+
+    asyncio.run(run())
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from typing import TYPE_CHECKING
+
+import pytest
+
+from statusbot.config_store import (
+    ConfigStore,
+    JsonBackend,
+    SQLiteBackend,
+    load_json,
+    migrate_json_to_sqlite,
+    write_atomic,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+class QuickStore(ConfigStore):
+    """Config store that flushes right away."""
+
+    __slots__ = ()
+
+    flush_delay = 0
+
+
+def test_write_atomic(tmp_path: Path) -> None:
+    filename = str(tmp_path / "sub" / "config.json")
+    write_atomic(filename, '{"address": "example.com"}')
+    write_atomic(filename, '{"address": "example.org"}')
+    assert load_json(filename) == {"address": "example.org"}
+    assert os.listdir(tmp_path / "sub") == ["config.json"]
+
+
+def test_load_json_bad(tmp_path: Path) -> None:
+    filename = tmp_path / "config.json"
+    assert load_json(str(filename)) is None
+    filename.write_text("{not json", encoding="utf-8")
+    assert load_json(str(filename)) is None
+
+
+def test_reads_once_and_returns_copies(tmp_path: Path) -> None:
+    filename = tmp_path / "guilds" / "1.json"
+    write_atomic(str(filename), '{"users": [1]}')
+
+    async def run() -> None:
+        store = ConfigStore(
+            asyncio.get_running_loop(),
+            JsonBackend(str(tmp_path)),
+        )
+        configuration = store.get("guilds/1")
+        configuration["users"].append(2)
+        write_atomic(str(filename), '{"users": [3]}')
+        # Served from memory, and not changed by caller's edits
+        assert store.get("guilds/1") == {"users": [1]}
+        assert not store.dirty
+
+    asyncio.run(run())
+
+
+def test_writes_are_coalesced(tmp_path: Path) -> None:
+    filename = str(tmp_path / "dms.json")
+
+    async def run() -> None:
+        store = QuickStore(
+            asyncio.get_running_loop(),
+            JsonBackend(str(tmp_path)),
+        )
+        store.set("dms", {"channel": "a"})
+        store.set("dms", {"channel": "b"})
+        assert load_json(filename) is None
+        await asyncio.sleep(0.05)
+        assert load_json(filename) == {"channel": "b"}
+        assert store.handle is None
+        assert store.flusher is None
+
+    asyncio.run(run())
+
+
+def test_delete_and_close(tmp_path: Path) -> None:
+    filename = str(tmp_path / "guilds" / "1.json")
+    write_atomic(filename, "{}")
+
+    async def run() -> None:
+        store = ConfigStore(
+            asyncio.get_running_loop(),
+            JsonBackend(str(tmp_path)),
+        )
+        store.get("guilds/1")
+        store.delete("guilds/1")
+        # Pending removal, do not read old file
+        assert store.get("guilds/1") == {}
+        store.delete("guilds/1")
+        store.set("guilds/2", {"address": "example.com"})
+        await store.close()
+
+    asyncio.run(run())
+    assert not os.path.exists(filename)
+    assert JsonBackend(str(tmp_path)).names() == ["guilds/2"]
+
+
+def test_sqlite_backend(tmp_path: Path) -> None:
+    backend = SQLiteBackend(str(tmp_path / "configuration.db"))
+    try:
+        assert backend.load("guilds/1") is None
+        assert not backend.save(
+            [
+                ("guilds/1", '{"address": "example.com", "channel": "mc"}'),
+                ("guilds/2", '{"channel": "general", "users": [1]}'),
+                ("dms", "{}"),
+            ],
+        )
+        assert backend.load("guilds/1") == {
+            "address": "example.com",
+            "channel": "mc",
+        }
+        assert backend.find("address") == {"guilds/1": "example.com"}
+        assert backend.find("users") == {"guilds/2": [1]}
+        assert not backend.save([("guilds/1", None)])
+        assert backend.load("guilds/1") is None
+        assert backend.find("channel") == {"guilds/2": "general"}
+    finally:
+        backend.close()
+
+
+def test_store_find_sees_unsaved_changes(tmp_path: Path) -> None:
+    async def run() -> None:
+        backend = SQLiteBackend(str(tmp_path / "configuration.db"))
+        backend.save(
+            [
+                ("guilds/1", '{"address": "a.example.com"}'),
+                ("guilds/2", '{"address": "b.example.com"}'),
+            ],
+        )
+        store = ConfigStore(asyncio.get_running_loop(), backend)
+        store.set("guilds/3", {"address": "c.example.com"})
+        store.delete("guilds/2")
+        store.set("guilds/1", {})
+        assert store.find("address") == {"guilds/3": "c.example.com"}
+        await store.close()
+
+    asyncio.run(run())
+
+
+def test_migrate_json_to_sqlite(tmp_path: Path) -> None:
+    root = tmp_path / "config"
+    write_atomic(str(root / "dms.json"), '{"stop-users": [1]}')
+    write_atomic(str(root / "guilds" / "1.json"), '{"address": "x"}')
+    write_atomic(str(root / "guilds" / "2.json"), "{broken")
+    database = str(root / "configuration.db")
+    assert migrate_json_to_sqlite(str(root), database) == 2
+    backend = SQLiteBackend(database)
+    try:
+        assert backend.load("dms") == {"stop-users": [1]}
+        assert backend.find("address") == {"guilds/1": "x"}
+    finally:
+        backend.close()
+
+
+def test_migrate_json_to_sqlite_failure_leaves_no_database(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    root = tmp_path / "config"
+    write_atomic(str(root / "guilds" / "1.json"), '{"address": "x"}')
+    database = str(root / "configuration.db")
+
+    def fail(self: SQLiteBackend, changes: object) -> list[str]:
+        return ["guilds/1"]
+
+    monkeypatch.setattr(SQLiteBackend, "save", fail)
+    with pytest.raises(RuntimeError, match="1 configurations failed"):
+        migrate_json_to_sqlite(str(root), database)
+    assert sorted(os.listdir(root)) == ["guilds"]
+
+
+def test_migrate_json_to_sqlite_refuses_existing(tmp_path: Path) -> None:
+    database = tmp_path / "configuration.db"
+    database.write_bytes(b"")
+    with pytest.raises(FileExistsError):
+        migrate_json_to_sqlite(str(tmp_path), str(database))
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import io
+import pickle
+import random
+
+import pytest
+from mcstatus._protocol.connection import Connection
+
+from statusbot import metrics
+from statusbot.decode_mods import (
+    ForgeReader,
+    ForgeView,
+    decode_optimized,
+    decode_optimized_bytes,
+    forge_cache,
+    process_response,
+)
+
+
+def reference_decode(string: str) -> bytes:
+    """Decode one character at a time, like decode_optimized used to."""
+    text = io.StringIO(string)
+
+    def read() -> int:
+        result = text.read(1)
+        if not result:
+            return 0
+        return ord(result)
+
+    size = read() | (read() << 15)
+    output = bytearray()
+    value = 0
+    bits = 0
+    for _ in range(len(string) - 2):
+        while bits >= 8:
+            output.append(value & 0xFF)
+            value >>= 8
+            bits -= 8
+        value |= (read() & 0x7FFF) << bits
+        bits += 15
+    while len(output) < size:
+        output.append(value & 0xFF)
+        value >>= 8
+    return bytes(output)
+
+
+def encode(data: bytes) -> str:
+    """Encode like Forge's encodeOptimized."""
+    chars = [chr(len(data) & 0x7FFF), chr((len(data) >> 15) & 0x7FFF)]
+    buffer = 0
+    bits = 0
+    for byte in data:
+        while bits >= 15:
+            chars.append(chr(buffer & 0x7FFF))
+            buffer >>= 15
+            bits -= 15
+        buffer |= byte << bits
+        bits += 8
+    while bits > 0:
+        chars.append(chr(buffer & 0x7FFF))
+        buffer >>= 15
+        bits -= 15
+    return "".join(chars)
+
+
+def test_round_trip() -> None:
+    rng = random.Random(0)  # noqa: S311
+    for size in (0, 1, 2, 14, 15, 16, 29, 30, 31, 1000, 40000):
+        data = rng.randbytes(size)
+        assert decode_optimized_bytes(encode(data)) == data
+
+
+@pytest.mark.parametrize(
+    "string",
+    [
+        "",
+        "\x05",
+        "\x05\x00",
+        "\x00\x00abc",
+        "\x03\x00翿耀￿",
+        "\x02\x00\U0001f631\ud83d",
+        "\x10\x00" + "z" * 40,
+    ],
+)
+def test_matches_reference(string: str) -> None:
+    assert decode_optimized_bytes(string) == reference_decode(string)
+    assert bytes(decode_optimized(string).received) == reference_decode(
+        string,
+    )
+
+
+def test_matches_reference_random() -> None:
+    rng = random.Random(1)  # noqa: S311
+    for _ in range(200):
+        count = rng.randrange(0, 50)
+        # Keep size small, it is not masked
+        string = (
+            chr(rng.randrange(0x400))
+            + "\x00"
+            + "".join(
+                chr(
+                    rng.choice(
+                        (rng.randrange(0x8000), rng.randrange(0x110000)),
+                    ),
+                )
+                for _ in range(count)
+            )
+        )
+        assert decode_optimized_bytes(string) == reference_decode(string)
+
+
+def test_reader_matches_connection() -> None:
+    buffer = Connection()
+    buffer.write_bool(True)
+    buffer.write_ushort(65535)
+    buffer.write_varint(-1)
+    buffer.write_varint(300)
+    # Forge writes byte length, mcstatus writes character length
+    encoded = "möd".encode()
+    buffer.write_varint(len(encoded))
+    buffer.write(encoded)
+    data = bytes(buffer.flush())
+
+    reader = ForgeReader(data)
+    assert reader.read_bool() is True
+    assert reader.read_ushort() == 65535
+    assert reader.read_varint() == -1
+    assert reader.read_varint() == 300
+    assert reader.read_utf() == "möd"
+    assert reader.remaining() == 0
+    with pytest.raises(OSError, match="Not enough data"):
+        reader.read_bool()
+
+
+def forge_payload() -> str:
+    """Return encoded forge data with two mods."""
+    buffer = Connection()
+    buffer.write_bool(False)
+    buffer.write_ushort(2)
+    # One channel, has version
+    buffer.write_varint(1 << 1)
+    buffer.write_utf("examplemod")
+    buffer.write_utf("1.0")
+    buffer.write_utf("main")
+    buffer.write_utf("3")
+    buffer.write_bool(True)
+    # No channels, server only
+    buffer.write_varint(1)
+    buffer.write_utf("serverside")
+    buffer.write_varint(1)
+    buffer.write_utf("minecraft:register")
+    buffer.write_utf("FML3")
+    buffer.write_bool(False)
+    return encode(bytes(buffer.flush()))
+
+
+def test_process_response_decodes_mods() -> None:
+    response = {
+        "forgeData": {
+            "fmlNetworkVersion": 3,
+            "d": forge_payload(),
+        },
+    }
+
+    forge = process_response(response)["forgeData"]  # type: ignore[arg-type]
+    assert forge["fmlNetworkVersion"] == 3
+    assert "d" not in forge
+    assert forge["truncated"] is False
+    assert forge["mods"] == {
+        "examplemod": "1.0",
+        "serverside": "<not required for client>",
+    }
+    assert forge["channels"] == {
+        ("examplemod", "main"): ("3", True),
+        ("minecraft", "register"): ("FML3", False),
+    }
+
+
+def test_process_response_reuses_cached_tables() -> None:
+    forge_cache.clear()
+    hits = metrics.forge_cache_lookups.get("hit")
+    misses = metrics.forge_cache_lookups.get("miss")
+    encoded = forge_payload()
+
+    first = process_response(
+        {"forgeData": {"d": encoded}},  # type: ignore[typeddict-item]
+    )["forgeData"]
+    second = process_response(
+        {"forgeData": {"d": encoded}},  # type: ignore[typeddict-item]
+    )["forgeData"]
+    assert first is not second
+    assert first["mods"] is second["mods"]
+    assert first["channels"] is second["channels"]
+    assert metrics.forge_cache_lookups.get("miss") == misses + 1
+    assert metrics.forge_cache_lookups.get("hit") == hits + 1
+    assert len(forge_cache) == 1
+
+
+def test_process_response_does_not_decode() -> None:
+    lookups = dict(metrics.forge_cache_lookups.values)
+    response = {"forgeData": {"fmlNetworkVersion": 3, "d": forge_payload()}}
+
+    forge = process_response(response)["forgeData"]  # type: ignore[arg-type]
+    assert isinstance(forge, ForgeView)
+    assert "mods" in forge
+    assert forge["fmlNetworkVersion"] == 3
+    assert not forge.decoded
+    assert metrics.forge_cache_lookups.values == lookups
+
+    assert forge["mods"]["examplemod"] == "1.0"
+    assert forge.decoded
+    assert list(forge) == [
+        "fmlNetworkVersion",
+        "truncated",
+        "mods",
+        "channels",
+    ]
+    assert dict(forge)["truncated"] is False
+
+
+def test_forge_view_pickles_encoded() -> None:
+    view = ForgeView({"fmlNetworkVersion": 3, "d": forge_payload()})
+    copy = pickle.loads(pickle.dumps(view))  # noqa: S301
+    assert not copy.decoded
+    assert copy.encoded == view.encoded
+    assert copy == view
+
+
+def test_decoded_tables_are_read_only() -> None:
+    forge_cache.clear()
+    encoded = forge_payload()
+    view = ForgeView({"fmlNetworkVersion": 3, "d": encoded})
+    with pytest.raises(TypeError):
+        view["mods"]["examplemod"] = "2.0"
+    with pytest.raises(TypeError):
+        view["channels"][("examplemod", "main")] = ("4", False)
+    with pytest.raises(TypeError):
+        view.fields["fmlNetworkVersion"] = 4  # type: ignore[index]
+    assert ForgeView({"d": encoded})["mods"]["examplemod"] == "1.0"
+    # Decoded views pickle too, without their shared tables
+    copy = pickle.loads(pickle.dumps(view))  # noqa: S301
+    assert not copy.decoded
+    assert copy == view
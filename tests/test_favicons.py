@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import base64
+
+import pytest
+
+from statusbot.favicons import (
+    PNG_PREFIX,
+    decode_favicon,
+    extract_favicon,
+    favicon_cache,
+    favicon_references,
+    get_favicon,
+    release_favicon,
+    store_favicon,
+)
+
+PNG = b"\x89PNG\r\n\x1a\nnot really a png"
+FAVICON = PNG_PREFIX + base64.b64encode(PNG).decode("ascii")
+
+
+def test_decode_favicon() -> None:
+    assert decode_favicon(FAVICON) == PNG
+    with pytest.raises(ValueError, match="not encoded properly"):
+        decode_favicon("data:image/gif;base64,AAAA")
+    with pytest.raises(ValueError, match="decoding base64"):
+        decode_favicon(PNG_PREFIX + "AAA")
+
+
+def test_extract_favicon() -> None:
+    data = {"favicon": FAVICON, "players": {}}
+    assert extract_favicon(data) == PNG
+    assert "favicon" not in data
+    known = {"favicon": FAVICON}
+    assert extract_favicon(known, data["favicon_hash"]) is None
+    assert known["favicon_hash"] == data["favicon_hash"]
+
+
+def test_extract_favicon_leaves_bad_favicon() -> None:
+    data = {"favicon": "data:image/gif;base64,AAAA"}
+    assert extract_favicon(data) is None
+    assert data == {"favicon": "data:image/gif;base64,AAAA"}
+    empty: dict[str, str] = {}
+    assert extract_favicon(empty) is None
+    assert empty == {}
+
+
+def test_favicon_kept_until_released() -> None:
+    favicon_cache.clear()
+    favicon_references.clear()
+    store_favicon("key", PNG)
+    store_favicon("key", PNG)
+    release_favicon("key")
+    assert get_favicon("key") == PNG
+    release_favicon("key")
+    assert get_favicon("key") is None
+    assert not favicon_references
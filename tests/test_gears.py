@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import asyncio
+
+from statusbot.gears import BaseBot, TickScheduler, Timer
+from statusbot.statemachine import StateTimings
+
+
+def test_scheduler_wakes_in_deadline_order() -> None:
+    async def run() -> list[int]:
+        loop = asyncio.get_running_loop()
+        scheduler = TickScheduler(loop)
+        order: list[int] = []
+        now = loop.time()
+
+        async def wait(index: int, delay: float) -> None:
+            await scheduler.sleep_until(now + delay)
+            order.append(index)
+
+        await asyncio.gather(wait(0, 0.03), wait(1, 0.01), wait(2, 0.02))
+        assert len(scheduler) == 0
+        return order
+
+    assert asyncio.run(run()) == [1, 2, 0]
+
+
+def test_scheduler_skips_canceled() -> None:
+    async def run() -> None:
+        loop = asyncio.get_running_loop()
+        scheduler = TickScheduler(loop)
+        first = scheduler.schedule(loop.time() + 0.01)
+        second = scheduler.schedule(loop.time() + 0.02)
+        first.cancel()
+        assert len(scheduler) == 1
+        await second
+
+    asyncio.run(run())
+
+
+class CountingTimer(Timer):
+    """Timer that stops after a few ticks."""
+
+    __slots__ = ("count",)
+
+    def __init__(self, bot: BaseBot) -> None:
+        super().__init__(bot, "counter", 0.01)
+        self.count = 0
+
+    async def tick(self) -> bool:
+        """Count ticks, stop after third."""
+        self.count += 1
+        return self.count >= 3
+
+
+def test_timer_ticks_until_stopped() -> None:
+    async def run() -> None:
+        bot = BaseBot(asyncio.get_running_loop())
+        timer = CountingTimer(bot)
+        bot.add_gear(timer)
+        assert timer.task is not None
+        await timer.task
+        assert timer.count == 3
+        assert timer.stopped
+
+    asyncio.run(run())
+
+
+class SleepyTimer(Timer):
+    """Timer that never wants to stop on it's own."""
+
+    __slots__ = ()
+
+    async def tick(self) -> bool:
+        """Keep running."""
+        return False
+
+
+def test_timer_hault_wakes_sleeping_timer() -> None:
+    async def run() -> None:
+        loop = asyncio.get_running_loop()
+        bot = BaseBot(loop)
+        timer = SleepyTimer(bot, "sleepy", 3600)
+        bot.add_gear(timer)
+        await asyncio.sleep(0.01)
+        start = loop.time()
+        await timer.hault()
+        assert loop.time() - start < 1
+        assert timer.stopped
+
+    asyncio.run(run())
+
+
+class HibernatingTimer(Timer):
+    """Timer that hibernates after first tick."""
+
+    __slots__ = ("count",)
+
+    def __init__(self, bot: BaseBot) -> None:
+        super().__init__(bot, "hibernating", 0.01)
+        self.count = 0
+
+    async def tick(self) -> bool:
+        """Hibernate on first tick, stop on second."""
+        self.count += 1
+        if self.count == 1:
+            self.hibernate()
+        return self.count >= 2
+
+
+def test_timer_hibernates_until_woken() -> None:
+    async def run() -> None:
+        bot = BaseBot(asyncio.get_running_loop())
+        timer = HibernatingTimer(bot)
+        bot.add_gear(timer)
+        await asyncio.sleep(0.05)
+        assert timer.count == 1
+        assert timer.hibernating
+        assert len(bot.scheduler) == 0
+        timer.wake()
+        assert timer.task is not None
+        await timer.task
+        assert timer.count == 2
+        assert not timer.hibernating
+
+    asyncio.run(run())
+
+
+def test_bot_machine_listener() -> None:
+    async def run() -> None:
+        bot = BaseBot(asyncio.get_running_loop())
+        first = CountingTimer(bot)
+        bot.add_gear(first)
+        assert first.listener is None
+        timings = StateTimings()
+        bot.set_machine_listener(timings)
+        assert bot.gears["counter"].listener is timings
+        second = Timer(bot, "second", 1)
+        bot.add_gear(second)
+        assert second.listener is timings
+        bot.set_machine_listener(None)
+        assert all(gear.listener is None for gear in bot.gears.values())
+
+    asyncio.run(run())
+
+
+def test_bot_told_tick_lateness() -> None:
+    class LatenessBot(BaseBot):
+        __slots__ = ("lateness",)
+
+        def record_tick_lateness(self, timer: Timer, seconds: float) -> None:
+            self.lateness.append((timer.name, seconds))
+
+    async def run() -> None:
+        bot = LatenessBot(asyncio.get_running_loop())
+        bot.lateness = []
+        timer = CountingTimer(bot)
+        bot.add_gear(timer)
+        assert timer.task is not None
+        await timer.task
+        assert len(bot.lateness) == timer.count
+        assert all(name == "counter" for name, _ in bot.lateness)
+        assert all(seconds >= 0 for _, seconds in bot.lateness)
+
+    asyncio.run(run())
+
+
+def test_bot_transition_listeners() -> None:
+    async def run() -> list[str]:
+        bot = BaseBot(asyncio.get_running_loop())
+        names: list[str] = []
+
+        def listener(machine: object, *args: object) -> None:
+            assert isinstance(machine, Timer)
+            names.append(machine.name)
+
+        bot.add_gear(Timer(bot, "first", 1))
+        bot.add_transition_listener(listener)
+        bot.add_gear(Timer(bot, "second", 1))
+        for gear in bot.gears.values():
+            await gear.set_state(None)
+        await asyncio.sleep(0)
+        return names
+
+    assert asyncio.run(run()) == ["first", "second"]
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import os
+from typing import TYPE_CHECKING
+
+from statusbot.logs import (
+    ErrorAggregator,
+    fingerprint,
+    logger,
+    setup_logging,
+    stop_logging,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_records_written_by_listener(tmp_path: Path) -> None:
+    logpath = tmp_path / "logs" / "log.txt"
+    listener = setup_logging(str(logpath))
+    try:
+        logger.info("Guild gained: %s", "test")
+        logger.debug("Not logged at info level")
+    finally:
+        stop_logging(listener)
+    text = logpath.read_text(encoding="utf-8")
+    assert "INFO [statusbot] Guild gained: test" in text
+    assert "Not logged" not in text
+    assert logger.propagate
+
+
+def test_log_rotates(tmp_path: Path) -> None:
+    logpath = tmp_path / "log.txt"
+    listener = setup_logging(str(logpath), max_bytes=200, backup_count=2)
+    try:
+        for index in range(50):
+            logger.warning("Server %d is flapping", index)
+    finally:
+        stop_logging(listener)
+    assert sorted(os.listdir(tmp_path)) == [
+        "log.txt",
+        "log.txt.1",
+        "log.txt.2",
+    ]
+    assert os.path.getsize(logpath) <= 200
+
+
+def raise_error(value: int) -> None:
+    """Raise ValueError from the same place every time."""
+    raise ValueError(f"Bad value {value}")
+
+
+def caught(value: int) -> BaseException:
+    """Return exception raised by raise_error."""
+    try:
+        raise_error(value)
+    except ValueError as exc:
+        return exc
+    raise AssertionError("Did not raise")
+
+
+def test_fingerprint_ignores_message() -> None:
+    first, location = fingerprint(caught(1))
+    second, _ = fingerprint(caught(2))
+    assert first == second
+    assert location.startswith("test_logs.py:")
+    assert location.endswith("in raise_error")
+    assert fingerprint(KeyError("x"))[0] != first
+
+
+def test_aggregator_counts_and_summarizes() -> None:
+    aggregator = ErrorAggregator()
+    digest, first = aggregator.record(caught(1))
+    assert first
+    for value in range(5):
+        assert aggregator.record(caught(value)) == (digest, False)
+    aggregator.record(KeyError("x"))
+    top = aggregator.top(1)
+    assert top[0][0] == digest
+    assert top[0][1].total == 6
+    assert top[0][1].pending == 5
+    # Not due yet
+    aggregator.log_summaries()
+    assert top[0][1].pending == 5
+    aggregator.log_summaries(force=True)
+    assert top[0][1].pending == 0
+
+
+def test_aggregator_forgets_oldest() -> None:
+    class SmallAggregator(ErrorAggregator):
+        __slots__ = ()
+        max_fingerprints = 1
+
+    aggregator = SmallAggregator()
+    aggregator.record(caught(1))
+    digest, _ = aggregator.record(KeyError("x"))
+    assert list(aggregator.entries) == [digest]
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+from statusbot.loopmonitor import LagMonitor
+
+
+class QuickMonitor(LagMonitor):
+    """Lag monitor that measures often."""
+
+    __slots__ = ()
+
+    interval = 0.01
+
+
+def test_shedding_hysteresis() -> None:
+    async def run() -> None:
+        monitor = LagMonitor(asyncio.get_running_loop())
+        assert not monitor.shed()
+        for _ in range(10):
+            monitor.record(1)
+        assert monitor.shedding
+        assert monitor.shed()
+        assert monitor.skipped == 1
+        # Between thresholds, still shedding
+        while monitor.lag > monitor.shed_threshold:
+            monitor.record(0.15)
+        assert monitor.shedding
+        for _ in range(20):
+            monitor.record(0)
+        assert not monitor.shed()
+        assert monitor.skipped == 0
+
+    asyncio.run(run())
+
+
+def test_measures_blocked_loop() -> None:
+    async def run() -> None:
+        monitor = QuickMonitor(asyncio.get_running_loop())
+        monitor.start()
+        assert monitor.running
+        await asyncio.sleep(0.02)
+        for _ in range(4):
+            # Block the event loop
+            time.sleep(0.3)  # noqa: ASYNC251
+            await asyncio.sleep(0)
+        assert monitor.shedding
+        assert monitor.worst >= 0.2
+        monitor.stop()
+        assert not monitor.running
+
+    asyncio.run(run())
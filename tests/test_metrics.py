@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from statusbot.metrics import (
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+    MetricsServer,
+)
+
+
+def test_counter_render() -> None:
+    counter = Counter("failures_total", "Failures.", ("exception",))
+    counter.inc("TimeoutError")
+    counter.inc("TimeoutError", amount=2)
+    counter.inc('Bad"Name')
+    assert counter.get("TimeoutError") == 3
+    assert counter.render() == (
+        "# HELP failures_total Failures.\n"
+        "# TYPE failures_total counter\n"
+        'failures_total{exception="Bad\\"Name"} 1\n'
+        'failures_total{exception="TimeoutError"} 3\n'
+    )
+    with pytest.raises(ValueError, match="takes labels"):
+        counter.inc()
+
+
+def test_histogram_render() -> None:
+    histogram = Histogram("latency", "Latency.", (10, 100))
+    for value in (5, 10, 50, 500):
+        histogram.observe(value)
+    assert histogram.count() == 4
+    assert histogram.render().splitlines()[2:] == [
+        'latency_bucket{le="10"} 2',
+        'latency_bucket{le="100"} 3',
+        'latency_bucket{le="+Inf"} 4',
+        "latency_sum 565",
+        "latency_count 4",
+    ]
+
+
+def test_gauge_callback() -> None:
+    gauge = Gauge("gears", "Gears.", ("state",))
+    assert gauge.samples() == []
+    gauge.set_function(lambda: {("ping",): 3, ("Hault",): 1})
+    assert gauge.samples() == [
+        'gears{state="Hault"} 1',
+        'gears{state="ping"} 3',
+    ]
+
+
+def test_registry_rejects_duplicates() -> None:
+    registry = MetricsRegistry()
+    registry.register(Counter("a", "A."))
+    with pytest.raises(ValueError, match="already registered"):
+        registry.register(Counter("a", "A."))
+
+
+def test_server_serves_metrics() -> None:
+    async def run() -> bytes:
+        registry = MetricsRegistry()
+        counter = Counter("pings_total", "Pings.")
+        registry.register(counter)
+        counter.inc()
+        server = MetricsServer(registry, 0)
+        await server.start()
+        try:
+            assert server.port != 0
+            reader, writer = await asyncio.open_connection(
+                "127.0.0.1",
+                server.port,
+            )
+            writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+            await writer.wait_closed()
+        finally:
+            await server.stop()
+        return response
+
+    response = asyncio.run(run())
+    assert response.startswith(b"HTTP/1.1 200 OK\r\n")
+    assert response.endswith(b"pings_total 1\n")
@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any
+
+from mcstatus import JavaServer
+
+from statusbot import decode_mods, metrics
+from statusbot.favicons import (
+    favicon_cache,
+    favicon_references,
+    get_favicon,
+)
+from statusbot.ping_registry import PingRegistry, fetch_snapshot, server_key
+
+if TYPE_CHECKING:
+    import pytest
+
+
+class CountingServer(JavaServer):
+    """Java server that counts pings instead of connecting."""
+
+    def __init__(self, host: str, port: int) -> None:
+        super().__init__(host, port)
+        self.pings = 0
+
+    async def async_ping(self, **kwargs: Any) -> float:
+        """Count ping and return fake latency."""
+        self.pings += 1
+        await asyncio.sleep(0.01)
+        return 12.5
+
+
+class StatusServer(JavaServer):
+    """Java server that answers status requests with given json."""
+
+    def __init__(self, host: str, port: int, raw: dict[str, Any]) -> None:
+        super().__init__(host, port)
+        self.raw = raw
+
+    async def async_status(self, **kwargs: Any) -> Any:
+        """Return fake status response with copy of json."""
+        return SimpleNamespace(raw=dict(self.raw), latency=3.14159)
+
+
+def test_server_key() -> None:
+    assert server_key(JavaServer("Play.Example.COM.", 25565)) == (
+        "play.example.com:25565"
+    )
+    assert server_key(JavaServer("::1", 25566)) == "[::1]:25566"
+
+
+def test_subscribe_shares_key() -> None:
+    async def run() -> None:
+        registry = PingRegistry(asyncio.get_running_loop())
+        key = registry.subscribe(JavaServer("example.com", 25565))
+        assert registry.subscribe(JavaServer("EXAMPLE.com", 25565)) == key
+        assert registry.subscriber_count(key) == 2
+        registry.unsubscribe(key)
+        registry.unsubscribe(key)
+        assert registry.subscriber_count(key) == 0
+
+    asyncio.run(run())
+
+
+def test_concurrent_requests_coalesce() -> None:
+    async def run() -> None:
+        registry = PingRegistry(asyncio.get_running_loop())
+        server = CountingServer("example.com", 25565)
+        key = registry.subscribe(server)
+        results = await asyncio.gather(
+            *(registry.ping(key, 60) for _ in range(40)),
+        )
+        assert results == [12.5] * 40
+        assert server.pings == 1
+        # Fresh enough result is reused
+        await registry.ping(key, 60)
+        assert server.pings == 1
+        # Stale result is not
+        await registry.ping(key, 0)
+        assert server.pings == 2
+
+    asyncio.run(run())
+
+
+def test_status_snapshot_favicon_cached() -> None:
+    async def run() -> None:
+        favicon_cache.clear()
+        registry = PingRegistry(asyncio.get_running_loop())
+        key = registry.subscribe(
+            StatusServer(
+                "example.com",
+                25565,
+                {"favicon": "data:image/png;base64,iVBORw0K"},
+            ),
+        )
+        status = await registry.status(key)
+        assert status.latency == 3.142
+        assert status.favicon is None
+        assert status.favicon_hash is not None
+        assert get_favicon(status.favicon_hash) == b"\x89PNG\r\n"
+        # Fresh enough snapshot is shared
+        assert await registry.status(key, 60) is status
+
+    asyncio.run(run())
+
+
+def test_known_favicon_not_returned() -> None:
+    async def run() -> None:
+        favicon_cache.clear()
+        server = StatusServer(
+            "example.com",
+            25565,
+            {"favicon": "data:image/png;base64,iVBORw0K"},
+        )
+        snapshot, _, png = await fetch_snapshot(server)
+        assert png == b"\x89PNG\r\n"
+        assert snapshot is not None
+        assert snapshot.favicon_hash is not None
+        again, _, png = await fetch_snapshot(server, snapshot.favicon_hash)
+        assert png is None
+        assert again is not None
+        assert again.favicon_hash == snapshot.favicon_hash
+        assert again.favicon is None
+
+    asyncio.run(run())
+
+
+def test_favicon_cached_while_server_watched() -> None:
+    async def run() -> None:
+        favicon_cache.clear()
+        favicon_references.clear()
+        registry = PingRegistry(asyncio.get_running_loop())
+        raw = {"favicon": "data:image/png;base64,iVBORw0K"}
+        first = registry.subscribe(StatusServer("a.example.com", 1, raw))
+        second = registry.subscribe(StatusServer("b.example.com", 1, raw))
+        status = await registry.status(first)
+        await registry.status(second)
+        await registry.status(first)
+        assert status.favicon_hash is not None
+        assert favicon_references == {status.favicon_hash: 2}
+        registry.unsubscribe(first)
+        assert get_favicon(status.favicon_hash) == b"\x89PNG\r\n"
+        registry.unsubscribe(second)
+        assert get_favicon(status.favicon_hash) is None
+
+    asyncio.run(run())
+
+
+class RefusingServer(JavaServer):
+    """Java server that refuses connections."""
+
+    async def async_status(self, **kwargs: Any) -> Any:
+        """Refuse status request."""
+        await asyncio.sleep(0.01)
+        raise ConnectionRefusedError
+
+
+def test_shared_status_recorded_once() -> None:
+    async def run() -> None:
+        registry = PingRegistry(asyncio.get_running_loop())
+        key = registry.subscribe(StatusServer("example.com", 25565, {}))
+        refused = registry.subscribe(RefusingServer("example.org", 25565))
+        statuses = metrics.ping_latency.count()
+        failures = metrics.ping_failures.get("ConnectionRefusedError")
+        await asyncio.gather(*(registry.status(key) for _ in range(40)))
+        results = await asyncio.gather(
+            *(registry.status(refused) for _ in range(40)),
+            return_exceptions=True,
+        )
+        assert all(isinstance(r, ConnectionRefusedError) for r in results)
+        assert metrics.ping_latency.count() == statuses + 1
+        assert (
+            metrics.ping_failures.get("ConnectionRefusedError") == failures + 1
+        )
+
+    asyncio.run(run())
+
+
+def test_unchanged_status_not_processed_again(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    async def run() -> None:
+        registry = PingRegistry(asyncio.get_running_loop())
+        server = StatusServer(
+            "example.com",
+            25565,
+            {
+                "players": {"online": 1, "max": 20, "sample": []},
+                "favicon": "data:image/png;base64,iVBORw0K",
+            },
+        )
+        key = registry.subscribe(server)
+        first = await registry.status(key)
+
+        def fail(response: Any) -> Any:
+            raise AssertionError("Unchanged status was processed")
+
+        monkeypatch.setattr(decode_mods, "process_response", fail)
+        again = await registry.status(key)
+        assert again.fingerprint == first.fingerprint
+        assert again.extra is first.extra
+        assert again.favicon_hash == first.favicon_hash
+        assert again.latency == 3.142
+        monkeypatch.undo()
+
+        server.raw = {"players": {"online": 2, "max": 20, "sample": []}}
+        changed = await registry.status(key)
+        assert changed.online == 2
+        assert changed.fingerprint != first.fingerprint
+        registry.unsubscribe(key)
+
+    asyncio.run(run())
+
+
+class SheddingMonitor:
+    """Lag monitor that sheds load until told otherwise."""
+
+    def __init__(self) -> None:
+        self.shedding = True
+
+    def shed(self) -> bool:
+        """Return if shedding load."""
+        return self.shedding
+
+
+def test_favicon_not_extracted_while_shedding() -> None:
+    async def run() -> None:
+        monitor = SheddingMonitor()
+        registry = PingRegistry(
+            asyncio.get_running_loop(),
+            lag_monitor=monitor,  # type: ignore[arg-type]
+        )
+        favicon = "data:image/png;base64,c2hlZA=="
+        server = StatusServer(
+            "shed.example.com",
+            25565,
+            {"players": {"online": 0, "max": 20}, "favicon": favicon},
+        )
+        key = registry.subscribe(server)
+        shed = await registry.status(key)
+        assert shed.favicon == favicon
+        assert shed.favicon_hash is None
+        assert len(favicon_cache) == 0
+
+        monitor.shedding = False
+        calm = await registry.status(key)
+        assert calm.favicon is None
+        assert calm.favicon_hash is not None
+        assert get_favicon(calm.favicon_hash) == b"shed"
+        registry.unsubscribe(key)
+        assert len(favicon_cache) == 0
+
+    asyncio.run(run())
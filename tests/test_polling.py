@@ -0,0 +1,43 @@
+import pytest
+
+from statusbot.polling import AdaptiveInterval, ExponentialBackoff
+
+
+def test_bad_bounds() -> None:
+    with pytest.raises(ValueError, match="must not be more than ceiling"):
+        AdaptiveInterval(60, 100, 50)
+
+
+def test_base_clamped_into_bounds() -> None:
+    assert AdaptiveInterval(60, 90, 300).reset() == 90
+
+
+def test_speeds_up_while_changing() -> None:
+    interval = AdaptiveInterval(60, 15, 300)
+    assert interval.update(True, 10) == 30
+    assert interval.update(True, 12) == 15
+    assert interval.update(True, 11) == 15
+
+
+def test_stable_busy_server_returns_to_base() -> None:
+    interval = AdaptiveInterval(60, 15, 300)
+    interval.update(True, 10)
+    interval.update(True, 10)
+    assert interval.update(False, 10) == 30
+    assert interval.update(False, 10) == 60
+    assert interval.update(False, 10) == 60
+
+
+def test_backs_off_while_idle() -> None:
+    interval = AdaptiveInterval(60, 15, 300)
+    delays = [interval.update(False, 0) for _ in range(10)]
+    assert delays == sorted(delays)
+    assert delays[-1] == 300
+
+
+def test_backoff_doubles_up_to_ceiling() -> None:
+    backoff = ExponentialBackoff(300, 3600)
+    delays = [backoff.next_delay() for _ in range(6)]
+    assert delays == [300, 600, 1200, 2400, 3600, 3600]
+    backoff.reset()
+    assert backoff.next_delay() == 300
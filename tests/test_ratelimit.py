@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from statusbot.ratelimit import PingBudget
+
+
+def test_bad_budget() -> None:
+    async def run() -> None:
+        loop = asyncio.get_running_loop()
+        with pytest.raises(ValueError, match="Rate must be positive"):
+            PingBudget(loop, 0, 1, 1)
+        with pytest.raises(ValueError, match="Max in flight"):
+            PingBudget(loop, 1, 1, 0)
+
+    asyncio.run(run())
+
+
+def test_burst_admitted_right_away() -> None:
+    async def run() -> None:
+        budget = PingBudget(asyncio.get_running_loop(), 1, 3, 10)
+        for _ in range(3):
+            await budget.acquire("a")
+        assert budget.in_flight == 3
+        assert budget.stats()["delayed"] == 0
+
+    asyncio.run(run())
+
+
+def test_in_flight_limit() -> None:
+    async def run() -> None:
+        budget = PingBudget(asyncio.get_running_loop(), 1000, 1000, 2)
+        running = 0
+        most = 0
+
+        async def request() -> None:
+            nonlocal running, most
+            async with budget.slot("a"):
+                running += 1
+                most = max(most, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        await asyncio.gather(*(request() for _ in range(6)))
+        assert most == 2
+        assert budget.in_flight == 0
+        assert budget.stats()["delayed"] == 4
+
+    asyncio.run(run())
+
+
+def test_round_robin_between_clients() -> None:
+    async def run() -> list[str]:
+        budget = PingBudget(asyncio.get_running_loop(), 200, 1, 10)
+        # Use up burst so everything below has to queue
+        await budget.acquire("warmup")
+        order: list[str] = []
+
+        async def request(client: str) -> None:
+            await budget.acquire(client)
+            order.append(client)
+
+        await asyncio.gather(
+            *(request("busy") for _ in range(4)),
+            request("quiet"),
+        )
+        return order
+
+    order = asyncio.run(run())
+    assert order.index("quiet") <= 1
+
+
+def test_canceled_waiter_skipped() -> None:
+    async def run() -> None:
+        budget = PingBudget(asyncio.get_running_loop(), 100, 1, 10)
+        await budget.acquire("a")
+        waiter = asyncio.create_task(budget.acquire("a"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0.05)
+        assert budget.in_flight == 1
+        await budget.acquire("b")
+        assert budget.in_flight == 2
+
+    asyncio.run(run())
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import math
+from typing import TYPE_CHECKING
+
+import mcstatus
+
+from statusbot import resolver
+
+if TYPE_CHECKING:
+    import pytest
+
+
+def test_canonical_address() -> None:
+    assert resolver.canonical_address("  Play.Example.COM. ") == (
+        "play.example.com"
+    )
+
+
+def test_lookup_with_port_never_expires() -> None:
+    server, ttl = asyncio.run(resolver.lookup_server("Example.com:1234", 300))
+    assert (server.address.host, server.address.port) == ("example.com", 1234)
+    assert math.isinf(ttl)
+
+
+def test_lookup_ip_address_skips_srv() -> None:
+    server, ttl = asyncio.run(resolver.lookup_server("127.0.0.1", 300))
+    assert server.address.port == 25565
+    assert math.isinf(ttl)
+
+
+class QuickResolver(resolver.ServerResolver):
+    """Resolver that allows very short TTLs."""
+
+    __slots__ = ()
+    min_ttl = 0.01
+
+
+def test_watchers_told_about_new_target(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    targets = itertools.chain(
+        ("old.example.com",),
+        itertools.repeat("new.example.com"),
+    )
+    lookups = 0
+
+    async def fake_lookup(
+        address: str,
+        negative_ttl: float,
+        timeout: float = 3,
+    ) -> tuple[mcstatus.JavaServer, float]:
+        nonlocal lookups
+        lookups += 1
+        return mcstatus.JavaServer(next(targets), 25565), 0.01
+
+    monkeypatch.setattr(resolver, "lookup_server", fake_lookup)
+
+    async def run() -> list[str]:
+        cache = QuickResolver(asyncio.get_running_loop())
+        moved: list[str] = []
+        # Concurrent lookups for the same address are shared
+        first, again = await asyncio.gather(
+            cache.resolve("example.com"),
+            cache.resolve("EXAMPLE.com"),
+        )
+        assert first is again
+        cache.watch("example.com", lambda s: moved.append(s.address.host))
+        await asyncio.sleep(0.05)
+        return moved
+
+    assert asyncio.run(run()) == ["new.example.com"]
+    assert lookups >= 2
+
+
+def test_address_with_port_is_never_refreshed() -> None:
+    async def run() -> None:
+        cache = resolver.ServerResolver(asyncio.get_running_loop())
+        cache.watch("example.com:1234", lambda server: None)
+        await cache.resolve("example.com:1234")
+        entry = cache.entries["example.com:1234"]
+        assert math.isinf(entry.expires)
+        assert entry.refresh is None
+
+    asyncio.run(run())
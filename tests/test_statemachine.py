@@ -1,6 +1,16 @@
+import asyncio
+
 import pytest
 
-from statusbot.statemachine import AsyncState, State
+from statusbot.statemachine import (
+    AsyncState,
+    AsyncStateMachine,
+    BaseStateMachine,
+    PhaseHistogram,
+    State,
+    StateMachine,
+    StateTimings,
+)
 
 
 def test_state() -> None:
@@ -25,3 +35,141 @@ def test_async_state() -> None:
         match=r"^State has no statemachine bound$",
     ):
         print(state.machine)
+
+
+class Countdown(AsyncState[AsyncStateMachine]):
+    """State that moves to "done" after a few ticks."""
+
+    __slots__ = ("left",)
+
+    def __init__(self) -> None:
+        super().__init__("countdown")
+        self.left = 2
+
+    async def do_actions(self) -> None:
+        """Count down."""
+        self.left -= 1
+
+    async def check_conditions(self) -> str | None:
+        """Finish once count is zero."""
+        if self.left <= 0:
+            return "done"
+        return None
+
+
+def test_async_machine_timings() -> None:
+    machine = AsyncStateMachine()
+    machine.add_states((Countdown(), AsyncState("done")))
+    timings = StateTimings()
+    machine.listener = timings
+
+    async def run() -> None:
+        await machine.set_state("countdown")
+        await machine.think()
+        await machine.think()
+
+    asyncio.run(run())
+    assert machine.active_state is not None
+    assert machine.active_state.name == "done"
+    assert timings.histograms[("countdown", "do_actions")].count == 2
+    assert timings.histograms[("countdown", "check_conditions")].count == 2
+    assert timings.histograms[("countdown", "exit_actions")].count == 1
+    assert timings.histograms[("done", "entry_actions")].count == 1
+    assert timings.transitions == {
+        (None, "countdown"): 1,
+        ("countdown", "done"): 1,
+    }
+    assert "countdown -> done: 1x" in timings.report()
+
+
+def test_sync_machine_without_listener() -> None:
+    machine = StateMachine()
+    machine.add_states((State("a"), State("b")))
+    machine.set_state("a")
+    machine.think()
+    assert machine.listener is None
+
+    timings = StateTimings()
+    machine.listener = timings
+    machine.set_state("b")
+    assert timings.transitions == {("a", "b"): 1}
+    assert ("a", "exit_actions") in timings.histograms
+
+
+def test_phase_histogram_quantile() -> None:
+    histogram = PhaseHistogram()
+    for seconds in (0.000_5, 0.000_5, 0.000_5, 0.01):
+        histogram.observe(seconds)
+    assert histogram.count == 4
+    # 500 microseconds falls in the under 512 microseconds bucket
+    assert histogram.quantile(0.5) == pytest.approx(0.000_512)
+    assert histogram.quantile(1) == pytest.approx(0.01)
+
+
+def test_async_transition_listeners_run_after_tick() -> None:
+    machine = AsyncStateMachine()
+    machine.add_states((Countdown(), AsyncState("done")))
+    seen: list[tuple[str | None, str | None]] = []
+    finished: list[str | None] = []
+
+    def listener(
+        changed: BaseStateMachine,
+        old_name: str | None,
+        new_name: str | None,
+        timestamp: float,
+    ) -> None:
+        assert changed is machine
+        assert timestamp > 0
+        seen.append((old_name, new_name))
+
+    async def slow_listener(
+        changed: BaseStateMachine,
+        old_name: str | None,
+        new_name: str | None,
+        timestamp: float,
+    ) -> None:
+        await asyncio.sleep(0)
+        finished.append(new_name)
+
+    async def run() -> None:
+        machine.add_transition_listener(listener)
+        machine.add_transition_listener(slow_listener)
+        await machine.set_state("countdown")
+        # Not called during transition
+        assert seen == []
+        await machine.think()
+        await machine.think()
+        for _ in range(3):
+            await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert seen == [(None, "countdown"), ("countdown", "done")]
+    assert finished == ["countdown", "done"]
+
+
+def test_sync_transition_listener_errors_are_reported(
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    machine = StateMachine()
+    machine.add_states((State("a"), State("b")))
+    seen: list[str | None] = []
+
+    def broken(*args: object) -> None:
+        raise ValueError("listener broke")
+
+    def listener(
+        changed: BaseStateMachine,
+        old_name: str | None,
+        new_name: str | None,
+        timestamp: float,
+    ) -> None:
+        seen.append(new_name)
+
+    machine.add_transition_listener(broken)
+    machine.add_transition_listener(listener)
+    machine.set_state("a")
+    assert seen == ["a"]
+    assert "listener broke" in capsys.readouterr().err
+    machine.remove_transition_listener(listener)
+    machine.set_state("b")
+    assert seen == ["a"]
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import json
+import pickle
+from typing import Any
+
+import pytest
+
+from statusbot.decode_mods import ForgeView
+from statusbot.status import StatusSnapshot, status_fingerprint
+
+
+def status(**changes: Any) -> dict[str, Any]:
+    """Return status json with changes applied."""
+    data: dict[str, Any] = {
+        "version": {"name": "1.20.4", "protocol": 765},
+        "description": {"text": "A server"},
+        "players": {
+            "online": 2,
+            "max": 20,
+            "sample": [
+                {"name": "Alice", "id": "a"},
+                {"name": "Bob", "id": "b"},
+            ],
+        },
+        "favicon_hash": "0123456789abcdef",
+    }
+    data.update(changes)
+    return data
+
+
+def test_status_fingerprint_ignores_sample_order() -> None:
+    reordered = status()
+    reordered["players"] = dict(reordered["players"])
+    reordered["players"]["sample"] = reordered["players"]["sample"][::-1]
+    assert status_fingerprint(status()) == status_fingerprint(reordered)
+    # Fields pingers do not look at are ignored
+    assert status_fingerprint(status()) == status_fingerprint(
+        status(enforcesSecureChat=True),
+    )
+
+
+def test_status_fingerprint_changes() -> None:
+    base = status_fingerprint(status())
+    for changed in (
+        status(players={"online": 3, "max": 20}),
+        status(players={"online": 2, "max": 20, "sample": []}),
+        status(version={"name": "1.20.5", "protocol": 766}),
+        status(description="Another server"),
+        status(favicon_hash="fedcba9876543210"),
+        status(forgeData={"d": "\x00\x00"}),
+    ):
+        assert status_fingerprint(changed) != base
+    missing = status()
+    del missing["players"]
+    assert status_fingerprint(missing) != base
+
+
+def test_snapshot_fields() -> None:
+    snapshot = StatusSnapshot(status(), 12.5)
+    assert snapshot.latency == 12.5
+    assert snapshot.version == "1.20.4"
+    assert snapshot.protocol == 765
+    assert snapshot.motd == {"text": "A server"}
+    assert snapshot.online == 2
+    assert snapshot.max_players == 20
+    assert snapshot.sample == ("Alice", "Bob")
+    assert snapshot.forge is None
+    assert snapshot.has_favicon
+    assert snapshot.fingerprint == status_fingerprint(status())
+
+    missing = status()
+    del missing["players"]
+    empty = StatusSnapshot(missing, 1)
+    assert empty.online is None
+    assert empty.sample == ()
+
+
+def test_snapshot_is_immutable() -> None:
+    snapshot = StatusSnapshot(status(), 12.5)
+    with pytest.raises(AttributeError, match="immutable"):
+        snapshot.online = 3  # type: ignore[misc]
+    with pytest.raises(AttributeError, match="immutable"):
+        del snapshot.sample  # type: ignore[misc]
+    with pytest.raises(AttributeError, match="immutable"):
+        snapshot.extra = {}  # type: ignore[misc]
+
+
+def test_snapshot_keeps_no_mutable_json() -> None:
+    raw = status(
+        enforcesSecureChat=True,
+        modinfo={"type": "FML", "modList": [{"modid": "a"}]},
+    )
+    snapshot = StatusSnapshot(raw, 12.5)
+    assert not hasattr(snapshot, "raw")
+    assert snapshot.extra["enforcesSecureChat"] is True
+    with pytest.raises(TypeError):
+        snapshot.extra["modinfo"]["type"] = "BUKKIT"  # type: ignore[index]
+    with pytest.raises(TypeError):
+        snapshot.motd["text"] = "Changed"
+    # Changing the response afterwards does not change the snapshot
+    raw["players"]["online"] = 5
+    raw["description"]["text"] = "Changed"
+    assert snapshot.online == 2
+    assert snapshot.motd["text"] == "A server"
+
+
+def test_snapshot_json_rendered_once() -> None:
+    # Mod "mod" version "1" with channel "main"
+    forge = ForgeView(
+        {
+            "fmlNetworkVersion": 3,
+            "d": (
+                "\x13\x00\x00\u0402\u340c\u237b\u1016\u2086\u585b"
+                "\u3734\u3201\x02\x00"
+            ),
+        },
+    )
+    raw = status(forgeData=forge, modinfo={"modList": [{"modid": "a"}]})
+    snapshot = StatusSnapshot(raw, 12.5)
+    text = snapshot.to_json()
+    assert snapshot.to_json() is text
+    data = json.loads(text)
+    assert data["favicon"] == "<base64 image data>"
+    assert "favicon_hash" not in data
+    assert data["forgeData"]["fmlNetworkVersion"] == 3
+    assert data["forgeData"]["mods"] == {"mod": "1"}
+    assert data["forgeData"]["channels"] == {"mod:main": ["2", True]}
+    assert data["modinfo"] == {"modList": [{"modid": "a"}]}
+    assert data["players"] == raw["players"]
+    assert data["version"] == raw["version"]
+    assert data["description"] == raw["description"]
+
+
+def test_snapshot_pickles() -> None:
+    snapshot = StatusSnapshot(status(modinfo={"modList": [{"a": 1}]}), 1)
+    copy = pickle.loads(pickle.dumps(snapshot))  # noqa: S301
+    assert copy.fingerprint == snapshot.fingerprint
+    assert copy.sample == snapshot.sample
+    assert copy.to_json() == snapshot.to_json()
+    with pytest.raises(TypeError):
+        copy.extra["modinfo"]["modList"] = ()  # type: ignore[index]
+
+
+def test_snapshot_forge_tables_are_read_only() -> None:
+    encoded = (
+        "\x13\x00\x00\u0402\u340c\u237b\u1016\u2086\u585b\u3734\u3201\x02\x00"
+    )
+    snapshot = StatusSnapshot(status(forgeData=ForgeView({"d": encoded})), 1)
+    assert snapshot.forge is not None
+    with pytest.raises(TypeError):
+        snapshot.forge["mods"]["x"] = "1"
+    fresh = StatusSnapshot(status(forgeData=ForgeView({"d": encoded})), 1)
+    assert fresh.forge is not None
+    assert dict(fresh.forge["mods"]) == {"mod": "1"}
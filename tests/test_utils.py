@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import pytest
+
+from statusbot.utils import LRUCache
+
+
+def test_lru_cache_evicts_least_recently_used() -> None:
+    cache: LRUCache[str, int] = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_lru_cache_put_existing_marks_used() -> None:
+    cache: LRUCache[str, int] = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.put("a", 10)
+    cache.put("c", 3)
+    assert cache.get("a") == 10
+    assert cache.get("b") is None
+
+
+def test_lru_cache_clear() -> None:
+    cache: LRUCache[str, int] = LRUCache(1)
+    cache.put("a", 1)
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_lru_cache_rejects_zero_size() -> None:
+    with pytest.raises(ValueError, match="at least 1"):
+        LRUCache(0)
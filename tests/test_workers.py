@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import asyncio
+import socket
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from mcstatus import JavaServer
+
+from statusbot.logs import RemoteTraceback, fingerprint
+from statusbot.workers import PingWorkerPool
+
+
+def unused_port() -> int:
+    """Return port nothing is listening on."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port: int = sock.getsockname()[1]
+    return port
+
+
+def test_bad_size() -> None:
+    async def run() -> None:
+        with pytest.raises(ValueError, match="at least one worker"):
+            PingWorkerPool(asyncio.get_running_loop(), 0)
+
+    asyncio.run(run())
+
+
+def test_worker_sends_back_errors() -> None:
+    async def run() -> None:
+        pool = PingWorkerPool(asyncio.get_running_loop(), 2)
+        server = JavaServer("127.0.0.1", unused_port(), 2)
+        try:
+            with pytest.raises(ConnectionRefusedError) as info:
+                await pool.ping(server)
+            # Traceback from worker is kept for error fingerprints
+            cause = info.value.__cause__
+            assert isinstance(cause, RemoteTraceback)
+            assert "fetch_ping" in {name for _, _, name in cause.frames()}
+            assert fingerprint(info.value) != fingerprint(
+                ConnectionRefusedError(),
+            )
+            # Same server always goes to same worker
+            assert sum(worker is not None for worker in pool.workers) == 1
+            with pytest.raises(ConnectionRefusedError):
+                await pool.status(server)
+            assert sum(worker is not None for worker in pool.workers) == 1
+        finally:
+            pool.close()
+        assert pool.workers == [None, None]
+
+    asyncio.run(run())
+
+
+def test_workers_leave_default_executor_free() -> None:
+    async def run() -> None:
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(ThreadPoolExecutor(1))
+        pool = PingWorkerPool(loop, 2)
+        try:
+            for port in (unused_port(), unused_port() + 1):
+                server = JavaServer("127.0.0.1", port, 2)
+                with pytest.raises(ConnectionRefusedError):
+                    await pool.ping(server)
+            # Only executor thread is not stuck receiving from workers
+            assert (
+                await asyncio.wait_for(
+                    loop.run_in_executor(None, int, "7"),
+                    2,
+                )
+                == 7
+            )
+        finally:
+            pool.close()
+
+    asyncio.run(run())